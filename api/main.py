@@ -1,28 +1,182 @@
-from fastapi import FastAPI
+import os
+import json
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Tuple, TypeVar, Union
 
+from fallacylens.backends import OpenAICompatibleBackend
+from fallacylens.cache import cache_from_url
+from fallacylens.concurrency import AdmissionController, DeadlineExceeded, Overloaded
 from fallacylens.detector import FallacyDetector
-from fallacylens.models import AnalysisResult
+from fallacylens.models import AnalysisResult, ComparisonResult
+from fallacylens.neardup import NearDuplicateIndex
+from fallacylens.replay import ReplayMiss, ReplayTransport
+from fallacylens.serialization import (
+    comparison_to_dict,
+    dumps_json,
+    encode_payload,
+    result_to_dict,
+    span_to_dict,
+)
+
+
+# Number of Groq calls this process keeps in flight at once. Requests beyond
+# this wait on the detector's semaphore inside the event loop, not in threads.
+MAX_CONCURRENCY = int(
+    os.getenv("FALLACYLENS_MAX_CONCURRENCY", FallacyDetector.DEFAULT_MAX_CONCURRENCY)
+)
+
+# Results kept in this process's LRU cache, the optional shared store behind it
+# (see `fallacylens.cache.cache_from_url`: sqlite:///..., redis://...), and how
+# long clients/proxies may reuse a response before revalidating it.
+CACHE_SIZE = int(os.getenv("FALLACYLENS_CACHE_SIZE", "1024"))
+CACHE_URL = os.getenv("FALLACYLENS_CACHE_URL")
+CACHE_MAX_AGE = int(os.getenv("FALLACYLENS_CACHE_MAX_AGE", "3600"))
+
+# Response encoding requested from the model: "full" (names, explanations,
+# suggestions), "compact" (taxonomy codes + short explanations) or "lean"
+# (codes only; fewest generated tokens, so lowest latency). The API defaults to
+# "lean": clients fetch prose for the spans they show through POST /explain.
+OUTPUT_MODE = os.getenv("FALLACYLENS_OUTPUT_MODE", "lean")
+
+# Near-duplicate reuse (see `fallacylens.neardup`): recent analyses indexed per
+# worker (0, the default, disables it) and the shingle similarity a new text
+# needs to reuse one.
+NEAR_DUP_SIZE = int(os.getenv("FALLACYLENS_NEAR_DUP_SIZE", "0"))
+NEAR_DUP_SIMILARITY = float(os.getenv("FALLACYLENS_NEAR_DUP_SIMILARITY", "0.8"))
+
+# Optional OpenAI-compatible endpoint (e.g. a local llama.cpp / vLLM server at
+# http://localhost:8080/v1) used instead of Groq, the model it serves, and an
+# optional bearer token for it.
+BACKEND_URL = os.getenv("FALLACYLENS_BACKEND_URL")
+BACKEND_MODEL = os.getenv("FALLACYLENS_BACKEND_MODEL")
+BACKEND_API_KEY = os.getenv("FALLACYLENS_BACKEND_API_KEY")
+
+# Record/replay of upstream completions (see `fallacylens.replay`): the archive file
+# (unset disables it), "record" or "replay", and what a replay miss does
+# ("fail", "passthrough" or "synthesize").
+REPLAY_ARCHIVE = os.getenv("FALLACYLENS_REPLAY_ARCHIVE")
+REPLAY_MODE = os.getenv("FALLACYLENS_REPLAY_MODE", "replay")
+REPLAY_ON_MISS = os.getenv("FALLACYLENS_REPLAY_ON_MISS", "fail")
+
+# Admission control: requests running at once, requests allowed to wait for a
+# slot (beyond that we answer 503 + Retry-After right away), and the default
+# per-request deadline in seconds. Clients may shorten the deadline with an
+# `X-Request-Timeout` header.
+MAX_IN_FLIGHT = int(os.getenv("FALLACYLENS_MAX_IN_FLIGHT", "32"))
+MAX_QUEUED = int(os.getenv("FALLACYLENS_MAX_QUEUED", "64"))
+REQUEST_TIMEOUT = float(os.getenv("FALLACYLENS_REQUEST_TIMEOUT", "30"))
+
+# /analyze/batch limits: texts per batch and body bytes (beyond either we answer
+# 413), and how many texts share one admission slot.
+MAX_BATCH_TEXTS = int(os.getenv("FALLACYLENS_MAX_BATCH_TEXTS", "256"))
+MAX_BATCH_BYTES = int(os.getenv("FALLACYLENS_MAX_BATCH_BYTES", str(2 * 1024 * 1024)))
+BATCH_CHUNK_SIZE = max(1, int(os.getenv("FALLACYLENS_BATCH_CHUNK_SIZE", "8")))
+
+admission = AdmissionController(MAX_IN_FLIGHT, MAX_QUEUED)
+
+# The detector is created lazily by `get_detector` (and eagerly during startup),
+# so importing this module is cheap and a configuration error such as a missing
+# GROQ_API_KEY is reported by /readyz instead of killing the worker.
+detector: Optional[FallacyDetector] = None
+_ready = False
+_startup_error: Optional[str] = None
+
+
+def get_detector() -> FallacyDetector:
+    """Return the shared detector, creating it on first use (503 if misconfigured)."""
+    global detector, _startup_error
+    if detector is None:
+        try:
+            detector = FallacyDetector(
+                max_concurrency=MAX_CONCURRENCY,
+                output_mode=OUTPUT_MODE,
+                cache=cache_from_url(CACHE_URL, memory_size=CACHE_SIZE),
+                near_duplicates=(
+                    NearDuplicateIndex(NEAR_DUP_SIZE, min_similarity=NEAR_DUP_SIMILARITY)
+                    if NEAR_DUP_SIZE > 0
+                    else None
+                ),
+                replay=(
+                    ReplayTransport.from_path(REPLAY_ARCHIVE, REPLAY_MODE, REPLAY_ON_MISS)
+                    if REPLAY_ARCHIVE
+                    else None
+                ),
+                backend=(
+                    OpenAICompatibleBackend(BACKEND_URL, BACKEND_MODEL, api_key=BACKEND_API_KEY)
+                    if BACKEND_URL
+                    else None
+                ),
+            )
+        except (RuntimeError, ValueError, OSError) as e:
+            _startup_error = str(e)
+            raise HTTPException(status_code=503, detail=f"Detector unavailable: {e}")
+    return detector
+
+
+def _warmup() -> bool:
+    """Build the detector and its Groq clients; record why if that fails."""
+    global _ready, _startup_error
+    try:
+        get_detector().warmup()
+    except HTTPException:
+        return False
+    except Exception as e:
+        _startup_error = f"{type(e).__name__}: {e}"
+        return False
+    _ready = True
+    _startup_error = None
+    return True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Warm up before taking traffic, but never crash the worker: failures are
+    # reported by /readyz so orchestrators can see them.
+    _warmup()
+    yield
 
 
 app = FastAPI(
     title="FallacyLens API (Groq Edition)",
     description="AI-powered logical fallacy detection service using Groq LLMs.",
     version="0.4.0",
+    lifespan=lifespan,
 )
 
-detector = FallacyDetector()
+
+@app.exception_handler(ReplayMiss)
+async def replay_miss_handler(request: Request, exc: ReplayMiss) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": f"Replay archive miss: {exc}"})
 
 
 class AnalyzeRequest(BaseModel):
     text: str
 
 
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str]
+
+
+class CompareRequest(BaseModel):
+    text_a: str
+    text_b: str
+
+
+class ExplainRequest(BaseModel):
+    text: str
+    span_ids: Optional[List[int]] = None
+
+
 class FallacySpanResponse(BaseModel):
     start: int
     end: int
-    text: str
+    text: Optional[str] = None
     fallacy_type: str
     confidence: float
     severity: int
@@ -31,42 +185,495 @@ class FallacySpanResponse(BaseModel):
 
 
 class AnalyzeResponse(BaseModel):
-    original_text: str
+    original_text: Optional[str] = None
     clarity_score: float
     persuasion_score: float
     reliability_score: float
     has_fallacies: bool
+    parse_quality: str = "ok"
+    defaulted_fields: List[str] = []
     fallacies: List[FallacySpanResponse]
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
-def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
-    """Analyze a single piece of text and return detected fallacies + scores."""
-    result: AnalysisResult = detector.analyze(req.text)
-
-    clarity = getattr(result, "clarity_score", 50.0)
-    persuasion = getattr(result, "persuasion_score", 50.0)
-    reliability = getattr(result, "reliability_score", 50.0)
-
-    fallacies = [
-        FallacySpanResponse(
-            start=f.start,
-            end=f.end,
-            text=f.text,
-            fallacy_type=f.fallacy_type,
-            confidence=f.confidence,
-            severity=f.severity,
-            explanation=f.explanation,
-            suggestion=f.suggestion,
+class ExplanationResponse(FallacySpanResponse):
+    id: int
+
+
+class ExplainResponse(BaseModel):
+    explanations: List[ExplanationResponse]
+
+
+class CompareResponse(BaseModel):
+    a: AnalyzeResponse
+    b: AnalyzeResponse
+    score_deltas: Dict[str, float]
+    type_counts_a: Dict[str, int]
+    type_counts_b: Dict[str, int]
+    shared_types: List[str]
+    only_a_types: List[str]
+    only_b_types: List[str]
+
+
+def _encoded_response(
+    payload: dict,
+    fmt: str,
+    compress: Optional[str],
+    headers: Optional[dict] = None,
+) -> Response:
+    """Encode a payload in the requested format/compression, or fail with 406."""
+    try:
+        body, media_type, content_encoding = encode_payload(payload, fmt, compress)
+    except ValueError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    headers = dict(headers or {})
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _etag(analysis_key: str, **representation) -> str:
+    """
+    Strong ETag for one analysis in one representation.
+
+    `analysis_key` already covers text, model, prompt version and detector
+    parameters; the representation options (format, compression, omitted
+    fields) are folded in so each variant gets its own tag.
+    """
+    variant = json.dumps([analysis_key, representation], sort_keys=True)
+    return '"%s"' % hashlib.sha256(variant.encode("utf-8")).hexdigest()[:40]
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def _deadline(request_timeout: Optional[float]) -> float:
+    """Absolute loop-time deadline for a request."""
+    timeout = REQUEST_TIMEOUT
+    if request_timeout is not None and request_timeout > 0:
+        timeout = min(timeout, request_timeout)
+    return asyncio.get_running_loop().time() + timeout
+
+
+async def _admit(deadline: float) -> float:
+    """Take an admission slot, turning overload into a fast 503 with Retry-After."""
+    try:
+        return await admission.acquire(deadline)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
         )
-        for f in result.fallacies
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(admission.retry_after())},
+        )
+
+
+def _check_admission() -> None:
+    """503 + Retry-After right away if a new request would be rejected."""
+    try:
+        admission.check()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+T = TypeVar("T")
+
+
+async def _before_deadline(work: Awaitable[T], deadline: float) -> T:
+    """Run admitted work, giving up with 504 once the deadline passes."""
+    remaining = deadline - asyncio.get_running_loop().time()
+    try:
+        return await asyncio.wait_for(work, max(remaining, 0.001))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analysis did not finish before the deadline.")
+
+
+async def _analyze_before(text: str, deadline: float) -> AnalysisResult:
+    """Run an admitted analysis, giving up with 504 once the deadline passes."""
+    return await _before_deadline(get_detector().analyze_async(text), deadline)
+
+
+@app.get("/healthz")
+async def healthz() -> dict:
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz() -> Response:
+    """Readiness: the detector is configured and its clients are built."""
+    if _ready or _warmup():
+        return Response(content=dumps_json({"status": "ready"}), media_type="application/json")
+    return Response(
+        content=dumps_json({"status": "not ready", "detail": _startup_error}),
+        status_code=503,
+        media_type="application/json",
+    )
+
+
+@app.get("/metrics")
+async def metrics() -> dict:
+    """Detector counters (coalescing, cache) plus admission queue state."""
+    detector_metrics = detector.metrics() if detector is not None else {}
+    return {**detector_metrics, "admission": admission.stats()}
+
+
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(
+    req: AnalyzeRequest,
+    include_text: bool = Query(True, description="Echo `original_text` back."),
+    include_span_text: bool = Query(True, description="Include each span's `text` excerpt."),
+    fmt: str = Query("json", alias="format", description="`json` or `msgpack`."),
+    compress: Optional[str] = Query(None, description="`gzip` or `zstd`."),
+    if_none_match: Optional[str] = Header(None),
+    x_request_timeout: Optional[float] = Header(None),
+) -> Response:
+    """
+    Analyze a single piece of text and return detected fallacies + scores.
+
+    The response is serialized straight from the detector's dataclasses (no
+    per-span pydantic models or re-validation); `AnalyzeResponse` documents
+    its shape.
+
+    Responses carry an `ETag` derived from the analysis inputs. A request whose
+    `If-None-Match` matches it gets a `304 Not Modified` straight from the
+    result cache, without calling Groq. Results the detector does not cache
+    (unparseable or incomplete replies, replay placeholders, near-duplicate
+    reuses, local-model answers) are sent with `Cache-Control: no-store` and
+    no `ETag`, so clients ask again.
+
+    Cache misses go through admission control: when too many requests are
+    queued the call fails fast with 503 + Retry-After, and a request still
+    queued when its deadline passes is dropped before calling Groq.
+    """
+    detector = get_detector()
+    key = detector.cache_key(req.text)
+    etag = _etag(
+        key,
+        include_text=include_text,
+        include_span_text=include_span_text,
+        format=fmt,
+        compress=compress,
+    )
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+
+    result = await detector.acached_result(key)
+    if result is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if result is None:
+        deadline = _deadline(x_request_timeout)
+        admitted_at = await _admit(deadline)
+        try:
+            result = await _analyze_before(req.text, deadline)
+        finally:
+            admission.release(admitted_at)
+        if not detector.is_cached(result, key):
+            headers = {"Cache-Control": "no-store"}
+    payload = result_to_dict(result, include_text, include_span_text)
+    return _encoded_response(payload, fmt, compress, headers)
+
+
+@app.post("/compare", response_model=CompareResponse)
+async def compare(
+    req: CompareRequest,
+    include_text: bool = Query(True, description="Echo each side's `original_text` back."),
+    include_span_text: bool = Query(True, description="Include each span's `text` excerpt."),
+    fmt: str = Query("json", alias="format", description="`json` or `msgpack`."),
+    compress: Optional[str] = Query(None, description="`gzip` or `zstd`."),
+    x_request_timeout: Optional[float] = Header(None),
+) -> Response:
+    """
+    Analyze two texts concurrently and return a structured diff.
+
+    `score_deltas` are B minus A; fallacy types are counted per side and split
+    into shared and side-specific sets. When both analyses are cached the diff
+    is answered without admission; otherwise the pair takes one admission slot.
+    """
+    detector = get_detector()
+    cached = [
+        await detector.acached_result(detector.cache_key(text))
+        for text in (req.text_a, req.text_b)
     ]
+    if all(r is not None for r in cached):
+        comparison = ComparisonResult.from_results(*cached)
+    else:
+        deadline = _deadline(x_request_timeout)
+        admitted_at = await _admit(deadline)
+        try:
+            comparison = await _before_deadline(
+                detector.compare_async(req.text_a, req.text_b), deadline
+            )
+        finally:
+            admission.release(admitted_at)
+
+    payload = comparison_to_dict(comparison, include_text, include_span_text)
+    return _encoded_response(payload, fmt, compress)
+
+
+@app.post("/explain", response_model=ExplainResponse)
+async def explain(
+    req: ExplainRequest,
+    fmt: str = Query("json", alias="format", description="`json` or `msgpack`."),
+    compress: Optional[str] = Query(None, description="`gzip` or `zstd`."),
+    x_request_timeout: Optional[float] = Header(None),
+) -> Response:
+    """
+    Explanations and suggestions for selected spans of an analysis.
+
+    `span_ids` index into the `fallacies` list `/analyze` returned for the same
+    text (all spans when omitted). The analysis normally comes from the cache;
+    only the requested spans are sent to Groq, and their explanations are cached.
+    """
+    detector = get_detector()
+    deadline = _deadline(x_request_timeout)
+    admitted_at = await _admit(deadline)
+    try:
+        result = await _analyze_before(req.text, deadline)
+        spans = await _before_deadline(detector.explain_async(result, req.span_ids), deadline)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        admission.release(admitted_at)
+
+    ids = req.span_ids if req.span_ids is not None else range(len(result.fallacies))
+    payload = {
+        "explanations": [
+            {"id": i, **span_to_dict(span)} for i, span in zip(dict.fromkeys(ids), spans)
+        ]
+    }
+    return _encoded_response(payload, fmt, compress)
+
+
+def _parse_jsonl_texts(body: bytes) -> List[str]:
+    """
+    Parse a JSONL request body into texts.
 
-    return AnalyzeResponse(
-        original_text=result.original_text,
-        clarity_score=clarity,
-        persuasion_score=persuasion,
-        reliability_score=reliability,
-        has_fallacies=result.has_fallacies,
-        fallacies=fallacies,
+    Each non-empty line is either a JSON string or an object with a `text` key.
+    The body is parsed up front so malformed input is rejected with a 400
+    before any results are streamed.
+    """
+    return [_parse_jsonl_line(line) for line in body.splitlines() if line.strip()]
+
+
+def _parse_jsonl_line(line: bytes) -> str:
+    try:
+        item = json.loads(line)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON line in batch body.")
+    if isinstance(item, dict):
+        item = item.get("text")
+    if not isinstance(item, str):
+        raise HTTPException(
+            status_code=400,
+            detail="Each batch line must be a string or an object with a 'text' field.",
+        )
+    return item
+
+
+def _sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps_json(data) + b"\n\n"
+
+
+async def _disconnected(request: Request, interval: float = 0.1) -> None:
+    """Return once the client has gone away."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    req: AnalyzeRequest,
+    request: Request,
+    x_request_timeout: Optional[float] = Header(None),
+) -> StreamingResponse:
+    """
+    Analyze a text and relay results as Server-Sent Events while the model generates.
+
+    Emits one `span` event per FallacySpanResponse, then a `scores` event and a
+    final `summary` event. The connection is watched while the model generates,
+    so a client disconnecting closes the upstream generation at once (even
+    before any event was emitted) and no more tokens are spent on it.
+
+    The stream holds one admission slot until it ends. The slot is taken
+    inside the stream body, so it is always released; a full queue is still
+    answered with 503 up front, and a slot that cannot be had in time becomes
+    an `error` event.
+    """
+    detector = get_detector()
+    deadline = _deadline(x_request_timeout)
+    _check_admission()
+
+    async def _events() -> AsyncIterator[bytes]:
+        try:
+            admitted_at = await admission.acquire(deadline)
+        except (Overloaded, DeadlineExceeded) as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+        events = detector.analyze_stream_async(req.text)
+        gone = asyncio.ensure_future(_disconnected(request))
+        try:
+            while True:
+                step = asyncio.ensure_future(events.__anext__())
+                await asyncio.wait({step, gone}, return_when=asyncio.FIRST_COMPLETED)
+                if not step.done():
+                    # Cancelling the pending step closes the upstream stream.
+                    step.cancel()
+                    await asyncio.gather(step, return_exceptions=True)
+                    break
+                try:
+                    event, payload = step.result()
+                except StopAsyncIteration:
+                    break
+                if event == "span":
+                    yield _sse("span", span_to_dict(payload))
+                elif event == "scores":
+                    yield _sse("scores", payload)
+                elif event == "result":
+                    yield _sse(
+                        "summary",
+                        {
+                            "has_fallacies": payload.has_fallacies,
+                            "fallacy_count": len(payload.fallacies),
+                            "clarity_score": payload.clarity_score,
+                            "persuasion_score": payload.persuasion_score,
+                            "reliability_score": payload.reliability_score,
+                        },
+                    )
+        except Exception as e:
+            yield _sse("error", {"detail": str(e) or type(e).__name__})
+        finally:
+            gone.cancel()
+            await events.aclose()
+            admission.release(admitted_at)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, or 413 as soon as it is known to exceed `limit` bytes."""
+    too_large = HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes.")
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise too_large
+    return bytes(body)
+
+
+async def _analyze_chunk(
+    texts: List[str], offset: int, deadline: float
+) -> AsyncIterator[Tuple[int, Union[AnalysisResult, Exception]]]:
+    """
+    `(index, outcome)` pairs for one admitted batch chunk, in completion order.
+
+    Texts still unfinished when the deadline passes get a DeadlineExceeded outcome.
+    """
+    loop = asyncio.get_running_loop()
+    outcomes = get_detector().analyze_many_async(texts)
+    unfinished = set(range(len(texts)))
+    try:
+        while unfinished:
+            remaining = max(deadline - loop.time(), 0.001)
+            try:
+                index, outcome = await asyncio.wait_for(outcomes.__anext__(), remaining)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                expired = DeadlineExceeded("Analysis did not finish before the deadline.")
+                for index in sorted(unfinished):
+                    yield offset + index, expired
+                return
+            unfinished.discard(index)
+            yield offset + index, outcome
+    finally:
+        await outcomes.aclose()
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    request: Request,
+    x_request_timeout: Optional[float] = Header(None),
+) -> StreamingResponse:
+    """
+    Analyze many texts concurrently and stream results as NDJSON.
+
+    The body is either `{"texts": [...]}` (application/json) or JSONL
+    (application/x-ndjson, application/jsonl), one string or `{"text": ...}`
+    object per line. Each output line is `{"index": i, "result": {...}}` or
+    `{"index": i, "error": "..."}`, emitted in completion order.
+
+    Batches over `FALLACYLENS_MAX_BATCH_TEXTS` texts or `FALLACYLENS_MAX_BATCH_BYTES`
+    bytes get a 413. Texts are admitted in chunks of `FALLACYLENS_BATCH_CHUNK_SIZE`,
+    each holding one admission slot while it runs. Slots are taken inside the
+    stream body, so they are always released; a full queue is still answered
+    with 503 up front. Chunks that cannot be admitted, like texts unfinished at
+    the request deadline, get error lines.
+    """
+    get_detector()
+    body = await _read_body(request, MAX_BATCH_BYTES)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+        texts = _parse_jsonl_texts(body)
+    else:
+        try:
+            texts = BatchAnalyzeRequest(**json.loads(body)).texts
+        except (json.JSONDecodeError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=422,
+                detail="Expected a JSON body of the form {\"texts\": [...]}.",
+            )
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(
+            status_code=413, detail=f"A batch may hold at most {MAX_BATCH_TEXTS} texts."
+        )
+
+    deadline = _deadline(x_request_timeout)
+    _check_admission()
+
+    async def _lines() -> AsyncIterator[bytes]:
+        refused: Optional[Exception] = None
+        for offset in range(0, len(texts), BATCH_CHUNK_SIZE):
+            chunk = texts[offset : offset + BATCH_CHUNK_SIZE]
+            if refused is None and asyncio.get_running_loop().time() >= deadline:
+                refused = DeadlineExceeded("Request deadline passed before it was admitted.")
+            if refused is None:
+                try:
+                    admitted_at = await admission.acquire(deadline)
+                except (Overloaded, DeadlineExceeded) as e:
+                    refused = e
+            if refused is not None:
+                for index in range(offset, offset + len(chunk)):
+                    yield dumps_json({"index": index, "error": str(refused)}) + b"\n"
+                continue
+            try:
+                async for index, outcome in _analyze_chunk(chunk, offset, deadline):
+                    if isinstance(outcome, Exception):
+                        item = {"index": index, "error": str(outcome) or type(outcome).__name__}
+                    else:
+                        item = {"index": index, "result": result_to_dict(outcome)}
+                    yield dumps_json(item) + b"\n"
+            finally:
+                admission.release(admitted_at)
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
@@ -0,0 +1,177 @@
+"""
+Throughput and LLM agreement of the distilled local classifier.
+
+Run from the repository root:
+
+    python benchmarks/bench_distill.py [--docs 2000] [--target 0.95] [--threshold 0.9]
+    python benchmarks/bench_distill.py --cache sqlite:///cache.db
+
+With `--cache`, cached LLM analyses are exported and split 70/10/20 by
+document: the model is trained on the first part, its threshold calibrated
+for `--target` agreement on the second (unless `--threshold` is given), and it
+is scored against the LLM on the rest. Without `--cache` a synthetic corpus
+stands in for the cache. No network calls are made.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from fallacylens.cache import cache_from_url  # noqa: E402
+from fallacylens.distill import DistilledModel, sentence_examples  # noqa: E402
+from fallacylens.models import AnalysisResult, FallacySpan  # noqa: E402
+
+TEMPLATES = {
+    "Ad Hominem": [
+        "You can't trust {who} because {who} is a {insult}.",
+        "Only a {insult} like {who} would believe that.",
+    ],
+    "Bandwagon": [
+        "Everyone already {does}, so it must be right.",
+        "Millions of people {do}, so you should too.",
+    ],
+    "Slippery Slope": [
+        "If we {act} now, soon {thing} will collapse entirely.",
+        "Allowing this means next year {thing} will be gone for good.",
+    ],
+    "False Dilemma": [
+        "Either we {act} or {thing} is finished.",
+        "You are either with {who} or against progress.",
+    ],
+    None: [
+        "The report measured {thing} across three regions over two years.",
+        "{who} presented data on {thing} and invited questions.",
+        "We compared the costs of {thing} with last year's budget.",
+    ],
+}
+FILLERS = {
+    "who": ["the senator", "my neighbour", "the author", "that columnist"],
+    "insult": ["fool", "liar", "hypocrite", "amateur"],
+    "does": ["uses this app", "agrees with the plan", "buys these shoes"],
+    "do": ["vote this way", "follow this diet", "read this blog"],
+    "act": ["raise taxes", "ban cars downtown", "change the curriculum"],
+    "thing": ["the economy", "public transport", "the school system", "local business"],
+}
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(**{k: rng.choice(v) for k, v in FILLERS.items()})
+
+
+def synthetic_results(docs: int, noise: float = 0.1, seed: int = 0):
+    """
+    Documents of 2-6 template sentences, labelled as an LLM would label them.
+
+    A `noise` share of fallacious sentences is left unlabelled, as an LLM
+    sometimes misses a fallacy, so agreement is not trivially perfect.
+    """
+    rng = random.Random(seed)
+    labels = list(TEMPLATES)
+    for _ in range(docs):
+        parts, spans, position = [], [], 0
+        for _ in range(rng.randint(2, 6)):
+            label = rng.choice(labels)
+            sentence = _fill(rng.choice(TEMPLATES[label]), rng)
+            if label is not None and rng.random() >= noise:
+                spans.append(
+                    FallacySpan(position, position + len(sentence), sentence, label, 0.9, 3, "")
+                )
+            parts.append(sentence)
+            position += len(sentence) + 1
+        result = AnalysisResult(original_text=" ".join(parts), fallacies=spans)
+        result.clarity_score = 80.0 - 10 * len(spans)
+        result.persuasion_score = 50.0 + 5 * len(spans)
+        result.reliability_score = 85.0 - 15 * len(spans)
+        yield result
+
+
+def _sentence_labels(predicted: AnalysisResult):
+    for start, end in predicted.text_index.sentences:
+        yield {f.fallacy_type for f in predicted.fallacies if (f.start, f.end) == (start, end)}
+
+
+def _reference_spans(reference: AnalysisResult):
+    """`(sentence start, fallacy type)` pairs of the LLM's labels."""
+    for (start, _), row in zip(reference.text_index.sentences, sentence_examples(reference)):
+        for label in row["labels"]:
+            yield start, label
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--target", type=float, default=0.95)
+    parser.add_argument("--threshold", type=float, help="skip calibration and use this")
+    parser.add_argument("--cache", help="cache URL to export analyses from (sqlite://...)")
+    args = parser.parse_args()
+
+    if args.cache:
+        results = list(cache_from_url(args.cache).results())
+    else:
+        results = list(synthetic_results(args.docs, args.noise))
+    random.Random(1).shuffle(results)
+    split, holdout = int(len(results) * 0.7), int(len(results) * 0.8)
+    train, calibration, test = results[:split], results[split:holdout], results[holdout:]
+
+    rows = [row for r in train for row in sentence_examples(r)]
+    started = time.perf_counter()
+    model = DistilledModel.train(rows)
+    train_s = time.perf_counter() - started
+    print(f"trained on {len(rows)} sentences from {len(train)} analyses in {train_s:.2f}s")
+    threshold = args.threshold
+    if threshold is None:
+        threshold = model.calibrate(calibration, args.target)
+        print(
+            f"calibrated on {len(calibration)} analyses for {args.target:.0%} agreement: "
+            f"threshold {threshold:.4f}, score RMSE "
+            + ", ".join(f"{name} {error:.1f}" for name, error in model.score_errors.items())
+        )
+
+    test_rows = [(r, sentence_examples(r)) for r in test]
+    sentences = sum(len(rows) for _, rows in test_rows)
+    started = time.perf_counter()
+    predictions = [model.predict(r.original_text) for r, _ in test_rows]
+    predict_s = time.perf_counter() - started
+    print(
+        f"local inference: {len(test) / predict_s:,.0f} docs/s, "
+        f"{sentences / predict_s:,.0f} sentences/s"
+    )
+
+    # Agreement with the LLM, sentence by sentence (predicted spans cover whole sentences).
+    exact = tp = fp = fn = 0
+    for (reference, rows), (predicted, _) in zip(test_rows, predictions):
+        for row, labels in zip(rows, _sentence_labels(predicted)):
+            gold = set(row["labels"])
+            exact += gold == labels
+            tp += len(gold & labels)
+            fp += len(labels - gold)
+            fn += len(gold - labels)
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+    print(f"sentence label agreement: {exact / max(sentences, 1):.1%} exact, micro-F1 {f1:.3f}")
+
+    served = [(r, p) for (r, _), (p, c) in zip(test_rows, predictions) if c >= threshold]
+    agree = sum(
+        sorted((f.start, f.fallacy_type) for f in p.fallacies)
+        == sorted((s, t) for s, t in _reference_spans(r))
+        for r, p in served
+    )
+    mae = sum(abs(p.reliability_score - r.reliability_score) for r, p in served) / max(
+        len(served), 1
+    )
+    print(
+        f"threshold {threshold:.4f}: {len(served) / max(len(test), 1):.1%} served locally, "
+        f"{agree / max(len(served), 1):.1%} of those match the LLM exactly, "
+        f"{sum(model.agrees(p, r) for r, p in served) / max(len(served), 1):.1%} "
+        f"with scores within {model.score_tolerance:g}; reliability MAE {mae:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measure cold import time of fallacylens modules against a budget.
+
+Run from the repository root:
+
+    python benchmarks/bench_import.py [--runs 7]
+
+Each module is imported in a fresh interpreter; the median over all runs is
+compared with its budget and the script exits non-zero if any budget is
+exceeded, so it can gate CI. Budgets cover the import itself, not
+interpreter startup.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Milliseconds. The lightweight entry points must not pull in the detector,
+# asyncio or the Groq SDK; the detector itself must not pull in the SDK.
+BUDGETS_MS = {
+    "fallacylens": 5.0,
+    "fallacylens.taxonomy": 5.0,
+    "fallacylens.models": 25.0,
+    "fallacylens.detector": 120.0,
+}
+
+_PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {module}\n"
+    "print((time.perf_counter() - t) * 1000)\n"
+)
+
+
+def measure(module: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<24}{'median ms':>12}{'budget ms':>12}")
+    for module, budget in BUDGETS_MS.items():
+        ms = measure(module, args.runs)
+        over = ms > budget
+        failed |= over
+        print(f"{module:<24}{ms:>12.1f}{budget:>12.1f}{'  OVER BUDGET' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
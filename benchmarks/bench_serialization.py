@@ -0,0 +1,129 @@
+"""
+Compare the pydantic response path with the fast serialization path for /analyze.
+
+Run from the repository root:
+
+    python benchmarks/bench_serialization.py [--chars 100000] [--spans 300]
+
+No network calls are made; results are synthetic.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# api.main builds a detector on import; it never calls Groq here.
+os.environ.setdefault("GROQ_API_KEY", "benchmark-only")
+
+from api.main import AnalyzeResponse, FallacySpanResponse  # noqa: E402
+from fallacylens.models import AnalysisResult, FallacySpan  # noqa: E402
+from fallacylens.serialization import encode_payload, result_to_dict  # noqa: E402
+
+
+def make_result(chars: int, spans: int) -> AnalysisResult:
+    sentence = "Everyone knows this policy is a disaster, so we must reject it. "
+    text = (sentence * (chars // len(sentence) + 1))[:chars]
+    step = max(1, chars // max(spans, 1))
+    fallacies = [
+        FallacySpan(
+            start=i * step,
+            end=min(chars, i * step + 60),
+            text=text[i * step : i * step + 60],
+            fallacy_type="Bandwagon",
+            confidence=0.87,
+            severity=3,
+            explanation="Appeals to popularity instead of evidence for the claim.",
+            suggestion="Cite evidence that the policy fails on its own terms.",
+        )
+        for i in range(spans)
+    ]
+    result = AnalysisResult(original_text=text, fallacies=fallacies)
+    result.clarity_score = 61.0
+    result.persuasion_score = 48.0
+    result.reliability_score = 35.0
+    return result
+
+
+def pydantic_path(result: AnalysisResult) -> bytes:
+    """The pre-fast-path /analyze serialization: per-span models + validation."""
+    response = AnalyzeResponse(
+        original_text=result.original_text,
+        clarity_score=result.clarity_score,
+        persuasion_score=result.persuasion_score,
+        reliability_score=result.reliability_score,
+        has_fallacies=result.has_fallacies,
+        fallacies=[
+            FallacySpanResponse(
+                start=f.start,
+                end=f.end,
+                text=f.text,
+                fallacy_type=f.fallacy_type,
+                confidence=f.confidence,
+                severity=f.severity,
+                explanation=f.explanation,
+                suggestion=f.suggestion,
+            )
+            for f in result.fallacies
+        ],
+    )
+    validated = AnalyzeResponse.model_validate(response.model_dump())
+    return validated.model_dump_json().encode("utf-8")
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed * 1000, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chars", type=int, default=100_000)
+    parser.add_argument("--spans", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    result = make_result(args.chars, args.spans)
+    cases = [
+        ("pydantic (current)", lambda: pydantic_path(result)),
+        ("pydantic + gzip", lambda: gzip.compress(pydantic_path(result), compresslevel=5)),
+        ("fast json", lambda: encode_payload(result_to_dict(result))[0]),
+        (
+            "fast json, no text",
+            lambda: encode_payload(result_to_dict(result, False, False))[0],
+        ),
+        (
+            "fast json, no text, gzip",
+            lambda: encode_payload(result_to_dict(result, False, False), "json", "gzip")[0],
+        ),
+    ]
+    for name, optional in (("msgpack", ("msgpack", None)), ("zstd", ("json", "zstd"))):
+        try:
+            encode_payload({}, *optional)
+        except ValueError:
+            print(f"(skipping {name}: optional package not installed)")
+            continue
+        cases.append(
+            (
+                f"fast {name}, no text",
+                lambda o=optional: encode_payload(result_to_dict(result, False, False), *o)[0],
+            )
+        )
+
+    print(f"{args.chars} chars, {args.spans} spans, mean of {args.repeat} runs")
+    print(f"{'path':<28}{'ms/op':>10}{'bytes':>12}")
+    for name, fn in cases:
+        ms, size = timed(fn, args.repeat)
+        print(f"{name:<28}{ms:>10.3f}{size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
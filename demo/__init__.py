@@ -0,0 +1 @@
+"""Streamlit demo app for FallacyLens (`streamlit run demo/app.py`)."""
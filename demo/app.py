@@ -1,7 +1,11 @@
 import os
 import sys
-import io
 import html  # for escaping Excerpt / Explanation / Suggestion text
+import functools
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional
 
 # Make sure we can import the local `fallacylens` package
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -11,12 +15,17 @@ if PROJECT_ROOT not in sys.path:
 import streamlit as st
 import streamlit.components.v1 as components  # ✅ ADDED (for typing animation JS)
 import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 
 from fallacylens.detector import FallacyDetector
-from fallacylens.models import FallacySpan
+from fallacylens.cache import MemoryCache
+from fallacylens.highlight import page_bounds, render_html as render_highlight_html
+from fallacylens.models import AnalysisResult, ComparisonResult, FallacySpan
+from fallacylens.parsing import parse_incomplete
+from fallacylens.serialization import dumps_json, result_to_dict
 from fallacylens.taxonomy import FALLACY_DEFINITIONS
+from fallacylens.text import TextIndex
+
+from demo.report import ReportJobs, render_reports_zip, report_key, report_process_pool
 
 
 # ===========================
@@ -846,46 +855,29 @@ if "report_mode_label" not in st.session_state:
 # ===========================
 # UTILS
 # ===========================
-def highlight_fallacies(text: str, fallacies: list[FallacySpan]) -> str:
-    """Return HTML with highlighted spans and tooltip definitions."""
-    from html import escape
-
-    if not fallacies:
-        return f"<div class='highlighted-text'>{escape(text)}</div>"
-
-    fallacies_sorted = sorted(fallacies, key=lambda f: f.start)
-    segments: list[str] = []
-    cursor = 0
-
-    def color_for(f: FallacySpan) -> str:
-        if f.severity >= 4:
-            return "rgba(255, 99, 132, 0.35)"  # severe
-        if f.severity == 3:
-            return "rgba(255, 205, 86, 0.35)"  # medium
-        return "rgba(76, 201, 130, 0.35)"      # minor
-
-    for f in fallacies_sorted:
-        if f.start > cursor:
-            segments.append(escape(text[cursor:f.start]))
-
-        span_text = escape(text[f.start:f.end])
-        definition = FALLACY_DEFINITIONS.get(f.fallacy_type, "").replace('"', "'")
-        tooltip_parts = [f"{f.fallacy_type} (severity {f.severity}/5)"]
-        if definition:
-            tooltip_parts.append(definition)
-        tooltip = " — ".join(tooltip_parts)
-
-        segments.append(
-            f"<span style='background:{color_for(f)}; "
-            f"border-radius:4px; padding:0 2px; cursor:help;' "
-            f"title=\"{escape(tooltip)}\">{span_text}</span>"
+def highlight_fallacies(
+    text: str, fallacies: list[FallacySpan], start: int = 0, end: Optional[int] = None
+) -> str:
+    """Return HTML with highlighted spans and tooltip definitions for text[start:end]."""
+    return render_highlight_html(text, fallacies, start, end)
+
+
+def show_highlighted(result: AnalysisResult, key: str) -> None:
+    """Render highlighted text; long documents are shown one page at a time."""
+    text, fallacies = result.original_text, result.fallacies
+    pages = page_bounds(result.text_index)
+    start, end = pages[0]
+    if len(pages) > 1:
+        page = st.number_input(
+            f"Page (of {len(pages)})", min_value=1, max_value=len(pages), value=1, key=key
         )
-        cursor = f.end
-
-    if cursor < len(text):
-        segments.append(escape(text[cursor:]))
-
-    return "<div class='highlighted-text'>" + "".join(segments) + "</div>"
+        start, end = pages[int(page) - 1]
+        on_page = sum(1 for f in fallacies if f.start < end and f.end > start)
+        st.caption(
+            f"Characters {start:,}–{end:,} of {len(text):,} · "
+            f"{on_page} highlighted span(s) on this page"
+        )
+    st.markdown(highlight_fallacies(text, fallacies, start, end), unsafe_allow_html=True)
 
 
 def render_green_box(title: str, body: str) -> None:
@@ -901,98 +893,273 @@ def render_green_box(title: str, body: str) -> None:
     )
 
 
-def generate_pdf_report(
-    text: str,
-    fallacies: list[FallacySpan],
-    clarity: float,
-    persuasion: float,
-    reliability: float,
-    mode_label: str = "Single text · Core analysis",
-) -> bytes:
-    """Generate a PDF report and return its bytes."""
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4  # noqa: F841
-
-    def write_line(y: float, content: str, font_size: int = 11, bold: bool = False):
-        if bold:
-            c.setFont("Helvetica-Bold", font_size)
-        else:
-            c.setFont("Helvetica", font_size)
-        c.drawString(40, y, content)
-
-    y = height - 50
-    write_line(y, "FallacyLens Report", 16, bold=True)
-    y -= 20
-    write_line(y, f"Mode: {mode_label}", 10)
-    y -= 26
-
-    write_line(y, f"Clarity score: {clarity:.1f} / 100", 11)
-    y -= 18
-    write_line(y, f"Persuasion score: {persuasion:.1f} / 100", 11)
-    y -= 18
-    write_line(y, f"Reliability score: {reliability:.1f} / 100", 11)
-    y -= 30
-
-    write_line(y, "Original text:", 12, bold=True)
-    y -= 18
-
-    import textwrap
-
-    wrapped = textwrap.wrap(text, width=90)
-    for line in wrapped:
-        if y < 80:
-            c.showPage()
-            y = height - 60
-            c.setFont("Helvetica", 11)
-        c.drawString(40, y, line)
-        y -= 14
-
-    y -= 24
-    write_line(y, "Detected fallacies:", 12, bold=True)
-    y -= 18
-
-    if not fallacies:
-        write_line(y, "None detected with the current model.", 11)
+# ===========================
+# CACHED DETECTOR + RESULTS
+# ===========================
+# Upper bound on memoized results per function; oldest entries are evicted.
+ANALYSIS_CACHE_ENTRIES = 256
+
+
+@st.cache_resource(show_spinner=False)
+def get_detector() -> FallacyDetector:
+    """One detector (and Groq client) per server process, reused across reruns."""
+    # The detector's own cache lets compare() reuse results from the other tabs.
+    return FallacyDetector(cache=MemoryCache(ANALYSIS_CACHE_ENTRIES))
+
+
+class _NotMemoized(Exception):
+    """Carries a result out of an `st.cache_data` function without memoizing it."""
+
+    def __init__(self, value):
+        super().__init__("result not memoized")
+        self.value = value
+
+
+def _parse_failed(value) -> bool:
+    if isinstance(value, ComparisonResult):
+        return _parse_failed(value.a) or _parse_failed(value.b)
+    if isinstance(value, dict):
+        return value.get("parse_quality") in ("failed", "synthesized")
+    return parse_incomplete(value)
+
+
+def _memoizable(value, *inputs):
+    """Return `value`, or raise _NotMemoized if it (or an input) failed to parse."""
+    if _parse_failed(value) or any(_parse_failed(v) for v in inputs):
+        raise _NotMemoized(value)
+    return value
+
+
+def _unless_failed(cached_fn):
+    """
+    Call an `st.cache_data` function; results it refused to memoize (failed
+    parses) are returned as-is, so a transient model failure is retried on the
+    next call instead of sticking for the whole cache lifetime.
+    """
+
+    @functools.wraps(cached_fn)
+    def call(*args, **kwargs):
+        try:
+            return cached_fn(*args, **kwargs)
+        except _NotMemoized as e:
+            return e.value
+
+    return call
+
+
+# Memoized on (text, model). Helpers that take no model argument use the
+# detector's configured model, so that is what their cache key carries.
+@_unless_failed
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _analyze(text: str, model_id: str) -> AnalysisResult:
+    return _memoizable(get_detector().analyze(text, model=model_id))
+
+
+def cached_analyze(text: str, model_id: Optional[str] = None) -> AnalysisResult:
+    """Core analysis memoized on (text, model), shared by every tab."""
+    return _analyze(text, model_id or get_detector().model)
+
+
+@_unless_failed
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _compare(text_a: str, text_b: str, model_id: str) -> ComparisonResult:
+    return _memoizable(get_detector().compare(text_a, text_b, model=model_id))
+
+
+def cached_compare(text_a: str, text_b: str, model_id: Optional[str] = None) -> ComparisonResult:
+    """Both sides analyzed concurrently (through the detector cache) and diffed."""
+    return _compare(text_a, text_b, model_id or get_detector().model)
+
+
+def _analysis_key(result: AnalysisResult) -> str:
+    """Content hash of an analysis, so helpers can be memoized on the result shown."""
+    return hashlib.sha256(dumps_json(result_to_dict(result))).hexdigest()
+
+
+# Feedback helpers work from the analysis on screen (which may come from the
+# incremental path) rather than re-analyzing its text. `_analysis` is not
+# hashed by Streamlit; `key` (its content hash) stands in for it.
+@_unless_failed
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _teacher_feedback(key: str, model_id: str, _analysis: AnalysisResult) -> dict:
+    return _memoizable(get_detector().teacher_feedback(_analysis), _analysis)
+
+
+def cached_teacher_feedback(result: AnalysisResult) -> dict:
+    return _teacher_feedback(_analysis_key(result), get_detector().model, result)
+
+
+@_unless_failed
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _optimize_persuasion(key: str, model_id: str, _analysis: AnalysisResult) -> dict:
+    return _memoizable(get_detector().optimize_persuasion(_analysis), _analysis)
+
+
+def cached_optimize_persuasion(result: AnalysisResult) -> dict:
+    return _optimize_persuasion(_analysis_key(result), get_detector().model, result)
+
+
+@_unless_failed
+@st.cache_data(max_entries=ANALYSIS_CACHE_ENTRIES, show_spinner=False)
+def _analyze_bias(text: str, model_id: str, _index: Optional[TextIndex] = None) -> dict:
+    # `_index` (the text's TextIndex, if already built) is not hashed by Streamlit.
+    return _memoizable(get_detector().analyze_bias(text, _index))
+
+
+def cached_analyze_bias(text: str, index: Optional[TextIndex] = None) -> dict:
+    return _analyze_bias(text, get_detector().model, index)
+
+
+@st.cache_resource(show_spinner=False)
+def get_report_jobs() -> ReportJobs:
+    """PDF reports rendered so far (by content hash), shared across reruns and sessions."""
+    return ReportJobs()
+
+
+@st.fragment(run_every=1.0)
+def wait_for_pdf_report(result: AnalysisResult, mode_label: str) -> None:
+    """Poll a background PDF render; rerun the page once it is ready."""
+    if get_report_jobs().get(result, mode_label).done():
+        st.rerun()
+    st.caption("Rendering the PDF report in the background…")
+
+
+def render_pdf_export(result: AnalysisResult, mode_label: str) -> None:
+    """Build the PDF only once asked for, then offer it for download."""
+    key = report_key(result, mode_label)
+    if st.session_state.get("pdf_requested") != key:
+        if st.button("Prepare PDF report", key="prepare_pdf"):
+            st.session_state.pdf_requested = key
+            st.rerun()
+        return
+
+    job = get_report_jobs().get(result, mode_label)
+    if not job.done():
+        wait_for_pdf_report(result, mode_label)
+    elif job.exception() is not None:
+        st.error(f"Could not build the PDF report: {job.exception()}")
     else:
-        for f in fallacies:
-            if y < 80:
-                c.showPage()
-                y = height - 60
-            line = f"- {f.fallacy_type} (severity {f.severity}/5, confidence {f.confidence:.2f})"
-            c.drawString(40, y, line)
-            y -= 14
-
-            expl_lines = textwrap.wrap(f"Explanation: {f.explanation}", width=90)
-            for el in expl_lines:
-                if y < 80:
-                    c.showPage()
-                    y = height - 60
-                c.drawString(60, y, el)
-                y -= 12
-
-            if f.suggestion:
-                sugg_lines = textwrap.wrap(f"Suggestion: {f.suggestion}", width=90)
-                for sl in sugg_lines:
-                    if y < 80:
-                        c.showPage()
-                        y = height - 60
-                    c.drawString(60, y, sl)
-                    y -= 12
-
-            y -= 8
-
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer.getvalue()
+        st.download_button(
+            label="⬇️ Export PDF report",
+            data=job.result(),
+            file_name="fallacylens_report.pdf",
+            mime="application/pdf",
+        )
+
+
+@st.cache_resource(show_spinner=False)
+def get_report_pool() -> ProcessPoolExecutor:
+    """PDF render workers, started once per server process instead of on every rerun."""
+    return report_process_pool()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_batch_reports(keys: tuple, _items: list) -> bytes:
+    """Zip of per-row PDFs, memoized on the rows' report hashes."""
+    return render_reports_zip(_items, get_report_pool())
+
+
+def render_batch_reports(rows: list[dict], model_id: str) -> None:
+    """Multi-document export: one PDF per analyzed row, rendered across processes."""
+    if st.button("Build PDF reports (zip)", key="build_batch_pdfs"):
+        items = [
+            (
+                f"fallacylens_row_{r['row_index']}.pdf",
+                cached_analyze(r["text"], model_id),
+                "Batch · Core analysis",
+            )
+            for r in sorted(rows, key=lambda r: r["row_index"])
+            if not r["error"]
+        ]
+        with st.spinner(f"Rendering {len(items)} PDF reports…"):
+            keys = tuple(report_key(res, mode) for _, res, mode in items)
+            st.session_state.batch_reports_zip = cached_batch_reports(keys, items)
+
+    if st.session_state.get("batch_reports_zip"):
+        st.download_button(
+            "⬇️ Download PDF reports (zip)",
+            data=st.session_state.batch_reports_zip,
+            file_name="fallacylens_batch_reports.zip",
+            mime="application/zip",
+        )
+
+
+# Rows of a CSV batch analyzed at once (each row is one Groq call).
+BATCH_WORKERS = 4
+
+
+def batch_row(idx, text: str, res: Optional[AnalysisResult] = None, error: str = "") -> dict:
+    """One summary-table row for the batch tab."""
+    return {
+        "row_index": idx,
+        "text": text,
+        "clarity_score": float(getattr(res, "clarity_score", 50.0)) if res else None,
+        "persuasion_score": float(getattr(res, "persuasion_score", 50.0)) if res else None,
+        "reliability_score": float(getattr(res, "reliability_score", 50.0)) if res else None,
+        "fallacy_count": len(res.fallacies) if res else None,
+        "error": error,
+    }
+
+
+def render_batch_summary(rows: list[dict], total: int, show_download: bool = True) -> None:
+    """Running aggregates + summary table (+ CSV download) for the batch tab."""
+    out_df = pd.DataFrame(rows).sort_values("row_index")
+    ok = out_df[out_df["error"] == ""]
+
+    a1, a2, a3, a4 = st.columns(4)
+    with a1:
+        st.metric("Rows analyzed", f"{len(out_df)} / {total}")
+    with a2:
+        st.metric("Avg clarity", f"{ok['clarity_score'].mean():.1f}" if len(ok) else "–")
+    with a3:
+        st.metric("Avg reliability", f"{ok['reliability_score'].mean():.1f}" if len(ok) else "–")
+    with a4:
+        st.metric("Total fallacies", int(ok["fallacy_count"].sum()) if len(ok) else 0)
+
+    st.markdown("#### Summary table")
+    st.dataframe(out_df)
+    if show_download:
+        csv_bytes = out_df.to_csv(index=False).encode("utf-8")
+        st.download_button(
+            "⬇️ Download results as CSV",
+            data=csv_bytes,
+            file_name="fallacylens_batch_results.csv",
+            mime="text/csv",
+        )
 
 
 def run_model_analysis(detector: FallacyDetector, text: str, model_id: str):
     """Helper for multi-model tab."""
-    if hasattr(detector, "analyze_with_model_name"):
-        return detector.analyze_with_model_name(text, model_id)
-    return detector.analyze(text)
+    return cached_analyze(text, model_id)
+
+
+def timed_model_analysis(detector: FallacyDetector, text: str, model_id: str):
+    """Run one model for the multi-model tab; returns (result, error, wall seconds)."""
+    started = time.perf_counter()
+    try:
+        res, error = run_model_analysis(detector, text, model_id), ""
+    except Exception as e:
+        res, error = None, str(e)
+    return res, error, time.perf_counter() - started
+
+
+def model_row(label: str, model_id: str, res, error: str, wall_s: float) -> dict:
+    """One row of the multi-model score / latency / token table."""
+    usage = (getattr(res, "usage", None) or {}) if res is not None else {}
+    return {
+        "model_label": label,
+        "model_id": model_id,
+        "clarity": float(getattr(res, "clarity_score", 50.0)) if res else None,
+        "persuasion": float(getattr(res, "persuasion_score", 50.0)) if res else None,
+        "reliability": float(getattr(res, "reliability_score", 50.0)) if res else None,
+        "fallacy_count": len(res.fallacies) if res else None,
+        # Upstream call latency when known; a cached rerun keeps the original figure.
+        "latency_s": round(usage.get("latency_s", wall_s), 2),
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "total_tokens": usage.get("total_tokens"),
+        "error": error,
+    }
 
 
 # ===========================
@@ -1030,7 +1197,7 @@ st.caption(
 
 st.write("")
 
-detector = FallacyDetector()
+detector = get_detector()
 
 tab_single, tab_batch, tab_compare, tab_models = st.tabs(
     ["Single text", "Batch analysis", "Compare two arguments", "Multi-model comparison"]
@@ -1071,6 +1238,15 @@ If we allow students to use phones in class, soon nobody will study at all.
             height=320,
         )
 
+        incremental = st.checkbox(
+            "Re-analyze only edited paragraphs",
+            key="incremental_single",
+            help=(
+                "Each paragraph is analyzed on its own; after an edit only changed "
+                "paragraphs are sent to Groq and scores are combined per paragraph."
+            ),
+        )
+
         # Centered Analyze button (not full width)
         b1, b2, b3 = st.columns([1, 0.6, 1])
         with b2:
@@ -1125,7 +1301,17 @@ If we allow students to use phones in class, soon nobody will study at all.
             st.warning("Please enter some text first.")
         else:
             with st.spinner("Analyzing argument with Groq…"):
-                res = detector.analyze(text)
+                if incremental:
+                    res = detector.analyze_incremental(
+                        text, previous=st.session_state.last_result, model=detector.model
+                    )
+                else:
+                    res = cached_analyze(text, detector.model)
+            if incremental:
+                st.caption(
+                    f"Re-analyzed {res.reanalyzed_units} of {len(res.units)} paragraph(s); "
+                    "the rest were reused from the previous analysis."
+                )
 
             st.session_state.last_result = res
             st.session_state.last_text = text
@@ -1152,6 +1338,14 @@ If we allow students to use phones in class, soon nobody will study at all.
         with m4:
             st.metric("Fallacies detected", len(result.fallacies))
 
+        parse_quality = getattr(result, "parse_quality", "ok")
+        if parse_quality == "repaired":
+            st.warning("The model's reply was cut off; only the complete fallacy entries are shown.")
+        elif parse_quality == "failed":
+            st.warning("The model's reply could not be parsed; scores are neutral defaults. Try again.")
+        elif parse_quality == "synthesized":
+            st.warning("No recorded reply for this text in the replay archive; scores are placeholders.")
+
         # Legend row
         st.markdown(
             """
@@ -1228,9 +1422,8 @@ If we allow students to use phones in class, soon nobody will study at all.
             """,
             unsafe_allow_html=True,
         )
-        html_text = highlight_fallacies(result.original_text, result.fallacies)
         st.markdown('<div class="neon-highlight-shell">', unsafe_allow_html=True)
-        st.markdown(html_text, unsafe_allow_html=True)
+        show_highlighted(result, key="highlight_page")
         st.markdown("</div>", unsafe_allow_html=True)
 
         # ===== Detected fallacies section (wrapped in white neon shell) =====
@@ -1402,7 +1595,7 @@ If we allow students to use phones in class, soon nobody will study at all.
 
             if teacher_clicked:
                 with st.spinner("Generating teacher-style feedback…"):
-                    feedback = detector.teacher_feedback(result)
+                    feedback = cached_teacher_feedback(result)
 
                 st.session_state.report_mode_label = "Single text · Teacher feedback"
 
@@ -1462,7 +1655,7 @@ If we allow students to use phones in class, soon nobody will study at all.
 
             if persuasion_clicked:
                 with st.spinner("Optimizing persuasion (while staying honest)…"):
-                    opt = detector.optimize_persuasion(result)
+                    opt = cached_optimize_persuasion(result)
 
                 st.session_state.report_mode_label = "Single text · Persuasion optimizer"
 
@@ -1512,7 +1705,7 @@ If we allow students to use phones in class, soon nobody will study at all.
 
             if bias_clicked:
                 with st.spinner("Reviewing text for potential bias…"):
-                    bias = detector.analyze_bias(result.original_text)
+                    bias = cached_analyze_bias(result.original_text, result.text_index)
 
                 st.session_state.report_mode_label = "Single text · Bias detector"
 
@@ -1562,20 +1755,7 @@ If we allow students to use phones in class, soon nobody will study at all.
             )
 
             st.caption(f"Current PDF mode: {st.session_state.report_mode_label}")
-            pdf_bytes = generate_pdf_report(
-                st.session_state.last_text,
-                result.fallacies,
-                clarity,
-                persuasion,
-                reliability,
-                mode_label=st.session_state.report_mode_label,
-            )
-            st.download_button(
-                label="⬇️ Export PDF report",
-                data=pdf_bytes,
-                file_name="fallacylens_report.pdf",
-                mime="application/pdf",
-            )
+            render_pdf_export(result, st.session_state.report_mode_label)
 
             st.markdown("</div>", unsafe_allow_html=True)
 
@@ -1623,40 +1803,71 @@ with tab_batch:
             if "text" not in df.columns:
                 st.error("CSV must contain a 'text' column.")
             else:
-                results_data = []
-                with st.spinner("Running batch analysis (this may take a while)…"):
-                    for idx, row in df.iterrows():
-                        t = str(row["text"])
-                        if not t.strip():
-                            continue
-                        res = detector.analyze(t)
-                        clarity = float(getattr(res, "clarity_score", 50.0))
-                        persuasion = float(getattr(res, "persuasion_score", 50.0))
-                        reliability = float(getattr(res, "reliability_score", 50.0))
-                        results_data.append(
-                            {
-                                "row_index": idx,
-                                "text": t,
-                                "clarity_score": clarity,
-                                "persuasion_score": persuasion,
-                                "reliability_score": reliability,
-                                "fallacy_count": len(res.fallacies),
-                            }
-                        )
-
-                if results_data:
-                    out_df = pd.DataFrame(results_data)
-                    st.markdown("#### Summary table")
-                    st.dataframe(out_df)
-                    csv_bytes = out_df.to_csv(index=False).encode("utf-8")
-                    st.download_button(
-                        "⬇️ Download results as CSV",
-                        data=csv_bytes,
-                        file_name="fallacylens_batch_results.csv",
-                        mime="text/csv",
-                    )
-                else:
-                    st.info("No non-empty rows were found in the 'text' column.")
+                jobs = [
+                    (idx, str(row["text"]))
+                    for idx, row in df.iterrows()
+                    if str(row["text"]).strip()
+                ]
+                # Results live in session state as they arrive, so they survive
+                # the rerun triggered by the Stop button.
+                st.session_state.batch_rows = []
+                st.session_state.batch_total = len(jobs)
+                st.session_state.batch_complete = False
+                st.session_state.batch_reports_zip = None
+
+                if jobs:
+                    pb1, pb2 = st.columns([4, 1])
+                    with pb1:
+                        progress = st.progress(0.0, text=f"Analyzed 0 / {len(jobs)} rows")
+                    with pb2:
+                        # Clicking interrupts this run; finished rows are kept.
+                        st.button("Stop", key="stop_batch")
+                    live_summary = st.empty()
+
+                    executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+                    try:
+                        futures = {
+                            executor.submit(cached_analyze, t, detector.model): (idx, t)
+                            for idx, t in jobs
+                        }
+                        last_render = 0.0
+                        for done, future in enumerate(as_completed(futures), start=1):
+                            idx, t = futures[future]
+                            try:
+                                st.session_state.batch_rows.append(
+                                    batch_row(idx, t, future.result())
+                                )
+                            except Exception as e:
+                                st.session_state.batch_rows.append(batch_row(idx, t, error=str(e)))
+
+                            progress.progress(
+                                done / len(jobs), text=f"Analyzed {done} / {len(jobs)} rows"
+                            )
+                            # Re-render the table at most a few times per second.
+                            now = time.monotonic()
+                            if done == len(jobs) or now - last_render > 0.3:
+                                with live_summary.container():
+                                    render_batch_summary(
+                                        st.session_state.batch_rows, len(jobs), show_download=False
+                                    )
+                                last_render = now
+                        st.session_state.batch_complete = True
+                    finally:
+                        # On Stop (or any error) drop queued rows instead of waiting for them.
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    live_summary.empty()
+
+    if st.session_state.get("batch_rows") is not None:
+        if st.session_state.batch_rows:
+            if not st.session_state.get("batch_complete"):
+                st.info("Batch stopped early; showing the rows analyzed so far.")
+            render_batch_summary(
+                st.session_state.batch_rows,
+                st.session_state.get("batch_total", 0),
+            )
+            render_batch_reports(st.session_state.batch_rows, detector.model)
+        elif st.session_state.get("batch_total") == 0:
+            st.info("No non-empty rows were found in the 'text' column.")
 
 
 # ===========================
@@ -1696,8 +1907,8 @@ with tab_compare:
             st.warning("Please fill both arguments before comparing.")
         else:
             with st.spinner("Analyzing both arguments with Groq…"):
-                res_a = detector.analyze(text_a)
-                res_b = detector.analyze(text_b)
+                comparison = cached_compare(text_a, text_b, detector.model)
+            res_a, res_b = comparison.a, comparison.b
 
             clarity_a = float(getattr(res_a, "clarity_score", 50.0))
             persuasion_a = float(getattr(res_a, "persuasion_score", 50.0))
@@ -1721,20 +1932,44 @@ with tab_compare:
                 st.metric("Reliability", f"{reliability_b:.1f} / 100")
                 st.metric("Fallacies", len(res_b.fallacies))
 
+            st.markdown("#### Differences (B vs A)")
+            d1, d2, d3 = st.columns(3)
+            for col, name, label in (
+                (d1, "clarity_score", "Clarity"),
+                (d2, "persuasion_score", "Persuasion"),
+                (d3, "reliability_score", "Reliability"),
+            ):
+                with col:
+                    st.metric(f"{label} Δ", f"{comparison.score_deltas[name]:+.1f}")
+
+            type_rows = [
+                {
+                    "fallacy_type": f_type,
+                    "count_a": comparison.type_counts_a.get(f_type, 0),
+                    "count_b": comparison.type_counts_b.get(f_type, 0),
+                    "found_in": (
+                        "both" if f_type in comparison.shared_types
+                        else "A only" if f_type in comparison.only_a_types
+                        else "B only"
+                    ),
+                }
+                for f_type in (
+                    comparison.shared_types + comparison.only_a_types + comparison.only_b_types
+                )
+            ]
+            if type_rows:
+                st.dataframe(pd.DataFrame(type_rows))
+            else:
+                st.caption("Neither argument contains detected fallacies.")
+
             st.markdown("#### Highlighted arguments")
             hcol1, hcol2 = st.columns(2)
             with hcol1:
                 st.markdown("**Argument A**", unsafe_allow_html=True)
-                st.markdown(
-                    highlight_fallacies(text_a, res_a.fallacies),
-                    unsafe_allow_html=True,
-                )
+                show_highlighted(res_a, key="highlight_page_a")
             with hcol2:
                 st.markdown("**Argument B**", unsafe_allow_html=True)
-                st.markdown(
-                    highlight_fallacies(text_b, res_b.fallacies),
-                    unsafe_allow_html=True,
-                )
+                show_highlighted(res_b, key="highlight_page_b")
 
 
 # ===========================
@@ -1791,37 +2026,23 @@ with tab_models:
         elif not selected_labels:
             st.warning("Please select at least one model.")
         else:
+            # Every selected model runs at once; rows appear as each one finishes.
             rows = []
+            table_slot = st.empty()
             with st.spinner("Running analysis across selected models…"):
-                for label in selected_labels:
-                    model_id = MODEL_CHOICES[label]
-                    try:
-                        res = run_model_analysis(detector, mm_text, model_id)
-                        rows.append(
-                            {
-                                "model_label": label,
-                                "model_id": model_id,
-                                "clarity": float(getattr(res, "clarity_score", 50.0)),
-                                "persuasion": float(getattr(res, "persuasion_score", 50.0)),
-                                "reliability": float(getattr(res, "reliability_score", 50.0)),
-                                "fallacy_count": len(res.fallacies),
-                                "error": "",
-                            }
-                        )
-                    except Exception as e:
-                        rows.append(
-                            {
-                                "model_label": label,
-                                "model_id": model_id,
-                                "clarity": None,
-                                "persuasion": None,
-                                "reliability": None,
-                                "fallacy_count": None,
-                                "error": str(e),
-                            }
-                        )
+                with ThreadPoolExecutor(max_workers=len(selected_labels)) as pool:
+                    futures = {
+                        pool.submit(timed_model_analysis, detector, mm_text, MODEL_CHOICES[label]): label
+                        for label in selected_labels
+                    }
+                    for future in as_completed(futures):
+                        label = futures[future]
+                        rows.append(model_row(label, MODEL_CHOICES[label], *future.result()))
+                        table_slot.dataframe(pd.DataFrame(rows))
+            table_slot.empty()
 
             if rows:
+                rows.sort(key=lambda r: selected_labels.index(r["model_label"]))
                 df_models = pd.DataFrame(rows)
-                st.markdown("#### Score comparison")
+                st.markdown("#### Score, latency & token comparison")
                 st.dataframe(df_models)
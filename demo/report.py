@@ -0,0 +1,193 @@
+"""PDF reports for the Streamlit demo: rendering, caching and batch export."""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from fallacylens.models import AnalysisResult
+from fallacylens.serialization import dumps_json, result_to_dict
+
+LEFT_MARGIN = 40
+BOTTOM_MARGIN = 80
+
+# Texts longer than this are rendered on a worker thread instead of inline.
+LARGE_REPORT_CHARS = 20_000
+
+
+def report_key(result: AnalysisResult, mode_label: str) -> str:
+    """Content hash of everything that ends up in the PDF."""
+    payload = dumps_json([result_to_dict(result), mode_label])
+    return hashlib.sha256(payload).hexdigest()
+
+
+class _PdfWriter:
+    """Writes wrapped lines through text objects, starting new pages as needed."""
+
+    def __init__(self, buffer: io.BytesIO):
+        self.canvas = canvas.Canvas(buffer, pagesize=A4)
+        self.width, self.height = A4
+        self.y = self.height - 50
+
+    def gap(self, points: float) -> None:
+        self.y -= points
+
+    def lines(
+        self,
+        content: str,
+        font_size: int = 11,
+        bold: bool = False,
+        indent: float = 0,
+        leading: float = 14,
+    ) -> None:
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        x = LEFT_MARGIN + indent
+        wrapped = simpleSplit(content, font, font_size, self.width - x - LEFT_MARGIN) or [""]
+
+        text = None
+        for line in wrapped:
+            if self.y < BOTTOM_MARGIN:
+                if text is not None:
+                    self.canvas.drawText(text)
+                    text = None
+                self.canvas.showPage()
+                self.y = self.height - 60
+            if text is None:
+                text = self.canvas.beginText(x, self.y)
+                text.setFont(font, font_size, leading)
+            text.textLine(line)
+            self.y -= leading
+        self.canvas.drawText(text)
+
+    def finish(self) -> None:
+        self.canvas.showPage()
+        self.canvas.save()
+
+
+def render_report(result: AnalysisResult, mode_label: str = "Single text · Core analysis") -> bytes:
+    """Render one analysis as a PDF and return its bytes."""
+    buffer = io.BytesIO()
+    pdf = _PdfWriter(buffer)
+
+    pdf.lines("FallacyLens Report", 16, bold=True, leading=20)
+    pdf.lines(f"Mode: {mode_label}", 10)
+    pdf.gap(12)
+
+    clarity = float(getattr(result, "clarity_score", 50.0))
+    persuasion = float(getattr(result, "persuasion_score", 50.0))
+    reliability = float(getattr(result, "reliability_score", 50.0))
+    pdf.lines(f"Clarity score: {clarity:.1f} / 100", leading=18)
+    pdf.lines(f"Persuasion score: {persuasion:.1f} / 100", leading=18)
+    pdf.lines(f"Reliability score: {reliability:.1f} / 100")
+    pdf.gap(16)
+
+    pdf.lines("Original text:", 12, bold=True, leading=18)
+    for paragraph in result.original_text.splitlines() or [""]:
+        pdf.lines(paragraph)
+    pdf.gap(10)
+
+    pdf.lines("Detected fallacies:", 12, bold=True, leading=18)
+    if not result.fallacies:
+        pdf.lines("None detected with the current model.")
+    for f in result.fallacies:
+        pdf.lines(f"- {f.fallacy_type} (severity {f.severity}/5, confidence {f.confidence:.2f})")
+        pdf.lines(f"Explanation: {f.explanation}", indent=20, leading=12)
+        if f.suggestion:
+            pdf.lines(f"Suggestion: {f.suggestion}", indent=20, leading=12)
+        pdf.gap(8)
+
+    pdf.finish()
+    return buffer.getvalue()
+
+
+def _render_item(item: Tuple[str, AnalysisResult, str]) -> Tuple[str, bytes]:
+    name, result, mode_label = item
+    return name, render_report(result, mode_label)
+
+
+def report_process_pool(max_workers: int = 4) -> ProcessPoolExecutor:
+    """
+    Process pool for `render_reports_zip`; spawned, so it is safe to start from
+    the Streamlit server's threads. Create it once (e.g. with `st.cache_resource`)
+    and reuse it, since starting workers costs far more than rendering a report.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(max_workers, os.cpu_count() or 1)),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def render_reports_zip(
+    items: Sequence[Tuple[str, AnalysisResult, str]],
+    pool: Optional[Executor] = None,
+    max_workers: int = 4,
+) -> bytes:
+    """
+    Render `(file_name, result, mode_label)` items into one zip of PDFs.
+
+    Rendering is CPU-bound, so documents are spread across `pool` (see
+    `report_process_pool`); without one, a pool is started for this call.
+    A single document is rendered inline.
+    """
+    workers = min(max_workers, len(items), os.cpu_count() or 1)
+    if workers <= 1:
+        rendered: List[Tuple[str, bytes]] = [_render_item(item) for item in items]
+    else:
+        chunksize = max(1, len(items) // (workers * 4))
+        if pool is not None:
+            rendered = list(pool.map(_render_item, items, chunksize=chunksize))
+        else:
+            with report_process_pool(workers) as own_pool:
+                rendered = list(own_pool.map(_render_item, items, chunksize=chunksize))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, pdf_bytes in rendered:
+            archive.writestr(name, pdf_bytes)
+    return buffer.getvalue()
+
+
+class ReportJobs:
+    """
+    Rendered (or rendering) reports keyed by `report_key`, shared across reruns.
+
+    Small reports render inline; large ones go to a worker thread so the page
+    stays responsive, and callers poll the returned future. The most recent
+    `maxsize` reports are kept.
+    """
+
+    def __init__(self, maxsize: int = 32, workers: int = 2):
+        self.maxsize = maxsize
+        self._jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-report")
+
+    def get(self, result: AnalysisResult, mode_label: str) -> Future:
+        """Return the (possibly still running) job for this report, starting it if needed."""
+        key = report_key(result, mode_label)
+        large = len(result.original_text) > LARGE_REPORT_CHARS
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._executor.submit(render_report, result, mode_label) if large else Future()
+            self._jobs[key] = job
+            while len(self._jobs) > self.maxsize:
+                self._jobs.popitem(last=False)
+
+        if not large:
+            try:
+                job.set_result(render_report(result, mode_label))
+            except Exception as e:
+                job.set_exception(e)
+        return job
@@ -1,5 +1,33 @@
 """FallacyLens - AI-powered logical fallacy detection toolkit (Groq edition)."""
 
-from .detector import FallacyDetector
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["FallacyDetector"]
+__all__ = ["FallacyDetector", "GroqBackend", "OpenAICompatibleBackend"]
+
+# Public names that live in heavier submodules. They are imported on first
+# attribute access, so `import fallacylens` (and tools that only need
+# `fallacylens.models` or `fallacylens.taxonomy`) skip the detector, asyncio
+# and the network stack entirely.
+_LAZY_ATTRS = {
+    "FallacyDetector": ".detector",
+    "GroqBackend": ".backends",
+    "OpenAICompatibleBackend": ".backends",
+}
+
+if TYPE_CHECKING:
+    from .backends import GroqBackend, OpenAICompatibleBackend
+    from .detector import FallacyDetector
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
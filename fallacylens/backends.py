@@ -0,0 +1,243 @@
+"""
+Chat-completion backends used by `FallacyDetector`.
+
+The detector builds OpenAI-style request arguments (`model`, `messages`,
+`temperature`, `max_tokens`, optionally `response_format`) and hands them to a
+backend. `GroqBackend` sends them to the hosted Groq API.
+`OpenAICompatibleBackend` posts them to any server implementing
+`/chat/completions`: a llama.cpp or vLLM server on your own hardware, a
+gateway, or another hosted provider; it needs `httpx` (the `openai` extra).
+Client libraries are imported on first use, so constructing a
+backend stays cheap.
+"""
+
+import importlib.util
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    from groq import AsyncGroq, Groq
+
+Completion = Tuple[str, dict]
+
+
+def completion_usage(completion: Any, latency_s: float) -> dict:
+    """Token counts reported by the API (None when absent) plus the call latency."""
+    reported = (
+        completion.get("usage") if isinstance(completion, dict) else getattr(completion, "usage", None)
+    )
+    usage: Dict[str, Any] = {
+        name: reported.get(name) if isinstance(reported, dict) else getattr(reported, name, None)
+        for name in ("prompt_tokens", "completion_tokens", "total_tokens")
+    }
+    usage["latency_s"] = round(latency_s, 4)
+    return usage
+
+
+class LLMBackend(ABC):
+    """
+    Interface for chat-completion providers.
+
+    `create` / `acreate` return `(content, usage)` for one request, with usage
+    as produced by `completion_usage`. `astream` yields content deltas.
+    `default_model` is used when the detector is given no model of its own.
+    A subclass missing any of the three cannot be instantiated.
+    """
+
+    name = "backend"
+    default_model: Optional[str] = None
+
+    @abstractmethod
+    def create(self, request: Dict[str, Any]) -> Completion:
+        ...
+
+    @abstractmethod
+    async def acreate(self, request: Dict[str, Any]) -> Completion:
+        ...
+
+    @abstractmethod
+    def astream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        ...
+
+    def warmup(self) -> None:
+        """Build clients now instead of on the first request."""
+
+
+class GroqBackend(LLMBackend):
+    """The hosted Groq API, through the official SDK."""
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str] = None, default_model: Optional[str] = None):
+        self.api_key = api_key
+        self.default_model = default_model
+        self._client: Optional["Groq"] = None
+        self._async_client: Optional["AsyncGroq"] = None
+
+    @property
+    def client(self) -> "Groq":
+        """Lazily constructed blocking Groq client."""
+        if self._client is None:
+            from groq import Groq
+
+            self._client = Groq(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value: "Groq") -> None:
+        self._client = value
+
+    @property
+    def async_client(self) -> "AsyncGroq":
+        """Lazily constructed async Groq client."""
+        if self._async_client is None:
+            from groq import AsyncGroq
+
+            self._async_client = AsyncGroq(api_key=self.api_key)
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, value: "AsyncGroq") -> None:
+        self._async_client = value
+
+    def warmup(self) -> None:
+        self.client
+        self.async_client
+
+    def create(self, request: Dict[str, Any]) -> Completion:
+        started = time.perf_counter()
+        completion = self.client.chat.completions.create(**request)
+        usage = completion_usage(completion, time.perf_counter() - started)
+        return (completion.choices[0].message.content or "").strip(), usage
+
+    async def acreate(self, request: Dict[str, Any]) -> Completion:
+        started = time.perf_counter()
+        completion = await self.async_client.chat.completions.create(**request)
+        usage = completion_usage(completion, time.perf_counter() - started)
+        return (completion.choices[0].message.content or "").strip(), usage
+
+    async def astream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream a completion; closing this generator early closes the upstream
+        stream, so no further tokens are generated for it.
+        """
+        stream = await self.async_client.chat.completions.create(**request, stream=True)
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any server exposing the OpenAI `POST {base_url}/chat/completions` API.
+
+    `base_url` usually ends in `/v1` (e.g. `http://localhost:8080/v1` for
+    llama.cpp's server). `api_key` is sent as a bearer token when given.
+    Servers that reject `response_format` can be used with a detector built
+    with `json_mode=False`. Raises RuntimeError when `httpx` is not installed.
+    """
+
+    name = "openai-compatible"
+
+    def __init__(
+        self,
+        base_url: str,
+        default_model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = 120.0,
+    ):
+        # Checked without importing it, so construction stays cheap.
+        if importlib.util.find_spec("httpx") is None:
+            raise RuntimeError(
+                "OpenAICompatibleBackend requires the 'httpx' package "
+                "(pip install httpx, or install fallacylens with the 'openai' extra)."
+            )
+        self.base_url = base_url.rstrip("/")
+        self.default_model = default_model
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client: Optional["httpx.Client"] = None
+        self._async_client: Optional["httpx.AsyncClient"] = None
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    @property
+    def client(self) -> "httpx.Client":
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.Client(
+                base_url=self.base_url, headers=self._headers(), timeout=self.timeout
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> "httpx.AsyncClient":
+        if self._async_client is None:
+            import httpx
+
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, headers=self._headers(), timeout=self.timeout
+            )
+        return self._async_client
+
+    def warmup(self) -> None:
+        self.client
+        self.async_client
+
+    @staticmethod
+    def _content(payload: dict) -> str:
+        try:
+            content = payload["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("Malformed chat completion response.") from None
+        return (content or "").strip()
+
+    def create(self, request: Dict[str, Any]) -> Completion:
+        started = time.perf_counter()
+        response = self.client.post("/chat/completions", json=request)
+        response.raise_for_status()
+        payload = response.json()
+        return self._content(payload), completion_usage(payload, time.perf_counter() - started)
+
+    async def acreate(self, request: Dict[str, Any]) -> Completion:
+        started = time.perf_counter()
+        response = await self.async_client.post("/chat/completions", json=request)
+        response.raise_for_status()
+        payload = response.json()
+        return self._content(payload), completion_usage(payload, time.perf_counter() - started)
+
+    async def astream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream a completion from the server's `data:` event lines."""
+        async with self.async_client.stream(
+            "POST", "/chat/completions", json=dict(request, stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    choices = json.loads(data).get("choices") or []
+                except (json.JSONDecodeError, AttributeError):
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if delta:
+                    yield delta
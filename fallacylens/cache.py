@@ -0,0 +1,486 @@
+"""
+Cache keys and result caches for analyses.
+
+`MemoryCache` is a per-process LRU. `SQLiteCache` (one file shared by every
+worker on a host) and `RedisCache` (shared across hosts) are persistent
+backends; wrap them in a `TieredCache` to keep a memory LRU in front.
+`cache_from_url` builds the right stack from a URL.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .models import AnalysisResult
+from .serialization import dumps_json, result_from_dict, result_to_dict
+
+
+def make_cache_key(text: str, model: str, prompt_version: str, **params) -> str:
+    """
+    Return a stable hex digest identifying one analysis request.
+
+    Two requests share a key only if the text, model, prompt version and every
+    parameter that can change the result are identical.
+    """
+    payload = json.dumps(
+        {
+            "text": text,
+            "model": model,
+            "prompt_version": prompt_version,
+            "params": params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache(ABC):
+    """
+    Interface for analysis result caches, keyed by `make_cache_key` digests.
+
+    Subclasses must implement `get` and `set`. `aget` / `aset` are used from
+    async code. They default to the blocking methods, which is fine for
+    in-memory backends; backends that do I/O override them to stay off the
+    event loop. `results` is optional: every cache in this module can
+    enumerate its entries, but a custom cache that cannot (e.g. one in front
+    of a key-value store without scans) may leave it out.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, result: AnalysisResult) -> None:
+        ...
+
+    async def aget(self, key: str) -> Optional[AnalysisResult]:
+        return self.get(key)
+
+    async def aset(self, key: str, result: AnalysisResult) -> None:
+        self.set(key, result)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def results(self) -> Iterator[AnalysisResult]:
+        """
+        Every stored result, e.g. to export training data (see `fallacylens.distill`).
+
+        Raises NotImplementedError for caches that cannot enumerate their entries.
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot enumerate its entries.")
+
+    def namespace(self, name: str) -> "ResultCache":
+        """
+        A sibling cache for another kind of record (e.g. "explanations").
+
+        It shares this cache's backing store and settings but not its keys,
+        capacity or `results()`. Backends without a notion of namespaces get
+        a separate per-process `MemoryCache`.
+        """
+        return MemoryCache()
+
+
+def _encode_result(result: AnalysisResult) -> bytes:
+    return dumps_json(result_to_dict(result))
+
+
+def _decode_result(raw: bytes) -> Optional[AnalysisResult]:
+    try:
+        return result_from_dict(json.loads(raw))
+    except (ValueError, KeyError, TypeError):
+        # Corrupt or incompatible entry: treat as a miss.
+        return None
+
+
+class MemoryCache(ResultCache):
+    """Thread-safe in-process LRU cache holding at most `maxsize` results."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(1, maxsize)
+        self._data: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        with self._lock:
+            result = self._data.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key: str, result: AnalysisResult) -> None:
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def namespace(self, name: str) -> "MemoryCache":
+        return MemoryCache(self.maxsize)
+
+    def results(self) -> Iterator[AnalysisResult]:
+        with self._lock:
+            snapshot = list(self._data.values())
+        return iter(snapshot)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+class SQLiteCache(ResultCache):
+    """
+    Result cache stored in a SQLite file in WAL mode.
+
+    WAL lets every uvicorn worker on the host read concurrently while one
+    writes, so all workers share a single store. Each thread gets its own
+    connection. Entries older than `ttl` seconds (if set) count as misses.
+    Namespaces are separate tables in the same file.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, table: str = "results"):
+        if not table.replace("_", "").isalnum():
+            raise ValueError(f"Invalid SQLite cache table name: {table!r}")
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        conn = self._conn()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        row = self._conn().execute(
+            f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            self.misses += 1
+            return None
+        result = _decode_result(row[0])
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def set(self, key: str, result: AnalysisResult) -> None:
+        conn = self._conn()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, created) VALUES (?, ?, ?)",
+            (key, _encode_result(result), time.time()),
+        )
+        conn.commit()
+
+    # A locked database can block for up to the connect timeout, and commits
+    # hit the disk; run both in a worker thread (which gets its own connection).
+    async def aget(self, key: str) -> Optional[AnalysisResult]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, result: AnalysisResult) -> None:
+        await asyncio.to_thread(self.set, key, result)
+
+    def results(self) -> Iterator[AnalysisResult]:
+        """Stored results (expired ones included), decoded lazily; corrupt rows are skipped."""
+        cursor = self._conn().execute(f"SELECT value FROM {self.table}")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for (raw,) in rows:
+                result = _decode_result(raw)
+                if result is not None:
+                    yield result
+
+    def namespace(self, name: str) -> "SQLiteCache":
+        return SQLiteCache(self.path, ttl=self.ttl, table=f"{self.table}_{name}")
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite", "path": self.path, "hits": self.hits, "misses": self.misses}
+
+
+class RedisCache(ResultCache):
+    """
+    Result cache in a Redis-compatible key-value server, shared across hosts.
+
+    Speaks the RESP protocol directly (GET / SET with EX, SCAN / MGET for
+    `results`), so it needs no
+    client library and works with Redis, Valkey, KeyDB or a local stand-in.
+    Connection errors are counted and treated as misses: a cache outage
+    degrades to uncached analysis instead of failing requests.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        ttl: Optional[int] = None,
+        prefix: str = "fallacylens:",
+        timeout: float = 1.0,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.ttl = ttl
+        self.prefix = prefix
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    # -- RESP plumbing ---------------------------------------------------- #
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", str(self.db))
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _roundtrip(self, *args: Any) -> Any:
+        parts: List[bytes] = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server.")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RuntimeError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+    def _command(self, *args: Any) -> Any:
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt == 2:
+                        raise
+
+    # -- ResultCache ------------------------------------------------------ #
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        try:
+            raw = self._command("GET", self.prefix + key)
+        except (OSError, ConnectionError, RuntimeError):
+            self.errors += 1
+            return None
+        result = _decode_result(raw) if raw is not None else None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def set(self, key: str, result: AnalysisResult) -> None:
+        args: List[Any] = ["SET", self.prefix + key, _encode_result(result)]
+        if self.ttl:
+            args += ["EX", str(int(self.ttl))]
+        try:
+            self._command(*args)
+        except (OSError, ConnectionError, RuntimeError):
+            self.errors += 1
+
+    async def aget(self, key: str) -> Optional[AnalysisResult]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, result: AnalysisResult) -> None:
+        await asyncio.to_thread(self.set, key, result)
+
+    def results(self) -> Iterator[AnalysisResult]:
+        """
+        Results stored under this cache's prefix, found with SCAN and fetched
+        with MGET in pages; keys of nested namespaces are skipped and corrupt
+        values are ignored. Connection errors are raised, not counted, so an
+        export never silently comes back short.
+        """
+        pattern = re.sub(r"([*?\[\]\\])", r"\\\1", self.prefix) + "*"
+        prefix = self.prefix.encode("utf-8")
+        cursor = b"0"
+        while True:
+            cursor, keys = self._command("SCAN", cursor, "MATCH", pattern, "COUNT", "500")
+            own = [k for k in keys if b":" not in k[len(prefix) :]]
+            for raw in self._command("MGET", *own) if own else []:
+                result = _decode_result(raw) if raw is not None else None
+                if result is not None:
+                    yield result
+            if cursor == b"0":
+                return
+
+    def namespace(self, name: str) -> "RedisCache":
+        return RedisCache(
+            host=self.host,
+            port=self.port,
+            db=self.db,
+            password=self.password,
+            ttl=self.ttl,
+            prefix=f"{self.prefix}{name}:",
+            timeout=self.timeout,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class TieredCache(ResultCache):
+    """A per-process `MemoryCache` in front of a shared backend."""
+
+    def __init__(self, front: MemoryCache, back: ResultCache):
+        self.front = front
+        self.back = back
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        result = self.front.get(key)
+        if result is None:
+            result = self.back.get(key)
+            if result is not None:
+                self.front.set(key, result)
+        return result
+
+    def set(self, key: str, result: AnalysisResult) -> None:
+        self.front.set(key, result)
+        self.back.set(key, result)
+
+    async def aget(self, key: str) -> Optional[AnalysisResult]:
+        result = self.front.get(key)
+        if result is None:
+            result = await self.back.aget(key)
+            if result is not None:
+                self.front.set(key, result)
+        return result
+
+    async def aset(self, key: str, result: AnalysisResult) -> None:
+        self.front.set(key, result)
+        await self.back.aset(key, result)
+
+    def results(self) -> Iterator[AnalysisResult]:
+        # Everything in the front LRU was also written to the shared backend.
+        return self.back.results()
+
+    def namespace(self, name: str) -> "TieredCache":
+        return TieredCache(self.front.namespace(name), self.back.namespace(name))
+
+    def stats(self) -> dict:
+        back = self.back.stats() if hasattr(self.back, "stats") else {}
+        return {"memory": self.front.stats(), "shared": back}
+
+
+def cache_from_url(url: Optional[str], memory_size: int = 1024) -> ResultCache:
+    """
+    Build a result cache from a URL.
+
+    - empty / `memory://`: per-process LRU only
+    - `sqlite:///cache.db` (relative) or `sqlite:////abs/cache.db` (`?ttl=SECONDS`):
+      LRU in front of a SQLite-WAL file
+    - `redis://[:password@]host:port/db` (`?ttl=SECONDS`): LRU in front of Redis
+    """
+    memory = MemoryCache(memory_size)
+    if not url or url.startswith("memory://"):
+        return memory
+
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    ttl = float(query["ttl"][0]) if "ttl" in query else None
+
+    if parsed.scheme == "sqlite":
+        path = parsed.netloc + parsed.path[1:] if parsed.path else parsed.netloc
+        return TieredCache(memory, SQLiteCache(path, ttl=ttl))
+    if parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        return TieredCache(
+            memory,
+            RedisCache(
+                host=parsed.hostname or "localhost",
+                port=parsed.port or 6379,
+                db=int(db) if db else 0,
+                password=parsed.password,
+                ttl=int(ttl) if ttl else None,
+            ),
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme!r}")
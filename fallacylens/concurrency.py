@@ -0,0 +1,214 @@
+"""Concurrency primitives shared by the async detector and the API."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls that share a key.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive the same result (or
+    exception). Once the task finishes the key is forgotten, so later calls
+    start fresh work. When every caller waiting on a task has been cancelled
+    (timed out, or its client went away), the task is cancelled too, so no
+    upstream work is done for a result nobody will receive.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._waiters: Dict["asyncio.Future", int] = {}
+        self.calls = 0
+        self.shared = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` for `key`, or join the call already in flight for it."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[task] = 0
+
+            def _forget(done: "asyncio.Future", key: str = key) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                self._waiters.pop(done, None)
+
+            task.add_done_callback(_forget)
+
+        # Shield the shared task so one caller being cancelled (e.g. a client
+        # disconnecting) does not cancel the work the other callers wait on;
+        # only the last one leaving cancels it.
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        """Counters for metrics: total calls, coalesced calls and the dedup ratio."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.shared,
+            "upstream_calls": self.calls - self.shared,
+            "in_flight": self.in_flight,
+            "abandoned": self.abandoned,
+            "dedup_ratio": (self.shared / self.calls) if self.calls else 0.0,
+        }
+
+
+class Overloaded(Exception):
+    """Raised when the admission queue is full; `retry_after` is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Service overloaded; retry after {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before it was admitted."""
+
+
+class AdmissionController:
+    """
+    Bounded admission queue with per-request deadlines.
+
+    Up to `max_in_flight` requests run at once and up to `max_queued` more
+    wait in FIFO order. Anything beyond that is rejected immediately with
+    `Overloaded`, and a queued request whose deadline passes is dropped with
+    `DeadlineExceeded` before it does any upstream work.
+
+    Deadlines are absolute `loop.time()` values.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self._in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        # Exponentially weighted mean of how long a slot is held, for Retry-After.
+        self._service_time = 1.0
+        self.admitted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up, for the Retry-After header."""
+        backlog = (self.queued + 1) / self.max_in_flight
+        return max(1, math.ceil(backlog * self._service_time))
+
+    def check(self) -> None:
+        """
+        Raise Overloaded if `acquire` would reject a request right now; admits nothing.
+
+        For responses that must take their slot later (inside a streamed body)
+        but should still fail fast, before any status line is sent.
+        """
+        busy = self._in_flight >= self.max_in_flight or self._waiters
+        if busy and len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+    async def acquire(self, deadline: Optional[float] = None) -> float:
+        """
+        Wait for a slot, or raise Overloaded / DeadlineExceeded.
+
+        Returns the admission time, to be passed back to `release`.
+        """
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self.admitted += 1
+            return time.monotonic()
+
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+        loop = asyncio.get_running_loop()
+        timeout = None if deadline is None else deadline - loop.time()
+        if timeout is not None and timeout <= 0:
+            self.expired += 1
+            raise DeadlineExceeded("Request deadline passed before it was admitted.")
+
+        waiter: "asyncio.Future[None]" = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self.expired += 1
+                raise DeadlineExceeded("Request deadline passed while queued.") from None
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, admitted_at: Optional[float] = None) -> None:
+        """Free a slot, handing it directly to the oldest live waiter if any."""
+        if admitted_at is not None:
+            held = time.monotonic() - admitted_at
+            self._service_time = 0.8 * self._service_time + 0.2 * held
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """`async with admission.slot(deadline): ...` holds one slot for the block."""
+        admitted_at = await self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
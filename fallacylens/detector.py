@@ -1,10 +1,39 @@
 import os
 import json
-from typing import List, Optional
-
-from groq import Groq
-
-from .models import AnalysisResult, FallacySpan
+import asyncio
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .backends import GroqBackend, LLMBackend
+from .cache import ResultCache, make_cache_key
+from .concurrency import SingleFlight
+from .distill import DistilledModel
+from .models import SCORE_FIELDS, AnalysisResult, AnalyzedUnit, ComparisonResult, FallacySpan
+from .neardup import NearDuplicateIndex
+from .parsing import (
+    PARSE_FAILED,
+    PARSE_OK,
+    PARSE_REPAIRED,
+    PARSE_SYNTHESIZED,
+    SYNTHESIZED_MARKER,
+    StreamingArrayParser,
+    parse_incomplete,
+    parse_json_object,
+)
+from .replay import ReplayTransport
+from .taxonomy import FALLACY_CODES, canonical_fallacy_type
+from .text import TextIndex
 
 
 class FallacyDetector:
@@ -13,6 +42,8 @@ class FallacyDetector:
 
     The Groq model is prompted to return a strict JSON structure describing
     the detected fallacies plus global clarity, persuasion, and reliability scores.
+    Pass `backend` (see `fallacylens.backends`) to use any OpenAI-compatible
+    endpoint instead, and `routes` to send particular model names elsewhere.
 
     How to configure your API key (local development):
 
@@ -29,9 +60,79 @@ class FallacyDetector:
     # You can change this to any Groq-supported model ID.
     DEFAULT_MODEL = "llama-3.3-70b-versatile"
 
-    def __init__(self, model: Optional[str] = None, min_confidence: float = 0.4):
-        self.model = model or self.DEFAULT_MODEL
+    # Upper bound on simultaneous upstream calls made through the async API.
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    # Bump whenever the analysis prompt or post-processing changes in a way that
+    # affects results, so cache keys derived from it change too.
+    PROMPT_VERSION = "2"
+
+    # Version of the `explain` prompt; part of every explanation's cache key.
+    EXPLAIN_PROMPT_VERSION = "explain-1"
+
+    # Response encodings. "full" asks for names, explanations and suggestions;
+    # "compact" for short taxonomy codes, short keys and a brief explanation;
+    # "lean" drops the explanation too, so far fewer tokens are generated.
+    OUTPUT_MODES = ("full", "compact", "lean")
+
+    # Short keys used by the compact encodings, expanded by `_item_to_span`.
+    COMPACT_KEYS = {
+        "t": "type",
+        "s": "start",
+        "e": "end",
+        "c": "confidence",
+        "v": "severity",
+        "x": "explanation",
+    }
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        min_confidence: float = 0.4,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        output_mode: str = "full",
+        json_mode: bool = True,
+        replay: Optional[ReplayTransport] = None,
+        backend: Optional[LLMBackend] = None,
+        routes: Optional[Dict[str, LLMBackend]] = None,
+        local_model: Optional[DistilledModel] = None,
+        local_threshold: Optional[float] = None,
+        explanation_cache: Optional[ResultCache] = None,
+    ):
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(
+                f"Unsupported output_mode {output_mode!r}; expected one of {self.OUTPUT_MODES}."
+            )
+        self.model = model or getattr(backend, "default_model", None) or self.DEFAULT_MODEL
         self.min_confidence = min_confidence
+        self.output_mode = output_mode
+        # Ask the provider to constrain JSON-only prompts to a single JSON object.
+        self.json_mode = json_mode
+        self.max_concurrency = max(1, int(max_concurrency or self.DEFAULT_MAX_CONCURRENCY))
+        # Optional result cache consulted by `analyze` / `analyze_async`.
+        self.cache = cache
+        # Where `explain` keeps explanations; by default the "explanations"
+        # namespace of `cache` (see `explanation_cache`).
+        self._explanation_cache = explanation_cache
+        self._derived_explanation_cache: Optional[Tuple[ResultCache, ResultCache]] = None
+        # Optional index that reuses (and remaps) analyses of near-identical texts.
+        self.near_duplicates = near_duplicates
+        # Optional record/replay layer in front of every upstream completion.
+        self.replay = replay
+        # Optional distilled classifier answering texts it is at least
+        # `local_threshold` confident about without an LLM call; by default
+        # the model's calibrated threshold (see `DistilledModel.calibrate`).
+        self.local_model = local_model
+        if local_threshold is None:
+            local_threshold = getattr(local_model, "threshold", None)
+        self.local_threshold = 0.9 if local_threshold is None else local_threshold
+        self.local_served = 0
+        self.local_fallbacks = 0
+
+        # Per-model backend overrides; other models go to `self.backend`.
+        self.routes: Dict[str, LLMBackend] = dict(routes or {})
 
         # 1) Try to read from environment variable
         api_key = os.getenv("GROQ_API_KEY")
@@ -41,7 +142,10 @@ class FallacyDetector:
             api_key = "YOUR_GROQ_API_KEY_HERE"
 
         # 3) Final safety check: if still not set or still placeholder, raise error.
-        if not api_key or api_key == "YOUR_GROQ_API_KEY_HERE":
+        #    Other backends, and a replay transport that never calls upstream,
+        #    need no Groq key.
+        needs_key = backend is None and (replay is None or replay.needs_upstream)
+        if needs_key and (not api_key or api_key == "YOUR_GROQ_API_KEY_HERE"):
             raise RuntimeError(
                 "GROQ_API_KEY is not set.\n"
                 "Set the GROQ_API_KEY environment variable OR edit "
@@ -49,7 +153,216 @@ class FallacyDetector:
                 "with your actual Groq API key for local use."
             )
 
-        self.client = Groq(api_key=api_key)
+        self.api_key = api_key
+
+        # Clients are created on first use, so constructing a detector is cheap
+        # and does not import the Groq SDK. The concurrency gate lives in the
+        # event loop that will drive the async calls.
+        self.backend: LLMBackend = backend or GroqBackend(api_key)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Concurrent async analyses of the same cache key share one upstream call.
+        self.single_flight = SingleFlight()
+
+    @property
+    def client(self) -> Any:
+        """Blocking client of the default backend (the Groq SDK client by default)."""
+        return self.backend.client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self.backend.client = value
+
+    @property
+    def async_client(self) -> Any:
+        """Async client of the default backend, used by the `*_async` methods."""
+        return self.backend.async_client
+
+    @async_client.setter
+    def async_client(self, value: Any) -> None:
+        self.backend.async_client = value
+
+    @property
+    def explanation_cache(self) -> Optional[ResultCache]:
+        """
+        Cache of `explain` records: the one given, else the "explanations"
+        namespace of `cache` (None when there is no cache). Kept apart from
+        analyses so explanations neither evict them nor show up in
+        `cache.results()`.
+        """
+        if self._explanation_cache is not None or self.cache is None:
+            return self._explanation_cache
+        derived = self._derived_explanation_cache
+        if derived is None or derived[0] is not self.cache:
+            derived = (self.cache, self.cache.namespace("explanations"))
+            self._derived_explanation_cache = derived
+        return derived[1]
+
+    @explanation_cache.setter
+    def explanation_cache(self, value: Optional[ResultCache]) -> None:
+        self._explanation_cache = value
+
+    def backend_for(self, model: Optional[str] = None) -> LLMBackend:
+        """The backend serving `model`: its entry in `routes`, else the default backend."""
+        return self.routes.get(model or self.model, self.backend)
+
+    def warmup(self) -> None:
+        """Build every backend's clients now instead of on the first request."""
+        for backend in {id(b): b for b in [self.backend, *self.routes.values()]}.values():
+            backend.warmup()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore bounding concurrent upstream calls for this loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    # --------------------------------------------------------------------- #
+    # Upstream calls
+    # --------------------------------------------------------------------- #
+
+    @staticmethod
+    def _json_messages(prompt: str) -> List[dict]:
+        """Chat messages for prompts that must be answered with JSON only."""
+        return [
+            {
+                "role": "system",
+                "content": "You are a strict JSON API. You only output valid JSON.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+    def _complete(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+        json_output: bool = False,
+    ) -> str:
+        """
+        Run a blocking chat completion and return the stripped message content.
+
+        `json_output` asks the provider for its JSON response format when
+        `json_mode` is enabled; the prompt itself must still ask for JSON.
+        """
+        return self._complete_with_usage(messages, temperature, max_tokens, model, json_output)[0]
+
+    def _complete_with_usage(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+        json_output: bool = False,
+    ) -> Tuple[str, dict]:
+        """Like `_complete`, but also return token usage and wall-clock latency."""
+        request = self._request(messages, temperature, max_tokens, model, json_output)
+        if self.replay is not None:
+            return self.replay.complete(request, self._create)
+        return self._create(request)
+
+    def _create(self, request: Dict[str, Any]) -> Tuple[str, dict]:
+        """One blocking upstream completion for prepared request arguments."""
+        return self.backend_for(request["model"]).create(request)
+
+    def _request(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+        json_output: bool = False,
+    ) -> Dict[str, Any]:
+        """Completion arguments; also what the replay transport fingerprints."""
+        request: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        request.update(self._response_format(json_output))
+        return request
+
+    def _response_format(self, json_output: bool) -> dict:
+        """Extra completion arguments that switch on the provider's JSON mode."""
+        if json_output and self.json_mode:
+            return {"response_format": {"type": "json_object"}}
+        return {}
+
+    async def _acomplete(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+        json_output: bool = False,
+    ) -> str:
+        """
+        Async counterpart of `_complete`.
+
+        At most `max_concurrency` of these calls are in flight at once; the
+        rest wait on the semaphore instead of occupying a worker thread.
+        """
+        return (
+            await self._acomplete_with_usage(messages, temperature, max_tokens, model, json_output)
+        )[0]
+
+    async def _acomplete_with_usage(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+        json_output: bool = False,
+    ) -> Tuple[str, dict]:
+        """Async counterpart of `_complete_with_usage` (latency excludes semaphore wait)."""
+        request = self._request(messages, temperature, max_tokens, model, json_output)
+        if self.replay is not None:
+            return await self.replay.acomplete(request, self._acreate)
+        return await self._acreate(request)
+
+    async def _acreate(self, request: Dict[str, Any]) -> Tuple[str, dict]:
+        """Async counterpart of `_create`; waits for a concurrency slot first."""
+        async with self._get_semaphore():
+            return await self.backend_for(request["model"]).acreate(request)
+
+    async def _astream(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+
+        Closing this generator early (e.g. because the client went away)
+        closes the upstream stream, so no further tokens are generated for it.
+        """
+        request = self._request(messages, temperature, max_tokens, model)
+        if self.replay is not None:
+            deltas = self.replay.astream(request, self._acreate_stream)
+        else:
+            deltas = self._acreate_stream(request)
+        try:
+            async for delta in deltas:
+                yield delta
+        finally:
+            await deltas.aclose()
+
+    async def _acreate_stream(self, request: Dict[str, Any]) -> AsyncIterator[str]:
+        """Upstream streamed completion for prepared request arguments."""
+        async with self._get_semaphore():
+            deltas = self.backend_for(request["model"]).astream(request)
+            try:
+                async for delta in deltas:
+                    yield delta
+            finally:
+                await deltas.aclose()
 
     # --------------------------------------------------------------------- #
     # Core analysis
@@ -64,7 +377,13 @@ class FallacyDetector:
         - clarity_score (0–100)
         - persuasion_score (0–100)
         - reliability_score (0–100)
+
+        In the compact output modes the request is delegated to
+        `_build_compact_prompt`.
         """
+        if self.output_mode != "full":
+            return self._build_compact_prompt(text)
+
         schema_description = {
             "type": "object",
             "properties": {
@@ -130,125 +449,695 @@ class FallacyDetector:
             f"TEXT:\n{text}"
         )
 
-    def _call_groq(self, prompt: str) -> dict:
+    def _build_compact_prompt(self, text: str) -> str:
+        """Prompt for the "compact" / "lean" encodings: codes and short keys per span."""
+        codes = ", ".join(f"{code}={name}" for code, name in FALLACY_CODES.items())
+        fields = '"t": code, "s": start, "e": end, "c": confidence 0-1, "v": severity 1-5'
+        if self.output_mode == "compact":
+            fields += ', "x": explanation in at most 12 words'
+        return (
+            "Detect logical fallacies in the text and score it. Respond with JSON only:\n"
+            '{"fallacies": [{' + fields + "}], "
+            '"clarity_score": 0-100, "persuasion_score": 0-100, "reliability_score": 0-100}\n'
+            "start/end are 0-based character indices, [start, end).\n"
+            f"Fallacy codes: {codes}. For any other fallacy use its short name as the code.\n"
+            f"TEXT:\n{text}"
+        )
+
+    def _call_groq(self, prompt: str, model: Optional[str] = None) -> dict:
         """
         Call Groq Chat Completions API and return parsed JSON.
 
         If the model responds with invalid JSON, we fall back to a safe
         empty result instead of crashing.
         """
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON API. You only output valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        content, usage = self._complete_with_usage(
+            self._json_messages(prompt),
             temperature=0.0,
             max_tokens=1024,
+            model=model,
+            json_output=True,
         )
+        data = self._parse_analysis(content)
+        data["usage"] = usage
+        return data
 
-        content = completion.choices[0].message.content.strip()
+    async def _acall_groq(self, prompt: str, model: Optional[str] = None) -> dict:
+        """Async counterpart of `_call_groq`."""
+        content, usage = await self._acomplete_with_usage(
+            self._json_messages(prompt),
+            temperature=0.0,
+            max_tokens=1024,
+            model=model,
+            json_output=True,
+        )
+        data = self._parse_analysis(content)
+        data["usage"] = usage
+        return data
 
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            data = {
-                "fallacies": [],
-                "clarity_score": 50,
-                "persuasion_score": 50,
-                "reliability_score": 50,
-            }
+    @staticmethod
+    def _parse_analysis(content: str) -> dict:
+        """
+        Parse the raw analysis completion, normalizing missing or invalid fields.
 
-        if not isinstance(data, dict):
-            data = {
-                "fallacies": [],
-                "clarity_score": 50,
-                "persuasion_score": 50,
-                "reliability_score": 50,
-            }
+        Fenced or truncated output is salvaged where possible; how well that
+        went is recorded under "parse_quality" (see `parse_json_object`), and
+        the fields filled in with defaults are listed under "defaulted".
+        """
+        data, quality = parse_json_object(content)
+        data["parse_quality"] = quality
 
         # Normalize missing keys
+        defaulted = []
         if "fallacies" not in data or not isinstance(data["fallacies"], list):
             data["fallacies"] = []
-        if "clarity_score" not in data:
-            data["clarity_score"] = 50
-        if "persuasion_score" not in data:
-            data["persuasion_score"] = 50
-        if "reliability_score" not in data:
-            data["reliability_score"] = 50
+            defaulted.append("fallacies")
+        for name in SCORE_FIELDS:
+            if name not in data:
+                data[name] = 50
+                defaulted.append(name)
+        data["defaulted"] = defaulted
 
         return data
 
-    def _data_to_result(self, text: str, data: dict) -> AnalysisResult:
-        """Convert JSON data from the model into an AnalysisResult instance."""
-        fallacies: List[FallacySpan] = []
+    def _item_to_span(self, index: TextIndex, item: dict) -> Optional[FallacySpan]:
+        """
+        Convert one fallacy object from the model into a FallacySpan over `index.text`.
 
-        for item in data.get("fallacies", []):
-            try:
-                f_type = str(item.get("type", "")).strip() or "Unknown"
-                start = int(item.get("start", 0))
-                end = int(item.get("end", len(text)))
-                confidence = float(item.get("confidence", 0.0))
-                severity = int(item.get("severity", 1))
-                explanation = str(item.get("explanation", "")).strip()
-                suggestion = item.get("suggestion")
-            except (TypeError, ValueError):
-                # Skip malformed entries.
-                continue
+        Short keys and taxonomy codes from the compact encodings are expanded,
+        and fallacy names are mapped to their canonical form. Returns None for
+        malformed entries and those below `min_confidence`.
+        """
+        try:
+            item = {self.COMPACT_KEYS.get(k, k): v for k, v in item.items()}
+            f_type = canonical_fallacy_type(str(item.get("type", ""))) or "Unknown"
+            start = int(item.get("start", 0))
+            end = int(item.get("end", len(index)))
+            confidence = float(item.get("confidence", 0.0))
+            severity = int(item.get("severity", 1))
+            explanation = str(item.get("explanation", "")).strip()
+            suggestion = item.get("suggestion")
+        except (AttributeError, TypeError, ValueError):
+            # Skip malformed entries.
+            return None
+
+        if confidence < self.min_confidence:
+            return None
+
+        start, end = index.clamp(start, end)
+        return FallacySpan(
+            start=start,
+            end=end,
+            text=index.text[start:end],
+            fallacy_type=f_type,
+            confidence=confidence,
+            severity=max(1, min(severity, 5)),
+            explanation=explanation,
+            suggestion=str(suggestion).strip() if suggestion else None,
+        )
 
-            if confidence < self.min_confidence:
-                continue
+    def _data_to_result(
+        self, text: str, data: dict, index: Optional[TextIndex] = None
+    ) -> AnalysisResult:
+        """
+        Convert JSON data from the model into an AnalysisResult instance.
 
-            # Clamp indices to valid range.
-            start = max(0, min(start, len(text)))
-            end = max(start, min(end, len(text)))
-            span_text = text[start:end]
-
-            fallacies.append(
-                FallacySpan(
-                    start=start,
-                    end=end,
-                    text=span_text,
-                    fallacy_type=f_type,
-                    confidence=confidence,
-                    severity=max(1, min(severity, 5)),
-                    explanation=explanation,
-                    suggestion=str(suggestion).strip() if suggestion else None,
-                )
-            )
+        `index` (of `text`) is reused when the caller already built one, and
+        becomes the result's `text_index`.
+        """
+        result = AnalysisResult(original_text=text, fallacies=[])
+        if index is not None:
+            result.text_index = index
+        for item in data.get("fallacies", []):
+            span = self._item_to_span(result.text_index, item)
+            if span is not None:
+                result.fallacies.append(span)
 
-        result = AnalysisResult(original_text=text, fallacies=fallacies)
         # Extra attributes for UI and API
         result.clarity_score = float(data.get("clarity_score", 50.0))
         result.persuasion_score = float(data.get("persuasion_score", 50.0))
         result.reliability_score = float(data.get("reliability_score", 50.0))
+        # Token counts + latency of the call that produced this result (None if unknown).
+        result.usage = data.get("usage") if isinstance(data.get("usage"), dict) else None
+        # "ok", "repaired" (truncated output salvaged), "failed" (defaults only)
+        # or "synthesized" (a replay placeholder, defaults only).
+        result.parse_quality = data.get("parse_quality", PARSE_OK)
+        # Fields the model did not supply, filled in with neutral defaults.
+        result.defaulted_fields = list(data.get("defaulted", []))
         return result
 
-    def analyze(self, text: str) -> AnalysisResult:
+    def analyze(self, text: str, model: Optional[str] = None) -> AnalysisResult:
         """Analyze a single text using the default Groq model and return a structured result."""
-        prompt = self._build_prompt(text)
-        data = self._call_groq(prompt)
-        return self._data_to_result(text, data)
+        key = self.cache_key(text, model)
+        cached = self.cached_result(key)
+        if cached is not None:
+            return cached
+
+        reused = self._reuse_near_duplicate(text, model)
+        if reused is not None:
+            # Not cached under this text's key: reuse is a heuristic, and a
+            # cached copy would outlive the analysis it was derived from.
+            return reused
+        local = self._local_result(text, model)
+        if local is not None:
+            return local
+        data = self._call_groq(self._build_prompt(text), model=model)
+        result = self._index_near_duplicate(self._data_to_result(text, data), model)
+        return self._store(key, result)
 
     def analyze_batch(self, texts: List[str]) -> List[AnalysisResult]:
         """Convenience method for analyzing multiple texts sequentially."""
         return [self.analyze(t) for t in texts]
 
-    def analyze_with_model_name(self, text: str, model_name: str) -> AnalysisResult:
+    def cache_key(self, text: str, model: Optional[str] = None) -> str:
+        """Stable key for analyzing `text` with `model` under the current settings."""
+        return make_cache_key(
+            text,
+            model or self.model,
+            self.PROMPT_VERSION,
+            min_confidence=self.min_confidence,
+            output_mode=self.output_mode,
+        )
+
+    async def analyze_async(self, text: str, model: Optional[str] = None) -> AnalysisResult:
         """
-        Analyze using a specific Groq model name (for multi-model comparison).
+        Async version of `analyze`; does not block the event loop while Groq responds.
+
+        Results come from `cache` when possible; concurrent misses with the
+        same cache key are coalesced into a single upstream request whose
+        result they all share.
+        """
+        key = self.cache_key(text, model)
+        cached = await self.acached_result(key)
+        if cached is not None:
+            return cached
+        return await self.single_flight.do(
+            key,
+            lambda: self._analyze_uncached_async(key, text, model),
+        )
+
+    async def _analyze_uncached_async(
+        self, key: str, text: str, model: Optional[str]
+    ) -> AnalysisResult:
+        if self.near_duplicates is not None:
+            # Alignment is CPU work; keep it off the event loop. Reused results
+            # are not cached under this text's key (see `analyze`).
+            reused = await asyncio.to_thread(self._reuse_near_duplicate, text, model)
+            if reused is not None:
+                return reused
+        if self.local_model is not None:
+            local = await asyncio.to_thread(self._local_result, text, model)
+            if local is not None:
+                return local
+        data = await self._acall_groq(self._build_prompt(text), model=model)
+        result = self._index_near_duplicate(self._data_to_result(text, data), model)
+        return await self._astore(key, result)
+
+    def _local_result(self, text: str, model: Optional[str]) -> Optional[AnalysisResult]:
+        """
+        The distilled model's analysis of `text` if it is confident enough, else None.
 
-        This temporarily switches `self.model`, calls analyze(), then restores it.
+        Only used for the detector's own model (an explicitly requested model
+        always gets a real call). Local results are cheap to recompute, so
+        they are neither cached nor indexed, and never feed later distillation.
         """
-        prev_model = self.model
+        if self.local_model is None or (model is not None and model != self.model):
+            return None
+        result, confidence = self.local_model.predict(text, max(0.5, self.min_confidence))
+        if confidence < self.local_threshold:
+            self.local_fallbacks += 1
+            return None
+        self.local_served += 1
+        result.local_confidence = confidence
+        return result
+
+    def _reuse_near_duplicate(self, text: str, model: Optional[str]) -> Optional[AnalysisResult]:
+        """A previous analysis of a near-identical text, remapped onto `text`, or None."""
+        if self.near_duplicates is None:
+            return None
+        # The key of an empty text identifies model, prompt version and parameters.
+        return self.near_duplicates.lookup(self.cache_key("", model), text)
+
+    def _index_near_duplicate(self, result: AnalysisResult, model: Optional[str]) -> AnalysisResult:
+        if self.near_duplicates is not None and not self._parse_failed(result):
+            self.near_duplicates.add(self.cache_key("", model), result)
+        return result
+
+    def cached_result(self, key: str) -> Optional[AnalysisResult]:
+        """Return the cached result for a cache key, or None (also when caching is off)."""
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    async def acached_result(self, key: str) -> Optional[AnalysisResult]:
+        """Async counterpart of `cached_result`, safe for networked cache backends."""
+        if self.cache is None:
+            return None
+        return await self.cache.aget(key)
+
+    @staticmethod
+    def _parse_failed(result: AnalysisResult) -> bool:
+        # Unparseable output, replay placeholders and repairs that needed
+        # default scores are returned but never cached or reused, so the next
+        # request asks again.
+        return parse_incomplete(result)
+
+    def _store(self, key: str, result: AnalysisResult) -> AnalysisResult:
+        if self.cache is not None and not self._parse_failed(result):
+            # Marks results that later requests for `key` will be served from.
+            result.cache_key = key
+            self.cache.set(key, result)
+        return result
+
+    async def _astore(self, key: str, result: AnalysisResult) -> AnalysisResult:
+        if self.cache is not None and not self._parse_failed(result):
+            result.cache_key = key
+            await self.cache.aset(key, result)
+        return result
+
+    @staticmethod
+    def is_cached(result: AnalysisResult, key: str) -> bool:
+        """
+        True if `result` was stored in `cache` under `key`.
+
+        False for results the detector does not cache: failed or incomplete
+        parses, near-duplicate reuses, local-model answers, and everything
+        when `cache` is None.
+        """
+        return getattr(result, "cache_key", None) == key
+
+    def metrics(self) -> dict:
+        """Runtime counters for monitoring."""
+        metrics = {"single_flight": self.single_flight.stats()}
+        if self.cache is not None and hasattr(self.cache, "stats"):
+            metrics["cache"] = self.cache.stats()
+        if self.near_duplicates is not None:
+            metrics["near_duplicates"] = self.near_duplicates.stats()
+        if self.replay is not None:
+            metrics["replay"] = self.replay.stats()
+        if self.local_model is not None:
+            metrics["local"] = {
+                "threshold": self.local_threshold,
+                "served": self.local_served,
+                "fallbacks": self.local_fallbacks,
+            }
+        return metrics
+
+    async def analyze_batch_async(self, texts: List[str]) -> List[AnalysisResult]:
+        """Analyze multiple texts concurrently, bounded by `max_concurrency`."""
+        return list(await asyncio.gather(*(self.analyze_async(t) for t in texts)))
+
+    async def analyze_stream_async(
+        self,
+        text: str,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Analyze a text while the model is still generating.
+
+        Yields `(event, payload)` pairs:
+        - `("span", FallacySpan)` as soon as each fallacy object is complete,
+        - `("scores", dict)` with the three global scores once output ends,
+        - `("result", AnalysisResult)` with the full result last.
+        """
+        parser = StreamingArrayParser("fallacies")
+        index = TextIndex(text)
+        deltas = self._astream(
+            self._json_messages(self._build_prompt(text)),
+            temperature=0.0,
+            max_tokens=1024,
+            model=model,
+        )
         try:
-            self.model = model_name
-            return self.analyze(text)
+            async for delta in deltas:
+                for item in parser.feed(delta):
+                    span = self._item_to_span(index, item)
+                    if span is not None:
+                        yield "span", span
         finally:
-            self.model = prev_model
+            await deltas.aclose()
+
+        data = self._parse_analysis(parser.text)
+        # Keep the final result consistent with the spans already streamed,
+        # even if the complete document failed to parse.
+        data["fallacies"] = parser.items
+        if data["parse_quality"] == PARSE_FAILED and parser.items:
+            data["parse_quality"] = PARSE_REPAIRED
+            data["defaulted"] = [name for name in data["defaulted"] if name != "fallacies"]
+        result = self._index_near_duplicate(self._data_to_result(text, data, index), model)
+        result = await self._astore(self.cache_key(text, model), result)
+        yield "scores", {
+            "clarity_score": result.clarity_score,
+            "persuasion_score": result.persuasion_score,
+            "reliability_score": result.reliability_score,
+        }
+        yield "result", result
+
+    async def analyze_many_async(
+        self,
+        texts: Union[Iterable[str], AsyncIterable[str]],
+        max_pending: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, Union[AnalysisResult, Exception]]]:
+        """
+        Analyze a (possibly unbounded) stream of texts concurrently.
+
+        Yields `(index, outcome)` pairs in completion order, where `index` is the
+        position of the text in the input and `outcome` is either the
+        AnalysisResult or the exception raised while analyzing it, so a single
+        failure does not abort the rest of the batch.
+
+        At most `max_pending` distinct texts (default: twice `max_concurrency`)
+        are pulled from `texts` ahead of completion, so memory stays flat for
+        large inputs. Identical texts that arrive while an analysis of the same
+        text is still in flight share that analysis instead of starting another.
+        """
+        max_pending = max(1, max_pending or 2 * self.max_concurrency)
+
+        async def _aiter() -> AsyncIterator[str]:
+            if hasattr(texts, "__aiter__"):
+                async for t in texts:  # type: ignore[union-attr]
+                    yield t
+            else:
+                for t in texts:  # type: ignore[union-attr]
+                    yield t
+
+        source = _aiter()
+        pending: Dict["asyncio.Task[AnalysisResult]", str] = {}
+        waiting: Dict[str, List[int]] = {}
+        exhausted = False
+        index = 0
+
+        try:
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        text = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    if text in waiting:
+                        waiting[text].append(index)
+                    else:
+                        waiting[text] = [index]
+                        pending[asyncio.ensure_future(self.analyze_async(text))] = text
+                    index += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    text = pending.pop(task)
+                    exc = task.exception()
+                    outcome = exc if exc is not None else task.result()
+                    for i in waiting.pop(text):
+                        yield i, outcome
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def analyze_with_model_name(self, text: str, model_name: str) -> AnalysisResult:
+        """
+        Analyze using a specific Groq model name (for multi-model comparison).
+
+        The model is passed per call rather than by switching `self.model`, so
+        this is safe to call from several threads at once.
+        """
+        return self.analyze(text, model=model_name)
+
+    def compare(
+        self, text_a: str, text_b: str, model: Optional[str] = None
+    ) -> ComparisonResult:
+        """
+        Analyze two texts side by side and diff them (scores, fallacy types).
+
+        Both analyses go through the result cache and run in parallel threads;
+        identical texts are analyzed once.
+        """
+        if text_a == text_b:
+            result = self.analyze(text_a, model=model)
+            return ComparisonResult.from_results(result, result)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            future_a = pool.submit(self.analyze, text_a, model)
+            future_b = pool.submit(self.analyze, text_b, model)
+            return ComparisonResult.from_results(future_a.result(), future_b.result())
+
+    async def compare_async(
+        self, text_a: str, text_b: str, model: Optional[str] = None
+    ) -> ComparisonResult:
+        """Async counterpart of `compare`; both analyses run concurrently."""
+        result_a, result_b = await asyncio.gather(
+            self.analyze_async(text_a, model=model),
+            self.analyze_async(text_b, model=model),
+        )
+        return ComparisonResult.from_results(result_a, result_b)
+
+    # --------------------------------------------------------------------- #
+    # Incremental analysis
+    # --------------------------------------------------------------------- #
+
+    def analyze_incremental(
+        self,
+        text: str,
+        previous: Optional[AnalysisResult] = None,
+        unit: str = "paragraph",
+        model: Optional[str] = None,
+    ) -> AnalysisResult:
+        """
+        Analyze `text` unit by unit (paragraphs or sentences), reusing work.
+
+        Units whose text (and model/parameters) match a unit of `previous` keep
+        that unit's result, with spans shifted to the unit's new offset; only
+        new or edited units are sent to Groq (several at once), and those still
+        go through the result cache. Scores are the length-weighted mean of the
+        per-unit scores. The returned result carries `units`, so it can be
+        passed as `previous` for the next edit.
+        """
+        index, bounds, keys, known = self._plan_units(text, previous, unit, model)
+        todo = {keys[i]: text[s:e] for i, (s, e) in enumerate(bounds) if keys[i] not in known}
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(len(todo), self.max_concurrency)) as pool:
+                fresh = pool.map(lambda t: self.analyze(t, model=model), todo.values())
+                known.update(zip(todo, fresh))
+        return self._merge_units(index, bounds, keys, known, reanalyzed=len(todo))
+
+    async def analyze_incremental_async(
+        self,
+        text: str,
+        previous: Optional[AnalysisResult] = None,
+        unit: str = "paragraph",
+        model: Optional[str] = None,
+    ) -> AnalysisResult:
+        """Async counterpart of `analyze_incremental`."""
+        index, bounds, keys, known = self._plan_units(text, previous, unit, model)
+        todo = {keys[i]: text[s:e] for i, (s, e) in enumerate(bounds) if keys[i] not in known}
+        fresh = await asyncio.gather(*(self.analyze_async(t, model=model) for t in todo.values()))
+        known.update(zip(todo, fresh))
+        return self._merge_units(index, bounds, keys, known, reanalyzed=len(todo))
+
+    def _plan_units(
+        self,
+        text: str,
+        previous: Optional[AnalysisResult],
+        unit: str,
+        model: Optional[str],
+    ) -> Tuple[TextIndex, List[Tuple[int, int]], List[str], Dict[str, AnalysisResult]]:
+        """Index and unit bounds of `text`, unit cache keys, and results reusable from `previous`."""
+        index = TextIndex(text)
+        bounds = index.units(unit)
+        keys = [self.cache_key(text[s:e], model) for s, e in bounds]
+        known = {
+            u.key: u.result
+            for u in getattr(previous, "units", None) or []
+            if not self._parse_failed(u.result)
+        }
+        return index, bounds, keys, known
+
+    @staticmethod
+    def _merge_units(
+        index: TextIndex,
+        bounds: List[Tuple[int, int]],
+        keys: List[str],
+        results: Dict[str, AnalysisResult],
+        reanalyzed: int,
+    ) -> AnalysisResult:
+        """Combine per-unit results into one result for the whole of `index.text`."""
+        units = [AnalyzedUnit(s, e, key, results[key]) for (s, e), key in zip(bounds, keys)]
+        fallacies = [
+            replace(f, start=f.start + u.start, end=f.end + u.start)
+            for u in units
+            for f in u.result.fallacies
+        ]
+        merged = AnalysisResult(original_text=index.text, fallacies=fallacies)
+        merged.text_index = index
+        total = sum(u.end - u.start for u in units)
+        for name in SCORE_FIELDS:
+            weighted = sum(float(getattr(u.result, name, 50.0)) * (u.end - u.start) for u in units)
+            setattr(merged, name, weighted / total if total else 50.0)
+        qualities = {getattr(u.result, "parse_quality", PARSE_OK) for u in units}
+        merged.parse_quality = next(
+            (q for q in (PARSE_FAILED, PARSE_SYNTHESIZED, PARSE_REPAIRED) if q in qualities),
+            PARSE_OK,
+        )
+        defaulted = {f for u in units for f in getattr(u.result, "defaulted_fields", ())}
+        merged.defaulted_fields = [f for f in ("fallacies",) + SCORE_FIELDS if f in defaulted]
+        merged.units = units
+        merged.reanalyzed_units = reanalyzed
+        return merged
+
+    # --------------------------------------------------------------------- #
+    # On-demand explanations
+    # --------------------------------------------------------------------- #
+
+    def explain(
+        self,
+        result: AnalysisResult,
+        span_ids: Optional[Iterable[int]] = None,
+        model: Optional[str] = None,
+    ) -> List[FallacySpan]:
+        """
+        Explanations and suggestions for selected spans of `result`.
+
+        `span_ids` index into `result.fallacies` (all spans when omitted).
+        Returns copies of those spans with `explanation` / `suggestion` filled
+        in; `result` itself is not modified. Explanations are stored in
+        `explanation_cache`, and spans not found there are explained in one call.
+        """
+        ids, keys, found = self._explain_plan(result, span_ids, model)
+        missing = [i for i in ids if found[i] is None]
+        if missing:
+            content = self._complete(
+                self._json_messages(self._build_explain_prompt(result, missing)),
+                temperature=0.2,
+                max_tokens=self._explain_max_tokens(len(missing)),
+                model=model,
+                json_output=True,
+            )
+            cache = self.explanation_cache
+            for i, record in self._parse_explanations(result, missing, content).items():
+                if cache is not None:
+                    cache.set(keys[i], record)
+                found[i] = record
+        return [self._with_explanation(result.fallacies[i], found[i]) for i in ids]
+
+    async def explain_async(
+        self,
+        result: AnalysisResult,
+        span_ids: Optional[Iterable[int]] = None,
+        model: Optional[str] = None,
+    ) -> List[FallacySpan]:
+        """Async counterpart of `explain`."""
+        ids = self._span_ids(result, span_ids)
+        keys = {i: self._explanation_key(result, i, model) for i in ids}
+        cache = self.explanation_cache
+        found = {i: await cache.aget(keys[i]) if cache else None for i in ids}
+        missing = [i for i in ids if found[i] is None]
+        if missing:
+            content = await self._acomplete(
+                self._json_messages(self._build_explain_prompt(result, missing)),
+                temperature=0.2,
+                max_tokens=self._explain_max_tokens(len(missing)),
+                model=model,
+                json_output=True,
+            )
+            for i, record in self._parse_explanations(result, missing, content).items():
+                if cache is not None:
+                    await cache.aset(keys[i], record)
+                found[i] = record
+        return [self._with_explanation(result.fallacies[i], found[i]) for i in ids]
+
+    def _explain_plan(
+        self,
+        result: AnalysisResult,
+        span_ids: Optional[Iterable[int]],
+        model: Optional[str],
+    ) -> Tuple[List[int], Dict[int, str], Dict[int, Optional[AnalysisResult]]]:
+        ids = self._span_ids(result, span_ids)
+        keys = {i: self._explanation_key(result, i, model) for i in ids}
+        cache = self.explanation_cache
+        return ids, keys, {i: cache.get(keys[i]) if cache else None for i in ids}
+
+    @staticmethod
+    def _span_ids(result: AnalysisResult, span_ids: Optional[Iterable[int]]) -> List[int]:
+        """Validated, de-duplicated span indices (ValueError when out of range)."""
+        if span_ids is None:
+            return list(range(len(result.fallacies)))
+        ids = list(dict.fromkeys(int(i) for i in span_ids))
+        for i in ids:
+            if not 0 <= i < len(result.fallacies):
+                raise ValueError(f"Span id {i} is out of range (0..{len(result.fallacies) - 1}).")
+        return ids
+
+    def _explanation_key(self, result: AnalysisResult, i: int, model: Optional[str]) -> str:
+        """Cache key of one span's explanation (text, span, type, model, prompt version)."""
+        f = result.fallacies[i]
+        return make_cache_key(
+            result.original_text,
+            model or self.model,
+            self.EXPLAIN_PROMPT_VERSION,
+            span=[f.start, f.end],
+            fallacy_type=f.fallacy_type,
+        )
+
+    @staticmethod
+    def _explain_max_tokens(count: int) -> int:
+        return min(2048, 64 + 120 * count)
+
+    @staticmethod
+    def _build_explain_prompt(result: AnalysisResult, ids: List[int]) -> str:
+        spans = "\n".join(
+            f'{i}. {result.fallacies[i].fallacy_type}: "{result.fallacies[i].text}"' for i in ids
+        )
+        return (
+            "You explain logical fallacies that were already detected in a text.\n"
+            "For each numbered span below, write a one- or two-sentence explanation of why\n"
+            "it is that fallacy here, and a concrete suggestion for fixing it.\n"
+            "Respond with JSON only:\n"
+            '{"explanations": [{"id": <span number>, "explanation": "...", "suggestion": "..."}]}\n\n'
+            f"TEXT:\n{result.original_text}\n\n"
+            f"SPANS:\n{spans}"
+        )
+
+    @staticmethod
+    def _parse_explanations(
+        result: AnalysisResult, ids: List[int], content: str
+    ) -> Dict[int, AnalysisResult]:
+        """
+        Explanation records by span id, parsed from the model's reply.
+
+        Each record is a one-span AnalysisResult, so any ResultCache backend
+        (namespace) can store it. Spans the reply does not cover are left out,
+        and are therefore retried on the next request instead of cached empty.
+        """
+        items = parse_json_object(content)[0].get("explanations", [])
+        records: Dict[int, AnalysisResult] = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                i = int(item.get("id"))
+                explanation = str(item.get("explanation", "")).strip()
+            except (AttributeError, TypeError, ValueError):
+                continue
+            if i not in ids or not explanation:
+                continue
+            suggestion = item.get("suggestion")
+            f = result.fallacies[i]
+            # Stored against the excerpt alone; the full text is already in the key.
+            span = replace(
+                f,
+                start=0,
+                end=len(f.text),
+                explanation=explanation,
+                suggestion=str(suggestion).strip() if suggestion else None,
+            )
+            records[i] = AnalysisResult(original_text=f.text, fallacies=[span])
+        return records
+
+    @staticmethod
+    def _with_explanation(span: FallacySpan, record: Optional[AnalysisResult]) -> FallacySpan:
+        if record is None or not record.fallacies:
+            return replace(span)
+        explained = record.fallacies[0]
+        return replace(span, explanation=explained.explanation, suggestion=explained.suggestion)
 
     # --------------------------------------------------------------------- #
     # Shared helpers for advanced features
@@ -312,13 +1201,13 @@ class FallacyDetector:
         """
         Rewrite an argument to improve clarity and reduce logical fallacies.
 
-        Returns a single string containing the improved argument.
+        Returns a single string containing the improved argument, or `text`
+        unchanged when a replay miss was answered with a placeholder.
         """
         prompt = self._build_rewrite_prompt(text, fallacies)
 
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        rewritten = self._complete(
+            [
                 {
                     "role": "system",
                     "content": (
@@ -331,8 +1220,8 @@ class FallacyDetector:
             temperature=0.5,
             max_tokens=1024,
         )
-
-        rewritten = completion.choices[0].message.content.strip()
+        if SYNTHESIZED_MARKER in rewritten and parse_json_object(rewritten)[1] == PARSE_SYNTHESIZED:
+            return text
         return rewritten
 
     # --------------------------------------------------------------------- #
@@ -348,6 +1237,7 @@ class FallacyDetector:
         - improvements: list[str]
         - overall_comment: str
         - grade: str
+        - parse_quality: "ok", "repaired", "failed" or "synthesized" (see `parse_json_object`)
         """
         text = analysis.original_text
         fallacy_summary = self._summarize_fallacies(analysis.fallacies)
@@ -386,24 +1276,13 @@ class FallacyDetector:
             "Now respond ONLY with a JSON object that follows the schema above."
         )
 
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON API. You only output valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        content = self._complete(
+            self._json_messages(prompt),
             temperature=0.3,
             max_tokens=768,
+            json_output=True,
         )
-
-        content = completion.choices[0].message.content.strip()
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            data = {}
+        data, quality = parse_json_object(content)
 
         strengths = data.get("strengths") or []
         improvements = data.get("improvements") or []
@@ -421,6 +1300,7 @@ class FallacyDetector:
             "improvements": improvements,
             "overall_comment": overall_comment,
             "grade": grade,
+            "parse_quality": quality,
         }
 
     # --------------------------------------------------------------------- #
@@ -434,6 +1314,7 @@ class FallacyDetector:
         Returns a dict with keys:
         - improved_text: str
         - strategy_notes: list[str]
+        - parse_quality: "ok", "repaired", "failed" or "synthesized" (see `parse_json_object`)
         """
         text = analysis.original_text
         fallacy_summary = self._summarize_fallacies(analysis.fallacies)
@@ -473,24 +1354,13 @@ class FallacyDetector:
             "Now respond ONLY with a JSON object that follows the schema above."
         )
 
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON API. You only output valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        content = self._complete(
+            self._json_messages(prompt),
             temperature=0.5,
             max_tokens=1024,
+            json_output=True,
         )
-
-        content = completion.choices[0].message.content.strip()
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            data = {}
+        data, quality = parse_json_object(content)
 
         improved_text = data.get("improved_text") or text
         strategy_notes = data.get("strategy_notes") or []
@@ -501,20 +1371,25 @@ class FallacyDetector:
         return {
             "improved_text": improved_text,
             "strategy_notes": strategy_notes,
+            "parse_quality": quality,
         }
 
     # --------------------------------------------------------------------- #
     # Bias detector
     # --------------------------------------------------------------------- #
 
-    def analyze_bias(self, text: str) -> dict:
+    def analyze_bias(self, text: str, index: Optional[TextIndex] = None) -> dict:
         """
         Analyze potential bias in the given text.
 
+        Pass `index` (e.g. `result.text_index`) to reuse an existing index of `text`.
+
         Returns a dict with keys:
         - fairness_score: float (0–100, higher = more fair and balanced)
         - bias_summary: str
-        - spans: list[dict] with keys: start, end, label, explanation, excerpt
+        - spans: list[dict] with keys: start, end, label, explanation, excerpt,
+          sentence (index of the sentence the span starts in, or None)
+        - parse_quality: "ok", "repaired", "failed" or "synthesized" (see `parse_json_object`)
         """
         schema = {
             "type": "object",
@@ -554,29 +1429,19 @@ class FallacyDetector:
             "Now respond ONLY with a JSON object that follows the schema above."
         )
 
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a strict JSON API. You only output valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        content = self._complete(
+            self._json_messages(prompt),
             temperature=0.2,
             max_tokens=1024,
+            json_output=True,
         )
-
-        content = completion.choices[0].message.content.strip()
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            data = {}
+        data, quality = parse_json_object(content)
 
         fairness_score = float(data.get("fairness_score") or 60.0)
         bias_summary = str(data.get("bias_summary") or "No detailed bias summary was generated.")
         spans_raw = data.get("spans") or []
         spans: List[dict] = []
+        index = index if index is not None else TextIndex(text)
 
         for item in spans_raw:
             try:
@@ -584,13 +1449,10 @@ class FallacyDetector:
                 end = int(item.get("end", len(text)))
                 label = str(item.get("label", "Possible bias")).strip()
                 explanation = str(item.get("explanation", "")).strip()
-            except (TypeError, ValueError):
+            except (AttributeError, TypeError, ValueError):
                 continue
 
-            # Clamp indices
-            start = max(0, min(start, len(text)))
-            end = max(start, min(end, len(text)))
-
+            start, end = index.clamp(start, end)
             spans.append(
                 {
                     "start": start,
@@ -598,6 +1460,7 @@ class FallacyDetector:
                     "label": label,
                     "explanation": explanation,
                     "excerpt": text[start:end],
+                    "sentence": index.unit_at(start),
                 }
             )
 
@@ -605,4 +1468,5 @@ class FallacyDetector:
             "fairness_score": fairness_score,
             "bias_summary": bias_summary,
             "spans": spans,
+            "parse_quality": quality,
         }
@@ -0,0 +1,393 @@
+"""
+Distillation of cached LLM analyses into a small CPU-only classifier.
+
+`export_training_data` turns analyses (e.g. `ResultCache.results()`) into
+sentence-level JSONL rows: the fallacy types whose spans cover each sentence,
+plus the document's three scores. `DistilledModel.train` fits hashed word
+unigram/bigram features with one logistic regression per fallacy type and a
+linear regression per score, in pure Python. `DistilledModel.calibrate`
+picks the confidence threshold on held-out analyses. A detector given
+`local_model=` answers texts the model is confident about locally and sends
+the rest to the LLM (see `FallacyDetector._local_result`).
+"""
+
+import gzip
+import json
+import math
+import random
+import re
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import SCORE_FIELDS, AnalysisResult, FallacySpan
+from .parsing import parse_incomplete
+from .text import TextIndex
+
+# Hashed feature space: 2 ** FEATURE_BITS weights per fallacy type and score.
+FEATURE_BITS = 18
+
+# A span labels a sentence when it covers at least this share of the shorter of the two.
+MIN_OVERLAP = 0.5
+
+# A predicted score agrees with the LLM's when it is within this many points (0-100).
+SCORE_TOLERANCE = 10.0
+
+_TOKEN = re.compile(r"\w+")
+_BIAS = 0  # feature index reserved for the intercept
+
+Features = Dict[int, float]
+
+
+def features(text: str, bits: int = FEATURE_BITS) -> Features:
+    """L2-normalized hashed lower-case word unigrams and bigrams, plus a bias feature."""
+    tokens = _TOKEN.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    mask = (1 << bits) - 1
+    counts: Features = {}
+    for gram in grams:
+        index = (zlib.crc32(gram.encode("utf-8")) & mask) or 1
+        counts[index] = counts.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    vector = {i: v / norm for i, v in counts.items()}
+    vector[_BIAS] = 1.0
+    return vector
+
+
+def sentence_examples(result: AnalysisResult) -> List[dict]:
+    """
+    One training row per sentence of an analysis.
+
+    Rows hold the sentence `text`, the sorted fallacy `labels` whose spans
+    cover it (see MIN_OVERLAP), their `severity`, and the document `scores`.
+    Failed parses, replay placeholders and repairs that needed default scores
+    yield no rows (see `parse_incomplete`). (Span explanations live in their
+    own cache namespace, so `ResultCache.results()` never yields them.)
+    """
+    if parse_incomplete(result):
+        return []
+    text = result.original_text
+    sentences = result.text_index.sentences
+    severity: List[Dict[str, int]] = [{} for _ in sentences]
+    for f in result.fallacies:
+        for i in result.text_index.overlapping(f.start, f.end):
+            start, end = sentences[i]
+            overlap = min(end, f.end) - max(start, f.start)
+            if overlap / (min(end - start, f.end - f.start) or 1) >= MIN_OVERLAP:
+                severity[i][f.fallacy_type] = max(severity[i].get(f.fallacy_type, 0), f.severity)
+
+    scores = {name: float(getattr(result, name, 50.0)) for name in SCORE_FIELDS}
+    return [
+        {
+            "text": text[start:end],
+            "labels": sorted(labels),
+            "severity": labels,
+            "scores": scores,
+        }
+        for (start, end), labels in zip(sentences, severity)
+    ]
+
+
+def export_training_data(results: Iterable[AnalysisResult], path: str) -> int:
+    """Write `sentence_examples` of every result to JSONL (gzip if `path` ends in .gz)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    count = 0
+    with opener(path, "wt", encoding="utf-8") as f:
+        for result in results:
+            for row in sentence_examples(result):
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def load_training_data(path: str) -> Iterator[dict]:
+    """Rows written by `export_training_data`."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def _dot(weights: Dict[int, float], x: Features) -> float:
+    return sum(weights.get(i, 0.0) * v for i, v in x.items())
+
+
+class DistilledModel:
+    """
+    Sentence-level fallacy-type classifier and score regressor.
+
+    Each sentence gets a probability per fallacy type; types at or above
+    `min_probability` become spans over the sentence. A sentence's confidence
+    is the certainty of its least certain yes/no decision (`max(p, 1 - p)`)
+    and a text's confidence is that of its least confident sentence, so one
+    ambiguous sentence is enough to send the text to the LLM. It is further
+    capped by the chance that every score lands within `score_tolerance`
+    points of the LLM's, given the regressors' error (`score_errors`, the
+    RMSE per score). A model without labels has learned nothing to be
+    confident about and reports confidence 0.
+
+    `threshold` is the confidence from which predictions agree with the LLM
+    often enough, as set by `calibrate` (None until calibrated).
+    """
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        bits: int = FEATURE_BITS,
+        label_weights: Optional[Dict[str, Dict[int, float]]] = None,
+        score_weights: Optional[Dict[str, Dict[int, float]]] = None,
+        severities: Optional[Dict[str, int]] = None,
+        score_errors: Optional[Dict[str, float]] = None,
+        score_tolerance: float = SCORE_TOLERANCE,
+        threshold: Optional[float] = None,
+    ):
+        self.labels = list(labels)
+        self.bits = bits
+        self.label_weights = label_weights or {label: {} for label in self.labels}
+        self.score_weights = score_weights or {name: {} for name in SCORE_FIELDS}
+        self.severities = severities or {}
+        self.score_errors = score_errors or {}
+        self.score_tolerance = score_tolerance
+        self.threshold = threshold
+
+    # ------------------------------------------------------------------ #
+    # Training
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def train(
+        cls,
+        rows: Iterable[dict],
+        epochs: int = 8,
+        learning_rate: float = 0.5,
+        bits: int = FEATURE_BITS,
+        seed: int = 0,
+    ) -> "DistilledModel":
+        """Fit on `sentence_examples` rows with plain SGD (learning rate decays per epoch)."""
+        data: List[Tuple[Features, set, Dict[str, float]]] = []
+        severity_sum: Dict[str, float] = {}
+        severity_n: Dict[str, int] = {}
+        for row in rows:
+            labels = set(row.get("labels", []))
+            for label, value in (row.get("severity") or {}).items():
+                severity_sum[label] = severity_sum.get(label, 0.0) + float(value)
+                severity_n[label] = severity_n.get(label, 0) + 1
+            scores = {name: float(row["scores"].get(name, 50.0)) / 100.0 for name in SCORE_FIELDS}
+            data.append((features(row["text"], bits), labels, scores))
+
+        model = cls(
+            labels=sorted({label for _, labels, _ in data for label in labels}),
+            bits=bits,
+            severities={k: round(severity_sum[k] / severity_n[k]) for k in severity_n},
+        )
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1.0 + epoch)
+            for x, labels, scores in data:
+                for label in model.labels:
+                    w = model.label_weights[label]
+                    gradient = _sigmoid(_dot(w, x)) - (1.0 if label in labels else 0.0)
+                    if gradient:
+                        for i, v in x.items():
+                            w[i] = w.get(i, 0.0) - rate * gradient * v
+                for name in SCORE_FIELDS:
+                    w = model.score_weights[name]
+                    gradient = _dot(w, x) - scores[name]
+                    for i, v in x.items():
+                        w[i] = w.get(i, 0.0) - rate * gradient * v
+
+        # Training error is optimistic; `calibrate` replaces it with held-out error.
+        model.score_errors = {
+            name: 100.0
+            * math.sqrt(
+                sum((_dot(model.score_weights[name], x) - s[name]) ** 2 for x, _, s in data)
+                / max(len(data), 1)
+            )
+            for name in SCORE_FIELDS
+        }
+        return model
+
+    def calibrate(
+        self, results: Iterable[AnalysisResult], target_agreement: float = 0.95
+    ) -> float:
+        """
+        Set `score_errors` and `threshold` from held-out LLM analyses.
+
+        `results` must not have been used for training. Score errors become
+        the RMSE of the predicted document scores. `threshold` becomes the
+        lowest confidence at which at least `target_agreement` of the texts
+        served locally agree with the LLM: the same fallacy types on every
+        sentence and every score within `score_tolerance`. It is infinite
+        (nothing is served locally) when no threshold reaches the target.
+        Returns `threshold`.
+        """
+        held_out = [r for r in results if sentence_examples(r)]
+        # Without score errors, predict() reports the label confidence alone.
+        self.score_errors = {}
+        predictions = [self.predict(r.original_text) for r in held_out]
+        predicted = [p for p, _ in predictions]
+        self.score_errors = {
+            name: math.sqrt(
+                sum(
+                    (getattr(p, name) - float(getattr(r, name, 50.0))) ** 2
+                    for p, r in zip(predicted, held_out)
+                )
+                / max(len(held_out), 1)
+            )
+            for name in SCORE_FIELDS
+        }
+
+        cap = self._score_confidence()
+        outcomes = sorted(
+            ((min(c, cap), self.agrees(p, r)) for (p, c), r in zip(predictions, held_out)),
+            reverse=True,
+        )
+        self.threshold = math.inf
+        agreed = 0
+        for served, (confidence, agrees) in enumerate(outcomes, start=1):
+            agreed += agrees
+            # Only cut between distinct confidences; ties are served together.
+            if served < len(outcomes) and outcomes[served][0] == confidence:
+                continue
+            if agreed / served >= target_agreement:
+                self.threshold = confidence
+        return self.threshold
+
+    def agrees(self, predicted: AnalysisResult, reference: AnalysisResult) -> bool:
+        """True if `predicted` labels every sentence and score as the LLM did in `reference`."""
+        rows = sentence_examples(reference)
+        spans = [
+            {f.fallacy_type for f in predicted.fallacies if (f.start, f.end) == bounds}
+            for bounds in predicted.text_index.sentences
+        ]
+        return [set(row["labels"]) for row in rows] == spans and all(
+            abs(getattr(predicted, name) - float(getattr(reference, name, 50.0)))
+            <= self.score_tolerance
+            for name in SCORE_FIELDS
+        )
+
+    # ------------------------------------------------------------------ #
+    # Prediction
+    # ------------------------------------------------------------------ #
+
+    def predict_sentence(self, text: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """`(probability per fallacy type, score per SCORE_FIELDS name on 0-100)` for one sentence."""
+        x = features(text, self.bits)
+        probabilities = {label: _sigmoid(_dot(self.label_weights[label], x)) for label in self.labels}
+        scores = {
+            name: max(0.0, min(100.0, 100.0 * _dot(self.score_weights[name], x)))
+            for name in SCORE_FIELDS
+        }
+        return probabilities, scores
+
+    def predict(self, text: str, min_probability: float = 0.5) -> Tuple[AnalysisResult, float]:
+        """
+        Analyze `text` locally; returns `(result, confidence)`.
+
+        Scores are the length-weighted mean of the sentence scores, as for
+        incremental analysis. `result.usage` records the latency and
+        `"tier": "local"`.
+        """
+        started = time.perf_counter()
+        index = TextIndex(text)
+        fallacies: List[FallacySpan] = []
+        weighted = {name: 0.0 for name in SCORE_FIELDS}
+        total = 0
+        confidence = self._score_confidence() if self.labels else 0.0
+        for start, end in index.sentences:
+            probabilities, scores = self.predict_sentence(text[start:end])
+            for label, p in probabilities.items():
+                confidence = min(confidence, max(p, 1.0 - p))
+                if p >= min_probability:
+                    fallacies.append(
+                        FallacySpan(
+                            start=start,
+                            end=end,
+                            text=text[start:end],
+                            fallacy_type=label,
+                            confidence=round(p, 4),
+                            severity=self.severities.get(label, 3),
+                            explanation="",
+                        )
+                    )
+            for name in SCORE_FIELDS:
+                weighted[name] += scores[name] * (end - start)
+            total += end - start
+
+        result = AnalysisResult(original_text=text, fallacies=fallacies)
+        result.text_index = index
+        for name in SCORE_FIELDS:
+            setattr(result, name, weighted[name] / total if total else 50.0)
+        result.usage = {
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "total_tokens": None,
+            "latency_s": round(time.perf_counter() - started, 4),
+            "tier": "local",
+        }
+        return result, confidence
+
+    def _score_confidence(self) -> float:
+        """Chance that every score is within `score_tolerance`, for normal `score_errors`."""
+        confidence = 1.0
+        for error in self.score_errors.values():
+            if error > 0:
+                within = math.erf(self.score_tolerance / (error * math.sqrt(2)))
+                confidence = min(confidence, within)
+        return confidence
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+
+    def save(self, path: str) -> None:
+        """Write the model as (gzipped, if `path` ends in .gz) JSON."""
+        payload = {
+            "labels": self.labels,
+            "bits": self.bits,
+            "severities": self.severities,
+            "score_errors": self.score_errors,
+            "score_tolerance": self.score_tolerance,
+            "threshold": self.threshold,
+            # Near-zero weights are dropped to keep the file small.
+            "label_weights": {
+                k: {i: round(v, 6) for i, v in w.items() if abs(v) >= 1e-6}
+                for k, w in self.label_weights.items()
+            },
+            "score_weights": {
+                k: {i: round(v, 6) for i, v in w.items() if abs(v) >= 1e-6}
+                for k, w in self.score_weights.items()
+            },
+        }
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "DistilledModel":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        def weights(table: Dict[str, Dict[str, float]]) -> Dict[str, Dict[int, float]]:
+            return {k: {int(i): v for i, v in w.items()} for k, w in table.items()}
+
+        return cls(
+            labels=payload["labels"],
+            bits=payload["bits"],
+            label_weights=weights(payload["label_weights"]),
+            score_weights=weights(payload["score_weights"]),
+            severities=payload.get("severities"),
+            score_errors=payload.get("score_errors"),
+            score_tolerance=payload.get("score_tolerance", SCORE_TOLERANCE),
+            threshold=payload.get("threshold"),
+        )
@@ -0,0 +1,129 @@
+"""HTML highlighting of fallacy spans, for long texts with overlapping spans."""
+
+from html import escape
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from .models import FallacySpan
+from .taxonomy import FALLACY_DEFINITIONS
+from .text import TextIndex
+
+# Characters per page when a long text is rendered a section at a time.
+DEFAULT_PAGE_CHARS = 8000
+
+Segment = Tuple[int, int, Tuple[int, ...]]
+
+
+def severity_color(severity: int) -> str:
+    """Background colour for a span of the given severity."""
+    if severity >= 4:
+        return "rgba(255, 99, 132, 0.35)"  # severe
+    if severity == 3:
+        return "rgba(255, 205, 86, 0.35)"  # medium
+    return "rgba(76, 201, 130, 0.35)"      # minor
+
+
+def segments(
+    spans: Sequence[FallacySpan],
+    start: int,
+    end: int,
+) -> List[Segment]:
+    """
+    Split `[start, end)` at every span boundary inside it.
+
+    Returns `(seg_start, seg_end, active)` tuples covering the window in order,
+    where `active` holds the indices (into `spans`) of every span covering that
+    segment. Nested and overlapping spans are handled in one sweep over the
+    sorted boundaries, so no text is emitted twice.
+    """
+    events: List[Tuple[int, int, int]] = []  # (position, +1 open / -1 close, span index)
+    for i, span in enumerate(spans):
+        s, e = max(span.start, start), min(span.end, end)
+        if s < e:
+            events.append((s, 1, i))
+            events.append((e, -1, i))
+    # Closes sort before opens at the same position, so touching spans don't overlap.
+    events.sort()
+
+    result: List[Segment] = []
+    active: List[int] = []
+    cursor = start
+    for pos, kind, i in events:
+        if pos > cursor:
+            result.append((cursor, pos, tuple(active)))
+            cursor = pos
+        if kind > 0:
+            active.append(i)
+        else:
+            active.remove(i)
+    if cursor < end:
+        result.append((cursor, end, ()))
+    return result
+
+
+def _tooltip(spans: Iterable[FallacySpan]) -> str:
+    parts = []
+    for f in spans:
+        part = f"{f.fallacy_type} (severity {f.severity}/5)"
+        definition = FALLACY_DEFINITIONS.get(f.fallacy_type, "")
+        parts.append(f"{part} — {definition}" if definition else part)
+    return "\n".join(parts)
+
+
+def render_html(
+    text: str,
+    spans: Sequence[FallacySpan],
+    start: int = 0,
+    end: Optional[int] = None,
+) -> str:
+    """
+    Highlighted HTML for `text[start:end]`.
+
+    Each segment covered by one or more spans becomes a single `<span>` coloured
+    by its most severe span, with every covering fallacy listed in the tooltip;
+    segments covered by several spans get an underline to mark the overlap.
+    """
+    end = len(text) if end is None else min(end, len(text))
+    parts: List[str] = []
+    for seg_start, seg_end, active in segments(spans, start, end):
+        chunk = escape(text[seg_start:seg_end])
+        if not active:
+            parts.append(chunk)
+            continue
+        covering = [spans[i] for i in active]
+        worst = max(f.severity for f in covering)
+        style = f"background:{severity_color(worst)}; border-radius:4px; padding:0 2px; cursor:help;"
+        if len(covering) > 1:
+            style += " border-bottom:2px solid rgba(0, 0, 0, 0.45);"
+        parts.append(f"<span style='{style}' title=\"{escape(_tooltip(covering))}\">{chunk}</span>")
+    return "<div class='highlighted-text'>" + "".join(parts) + "</div>"
+
+
+def page_bounds(
+    text: Union[str, TextIndex],
+    page_chars: int = DEFAULT_PAGE_CHARS,
+) -> List[Tuple[int, int]]:
+    """
+    Split a text into `[start, end)` pages of about `page_chars` characters.
+
+    Pages break before a paragraph when one starts in the second half of the
+    page, otherwise before a sentence, otherwise at whitespace, so words are
+    never cut. Pass the text's `TextIndex` (e.g. `result.text_index`) to reuse
+    its boundaries.
+    """
+    index = text if isinstance(text, TextIndex) else TextIndex(text)
+    text = index.text
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    while len(text) - start > page_chars:
+        limit = start + page_chars
+        low = start + page_chars // 2
+        cut = index.last_start_between(low, limit, "paragraph")
+        if cut is None:
+            cut = index.last_start_between(low, limit, "sentence")
+        if cut is None:
+            pos = max(text.rfind(" ", low, limit), text.rfind("\n", low, limit))
+            cut = pos + 1 if pos != -1 else limit
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(text)))
+    return bounds
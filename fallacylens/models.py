@@ -1,5 +1,9 @@
+from collections import Counter
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import cached_property
+from typing import Dict, List, Optional
+
+from .text import TextIndex
 
 
 @dataclass
@@ -26,3 +30,54 @@ class AnalysisResult:
     @property
     def has_fallacies(self) -> bool:
         return len(self.fallacies) > 0
+
+    @cached_property
+    def text_index(self) -> TextIndex:
+        """Sentence/paragraph index of `original_text`, built on first use and kept."""
+        return TextIndex(self.original_text)
+
+
+@dataclass
+class AnalyzedUnit:
+    """One paragraph/sentence of an incrementally analyzed text and its own result."""
+
+    start: int
+    end: int
+    key: str  # detector cache key of the unit text (covers model and parameters)
+    result: AnalysisResult  # span offsets relative to the unit
+
+
+SCORE_FIELDS = ("clarity_score", "persuasion_score", "reliability_score")
+
+
+@dataclass
+class ComparisonResult:
+    """Side-by-side diff of two analyzed texts (A vs B)."""
+
+    a: AnalysisResult
+    b: AnalysisResult
+    score_deltas: Dict[str, float]
+    type_counts_a: Dict[str, int]
+    type_counts_b: Dict[str, int]
+    shared_types: List[str]
+    only_a_types: List[str]
+    only_b_types: List[str]
+
+    @classmethod
+    def from_results(cls, a: AnalysisResult, b: AnalysisResult) -> "ComparisonResult":
+        """Build the diff; score deltas are B minus A."""
+        counts_a = Counter(f.fallacy_type for f in a.fallacies)
+        counts_b = Counter(f.fallacy_type for f in b.fallacies)
+        return cls(
+            a=a,
+            b=b,
+            score_deltas={
+                name: float(getattr(b, name, 50.0)) - float(getattr(a, name, 50.0))
+                for name in SCORE_FIELDS
+            },
+            type_counts_a=dict(counts_a),
+            type_counts_b=dict(counts_b),
+            shared_types=sorted(counts_a.keys() & counts_b.keys()),
+            only_a_types=sorted(counts_a.keys() - counts_b.keys()),
+            only_b_types=sorted(counts_b.keys() - counts_a.keys()),
+        )
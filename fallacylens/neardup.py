@@ -0,0 +1,239 @@
+"""
+Near-duplicate reuse of analyses.
+
+Texts that differ only by case, whitespace or punctuation (or that drop some
+of the old words) share most of their word shingles. `NearDuplicateIndex`
+finds such a previously analyzed text with MinHash signatures and an LSH index
+over signature bands, then carries the old spans over to the new text through
+a character alignment. The match is rejected if the new text adds or replaces
+any words, since the analysis never saw them, or if any span cannot be aligned,
+so a reused result never points at the wrong characters.
+"""
+
+import bisect
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models import SCORE_FIELDS, AnalysisResult
+
+NUM_PERM = 64
+
+# Longest differing stretch (after the common prefix and suffix) that
+# `remap_result` will align; the alignment is quadratic in it.
+MAX_DIFF_CHARS = 2_000
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(NUM_PERM)]
+_TOKEN = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def minhash(text: str) -> Optional[Signature]:
+    """
+    MinHash signature over lower-cased word unigrams and bigrams.
+
+    Punctuation and whitespace are ignored. Returns None for text without words.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    features = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    if not features:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+        for f in features
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the two feature sets."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _fold(text: str) -> str:
+    # Lower-case without changing the length, so offsets stay valid.
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _word_chars(text: str) -> int:
+    return sum(len(t) for t in _TOKEN.findall(text))
+
+
+def _alignment(old: str, new: str, max_diff: int) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Matching `(old start, new start, size)` blocks of `old` and `new`, or None
+    if `new` inserts or replaces word characters, or differs from `old` over
+    more than `max_diff` characters.
+
+    The common prefix and suffix are matched directly, so only the stretch in
+    between goes through `SequenceMatcher`.
+    """
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_mid, new_mid = old[prefix : len(old) - suffix], new[prefix : len(new) - suffix]
+    if max(len(old_mid), len(new_mid)) > max_diff:
+        return None
+
+    blocks = [(0, 0, prefix)] if prefix else []
+    matcher = SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("insert", "replace") and _TOKEN.search(new_mid[j1:j2]):
+            return None
+        if tag == "equal":
+            blocks.append((prefix + i1, prefix + j1, i2 - i1))
+    if suffix:
+        blocks.append((len(old) - suffix, len(new) - suffix, suffix))
+    return blocks
+
+
+def remap_result(
+    result: AnalysisResult, new_text: str, max_diff: int = MAX_DIFF_CHARS
+) -> Optional[AnalysisResult]:
+    """
+    Copy `result` onto `new_text`, moving each span through a character alignment.
+
+    Returns None if `new_text` inserts or replaces anything beyond whitespace
+    and punctuation (ignoring case), or differs over more than `max_diff`
+    characters. A span survives only if its text (ignoring case) appears
+    unchanged at the aligned position in `new_text`; the match is rejected as
+    soon as any span fails, since the analysis of an edited span cannot be
+    trusted.
+    """
+    old_folded, new_folded = _fold(result.original_text), _fold(new_text)
+    # New words can only be matched against old ones, so fewer word characters
+    # in the old text rules the reuse out without aligning anything.
+    if _word_chars(new_folded) > _word_chars(old_folded):
+        return None
+    blocks = _alignment(old_folded, new_folded, max_diff)
+    if blocks is None:
+        return None
+    starts = [a for a, _, _ in blocks]
+
+    fallacies = []
+    for f in result.fallacies:
+        i = bisect.bisect_right(starts, f.start) - 1
+        if f.end <= f.start or i < 0 or f.start >= blocks[i][0] + blocks[i][2]:
+            return None
+        start = blocks[i][1] + (f.start - blocks[i][0])
+        end = start + (f.end - f.start)
+        if new_folded[start:end] != old_folded[f.start : f.end]:
+            return None
+        fallacies.append(replace(f, start=start, end=end, text=new_text[start:end]))
+
+    remapped = AnalysisResult(original_text=new_text, fallacies=fallacies)
+    for name in SCORE_FIELDS:
+        setattr(remapped, name, float(getattr(result, name, 50.0)))
+    remapped.parse_quality = getattr(result, "parse_quality", "ok")
+    return remapped
+
+
+class NearDuplicateIndex:
+    """
+    Thread-safe LSH index of recent analyses, keyed by MinHash signature.
+
+    Signatures are split into `bands` bands; texts sharing any whole band
+    become candidates, then must reach `min_similarity` (estimated Jaccard
+    similarity of word shingles) and survive `remap_result`. With the default
+    16 bands of 4 rows, pairs at 0.8 similarity are found with ~99.9%
+    probability. `scope` keeps analyses made with different models or
+    parameters apart. Texts longer than `max_chars` are not indexed, to bound
+    the alignment cost. At most `maxsize` analyses are kept (LRU by insertion).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        min_similarity: float = 0.8,
+        bands: int = 16,
+        max_chars: int = 20_000,
+    ):
+        if NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}.")
+        self.maxsize = max(1, maxsize)
+        self.min_similarity = min_similarity
+        self.bands = bands
+        self.max_chars = max_chars
+        self._rows = NUM_PERM // bands
+        self._entries: "OrderedDict[int, Tuple[str, Signature, AnalysisResult]]" = OrderedDict()
+        self._buckets: Dict[tuple, Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def _band_keys(self, scope: str, signature: Signature) -> List[tuple]:
+        rows = self._rows
+        return [(scope, band, signature[band * rows : (band + 1) * rows]) for band in range(self.bands)]
+
+    def add(self, scope: str, result: AnalysisResult) -> None:
+        """Index a fresh analysis of `result.original_text` under `scope`."""
+        if len(result.original_text) > self.max_chars:
+            return
+        signature = minhash(result.original_text)
+        if signature is None:
+            return
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, signature, result)
+            for key in self._band_keys(scope, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.maxsize:
+                old_id, (old_scope, old_signature, _) = self._entries.popitem(last=False)
+                for key in self._band_keys(old_scope, old_signature):
+                    bucket = self._buckets.get(key)
+                    if bucket is not None:
+                        bucket.discard(old_id)
+                        if not bucket:
+                            del self._buckets[key]
+
+    def lookup(self, scope: str, text: str) -> Optional[AnalysisResult]:
+        """Return a previous analysis remapped onto `text`, or None."""
+        signature = minhash(text) if len(text) <= self.max_chars else None
+        if signature is None:
+            return None
+        with self._lock:
+            ids: Set[int] = set()
+            for key in self._band_keys(scope, signature):
+                ids |= self._buckets.get(key, set())
+            scored = sorted(
+                ((similarity(signature, self._entries[i][1]), i) for i in ids), reverse=True
+            )
+            candidates = [self._entries[i][2] for sim, i in scored if sim >= self.min_similarity]
+
+        for candidate in candidates:
+            remapped = remap_result(candidate, text)
+            if remapped is not None:
+                self.hits += 1
+                return remapped
+        if candidates:
+            self.rejected += 1
+        else:
+            self.misses += 1
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+        }
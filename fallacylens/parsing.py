@@ -0,0 +1,206 @@
+"""Helpers for parsing JSON produced by the model, including streamed output."""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+
+class StreamingArrayParser:
+    """
+    Incrementally extract complete objects from one array in a streamed JSON document.
+
+    Feed the raw completion text chunk by chunk; `feed` returns the objects of
+    the top-level array stored under `key` that became complete with that chunk.
+    Anything outside that array (scores, markdown fences) is ignored here and
+    left to a full parse once the stream ends.
+    """
+
+    def __init__(self, key: str = "fallacies"):
+        self.key = key
+        self.items: List[dict] = []
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._array_depth: Optional[int] = None
+        self._array_closed = False
+        self._item_start: Optional[int] = None
+        self._key_pattern = re.compile(r'"%s"\s*:\s*$' % re.escape(key))
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk of output and return any newly completed array items."""
+        self._buffer += chunk
+        completed: List[dict] = []
+        buf = self._buffer
+
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if (
+                    ch == "["
+                    and self._depth == 1
+                    and self._array_depth is None
+                    and not self._array_closed
+                    and self._key_pattern.search(buf[max(0, self._pos - 64 - len(self.key)) : self._pos])
+                ):
+                    self._array_depth = 2
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = self._pos
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if ch == "}" and self._depth == self._array_depth and self._item_start is not None:
+                        item = self._load(buf[self._item_start : self._pos + 1])
+                        self._item_start = None
+                        if item is not None:
+                            completed.append(item)
+                    elif ch == "]" and self._depth == self._array_depth - 1:
+                        # The target array is closed; later arrays are not ours.
+                        self._array_depth = None
+                        self._array_closed = True
+
+            self._pos += 1
+
+        self.items.extend(completed)
+        return completed
+
+    @staticmethod
+    def _load(fragment: str) -> Optional[dict]:
+        try:
+            item = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
+
+
+# Outcomes reported by `parse_json_object`.
+PARSE_OK = "ok"  # parsed as-is (after stripping fences / surrounding prose)
+PARSE_REPAIRED = "repaired"  # truncated; cut back to the last complete element
+PARSE_FAILED = "failed"  # nothing usable; callers fall back to defaults
+PARSE_SYNTHESIZED = "synthesized"  # placeholder served for a replay miss; not an analysis
+
+# Key of the placeholder object a replay miss is answered with (see
+# `fallacylens.replay.SYNTHESIZED_CONTENT`).
+SYNTHESIZED_MARKER = "_fallacylens_synthesized"
+
+
+def parse_incomplete(result: Any) -> bool:
+    """
+    True if `result` (an AnalysisResult) is not a complete analysis.
+
+    That covers failed parses, replay placeholders, and repaired parses whose
+    scores or fallacy list were filled in with defaults (see
+    `defaulted_fields`). Such results are returned to the caller but never
+    cached, reused for near-duplicates or exported for distillation.
+    """
+    quality = getattr(result, "parse_quality", PARSE_OK)
+    if quality in (PARSE_FAILED, PARSE_SYNTHESIZED):
+        return True
+    return quality == PARSE_REPAIRED and bool(getattr(result, "defaulted_fields", ()))
+
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+# How many cut points `_repair_truncated` tries before giving up.
+_MAX_REPAIR_ATTEMPTS = 64
+
+
+def parse_json_object(content: str) -> Tuple[dict, str]:
+    """
+    Parse a JSON object from model output, salvaging what can be salvaged.
+
+    Markdown fences and prose around the object are ignored. A truncated
+    document is closed after its last complete element, so complete array
+    items survive and only the unfinished tail is lost. Returns
+    `(data, quality)` with quality one of PARSE_OK / PARSE_REPAIRED /
+    PARSE_FAILED (`data` is `{}` when it failed), or PARSE_SYNTHESIZED with
+    `{}` for the replay placeholder.
+    """
+    fenced = _FENCE.search(content)
+    body = fenced.group(1) if fenced else content
+    start = body.find("{")
+    if start == -1:
+        return {}, PARSE_FAILED
+    body = body[start:].strip()
+
+    end = body.rfind("}")
+    for candidate in (body, body[: end + 1] if end != -1 else None):
+        if candidate is None:
+            continue
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            if data.get(SYNTHESIZED_MARKER):
+                return {}, PARSE_SYNTHESIZED
+            return data, PARSE_OK
+
+    data = _repair_truncated(body)
+    if data is None:
+        return {}, PARSE_FAILED
+    return data, PARSE_REPAIRED
+
+
+def _complete_items_only(stack: List[str]) -> bool:
+    # Cut only between array items or top-level members, never inside a nested
+    # object, so no half-written span object is kept.
+    return "}" not in stack[1:]
+
+
+def _repair_truncated(body: str) -> Optional[dict]:
+    """Close a truncated JSON object at the latest point where that yields valid JSON."""
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []  # (end of kept prefix, closers needed there)
+    in_string = escape = False
+    for pos, ch in enumerate(body):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            if ch == "[" and _complete_items_only(stack):
+                # An array cut before its first complete item is kept, empty.
+                cuts.append((pos + 1, "".join(reversed(stack))))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                break
+            if _complete_items_only(stack):
+                cuts.append((pos + 1, "".join(reversed(stack))))
+        elif ch == "," and stack and _complete_items_only(stack):
+            cuts.append((pos, "".join(reversed(stack))))
+
+    for cut, closers in reversed(cuts[-_MAX_REPAIR_ATTEMPTS:]):
+        try:
+            data = json.loads(body[:cut] + closers)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
@@ -0,0 +1,248 @@
+"""
+Record/replay of upstream chat completions.
+
+In record mode every completion the detector requests is appended to a
+`ReplayArchive` under a fingerprint of the request (model, messages, sampling
+parameters). In replay mode completions are served back from the archive
+without a network call, so past analyses can be rerun deterministically, for
+regression tests or after changing post-processing, at no API cost.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .parsing import SYNTHESIZED_MARKER
+from .serialization import dumps_json
+
+Completion = Tuple[str, dict]
+
+MODES = ("record", "replay")
+MISS_POLICIES = ("fail", "passthrough", "synthesize")
+
+# Served for a miss under the "synthesize" policy: valid JSON that every
+# detector prompt parses into its neutral defaults, flagged so the detector
+# reports it as PARSE_SYNTHESIZED and never caches or indexes it.
+SYNTHESIZED_CONTENT = json.dumps({SYNTHESIZED_MARKER: True})
+
+_TRANSPORT_ARGS = ("stream", "response_format")
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode when a request is not in the archive (policy "fail")."""
+
+
+def request_fingerprint(request: Dict[str, Any]) -> str:
+    """
+    Stable hex digest of the completion request arguments.
+
+    Transport-only arguments (`stream`, `response_format`) are ignored, so a
+    streamed analysis replays a recording of the same prompt made through the
+    JSON-mode, non-streaming path (and vice versa).
+    """
+    payload = json.dumps(
+        {k: v for k, v in request.items() if k not in _TRANSPORT_ARGS},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplayArchive:
+    """
+    Append-only archive of recorded completions, one compact JSON line each.
+
+    Records hold the request fingerprint, model, raw completion text and usage;
+    prompts are not stored. Paths ending in `.gz` are gzip-compressed (each
+    append adds a gzip member, which readers concatenate transparently). The
+    latest record for a fingerprint wins, and a torn final line left by a
+    crash is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with self._open("r") as f:
+            try:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict) and "fp" in record:
+                        self._records[record["fp"]] = record
+            except EOFError:  # truncated gzip member
+                pass
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        return self._records.get(fingerprint)
+
+    def append(self, fingerprint: str, model: str, content: str, usage: dict) -> None:
+        record = {
+            "fp": fingerprint,
+            "model": model,
+            "content": content,
+            "usage": usage,
+            "recorded_at": round(time.time(), 3),
+        }
+        line = dumps_json(record).decode("utf-8") + "\n"
+        with self._lock:
+            with self._open("a") as f:
+                f.write(line)
+            self._records[fingerprint] = record
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class ReplayTransport:
+    """
+    Sits between the detector and the upstream API.
+
+    mode="record" calls upstream and archives every completion.
+    mode="replay" serves archived completions; on a miss, `on_miss` decides:
+    "fail" raises ReplayMiss, "passthrough" calls upstream (without recording),
+    and "synthesize" returns an empty JSON object, which the detector turns
+    into a neutral result. Returned usage carries a "replay" entry naming the
+    source: "recorded", "replayed", "passthrough" or "synthesized".
+    """
+
+    def __init__(self, archive: ReplayArchive, mode: str = "replay", on_miss: str = "fail"):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported replay mode {mode!r}; expected one of {MODES}.")
+        if on_miss not in MISS_POLICIES:
+            raise ValueError(
+                f"Unsupported miss policy {on_miss!r}; expected one of {MISS_POLICIES}."
+            )
+        self.archive = archive
+        self.mode = mode
+        self.on_miss = on_miss
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @classmethod
+    def from_path(cls, path: str, mode: str = "replay", on_miss: str = "fail") -> "ReplayTransport":
+        return cls(ReplayArchive(path), mode=mode, on_miss=on_miss)
+
+    @property
+    def needs_upstream(self) -> bool:
+        """Whether this transport may call the real API (so credentials are required)."""
+        return self.mode == "record" or self.on_miss == "passthrough"
+
+    def _lookup(self, request: Dict[str, Any]) -> Tuple[str, Optional[Completion]]:
+        """Fingerprint the request; return a completion if replay can answer without upstream."""
+        fingerprint = request_fingerprint(request)
+        if self.mode == "record":
+            return fingerprint, None
+        record = self.archive.get(fingerprint)
+        if record is not None:
+            self.hits += 1
+            return fingerprint, (record["content"], dict(record.get("usage") or {}, replay="replayed"))
+        self.misses += 1
+        if self.on_miss == "fail":
+            raise ReplayMiss(f"No recorded completion for request {fingerprint[:12]}.")
+        if self.on_miss == "synthesize":
+            usage = {
+                "prompt_tokens": None,
+                "completion_tokens": None,
+                "total_tokens": None,
+                "latency_s": 0.0,
+                "replay": "synthesized",
+            }
+            return fingerprint, (SYNTHESIZED_CONTENT, usage)
+        return fingerprint, None
+
+    def _finish(self, fingerprint: str, request: Dict[str, Any], completion: Completion) -> Completion:
+        content, usage = completion
+        if self.mode == "record":
+            self.archive.append(fingerprint, request.get("model", ""), content, usage)
+            self.recorded += 1
+            return content, dict(usage, replay="recorded")
+        return content, dict(usage, replay="passthrough")
+
+    def complete(
+        self,
+        request: Dict[str, Any],
+        upstream: Callable[[Dict[str, Any]], Completion],
+    ) -> Completion:
+        """Answer `request` from the archive or via `upstream(request)`, per mode and policy."""
+        fingerprint, served = self._lookup(request)
+        if served is not None:
+            return served
+        return self._finish(fingerprint, request, upstream(request))
+
+    async def acomplete(
+        self,
+        request: Dict[str, Any],
+        upstream: Callable[[Dict[str, Any]], Awaitable[Completion]],
+    ) -> Completion:
+        """Async counterpart of `complete`; archive writes run off the event loop."""
+        fingerprint, served = self._lookup(request)
+        if served is not None:
+            return served
+        completion = await upstream(request)
+        return await asyncio.to_thread(self._finish, fingerprint, request, completion)
+
+    async def astream(
+        self,
+        request: Dict[str, Any],
+        upstream: Callable[[Dict[str, Any]], AsyncIterator[str]],
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of `acomplete`.
+
+        A replayed completion arrives as a single delta. A recorded stream is
+        archived only once it has been consumed to the end.
+        """
+        fingerprint, served = self._lookup(request)
+        if served is not None:
+            if served[0]:
+                yield served[0]
+            return
+        started = time.perf_counter()
+        parts: List[str] = []
+        deltas = upstream(request)
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield delta
+        finally:
+            await deltas.aclose()
+        usage = {
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "total_tokens": None,
+            "latency_s": round(time.perf_counter() - started, 4),
+        }
+        await asyncio.to_thread(self._finish, fingerprint, request, ("".join(parts).strip(), usage))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "on_miss": self.on_miss,
+            "size": len(self.archive),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
@@ -0,0 +1,146 @@
+"""Fast conversion of analysis results into wire payloads (JSON, MessagePack, compressed)."""
+
+import gzip
+import json
+from typing import Any, Optional, Tuple
+
+from .models import AnalysisResult, ComparisonResult, FallacySpan
+
+try:  # Optional speedups / formats; everything works without them.
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+
+FORMATS = ("json", "msgpack")
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def span_to_dict(f: FallacySpan, include_text: bool = True) -> dict:
+    """Plain-dict view of a FallacySpan, matching the API's FallacySpanResponse."""
+    data = {"start": f.start, "end": f.end}
+    if include_text:
+        data["text"] = f.text
+    data["fallacy_type"] = f.fallacy_type
+    data["confidence"] = f.confidence
+    data["severity"] = f.severity
+    data["explanation"] = f.explanation
+    data["suggestion"] = f.suggestion
+    return data
+
+
+def result_to_dict(
+    result: AnalysisResult,
+    include_text: bool = True,
+    include_span_text: bool = True,
+) -> dict:
+    """
+    Plain-dict view of an AnalysisResult, matching the API's AnalyzeResponse.
+
+    Built straight from the dataclasses, without intermediate pydantic models.
+    `include_text` / `include_span_text` drop the echoed input and the per-span
+    excerpts, which clients can slice from their own copy of the text.
+    """
+    data = {"original_text": result.original_text} if include_text else {}
+    data["clarity_score"] = float(getattr(result, "clarity_score", 50.0))
+    data["persuasion_score"] = float(getattr(result, "persuasion_score", 50.0))
+    data["reliability_score"] = float(getattr(result, "reliability_score", 50.0))
+    data["has_fallacies"] = result.has_fallacies
+    data["parse_quality"] = getattr(result, "parse_quality", "ok")
+    data["defaulted_fields"] = list(getattr(result, "defaulted_fields", []))
+    data["fallacies"] = [span_to_dict(f, include_span_text) for f in result.fallacies]
+    return data
+
+
+def comparison_to_dict(
+    comparison: ComparisonResult,
+    include_text: bool = True,
+    include_span_text: bool = True,
+) -> dict:
+    """Plain-dict view of a ComparisonResult, matching the API's CompareResponse."""
+    return {
+        "a": result_to_dict(comparison.a, include_text, include_span_text),
+        "b": result_to_dict(comparison.b, include_text, include_span_text),
+        "score_deltas": comparison.score_deltas,
+        "type_counts_a": comparison.type_counts_a,
+        "type_counts_b": comparison.type_counts_b,
+        "shared_types": comparison.shared_types,
+        "only_a_types": comparison.only_a_types,
+        "only_b_types": comparison.only_b_types,
+    }
+
+
+def result_from_dict(data: dict) -> AnalysisResult:
+    """Rebuild an AnalysisResult from `result_to_dict` output (with text included)."""
+    text = data["original_text"]
+    fallacies = [
+        FallacySpan(
+            start=int(f["start"]),
+            end=int(f["end"]),
+            text=f["text"] if "text" in f else text[int(f["start"]) : int(f["end"])],
+            fallacy_type=f["fallacy_type"],
+            confidence=float(f["confidence"]),
+            severity=int(f["severity"]),
+            explanation=f.get("explanation", ""),
+            suggestion=f.get("suggestion"),
+        )
+        for f in data.get("fallacies", [])
+    ]
+    result = AnalysisResult(original_text=text, fallacies=fallacies)
+    result.clarity_score = float(data.get("clarity_score", 50.0))
+    result.persuasion_score = float(data.get("persuasion_score", 50.0))
+    result.reliability_score = float(data.get("reliability_score", 50.0))
+    result.parse_quality = data.get("parse_quality", "ok")
+    result.defaulted_fields = list(data.get("defaulted_fields", []))
+    return result
+
+
+def dumps_json(payload: Any) -> bytes:
+    """Encode to compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_payload(
+    payload: Any,
+    fmt: str = "json",
+    compression: Optional[str] = None,
+) -> Tuple[bytes, str, Optional[str]]:
+    """
+    Encode a payload for the wire.
+
+    Returns `(body, media_type, content_encoding)`. Raises ValueError for an
+    unknown format/compression or when the optional package it needs
+    (`msgpack`, `zstandard`) is not installed.
+    """
+    if fmt == "json":
+        body = dumps_json(payload)
+        media_type = "application/json"
+    elif fmt == "msgpack":
+        if msgpack is None:
+            raise ValueError("MessagePack output requires the 'msgpack' package.")
+        body = msgpack.packb(payload, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}.")
+
+    if compression is None:
+        return body, media_type, None
+    if compression == "gzip":
+        return gzip.compress(body, compresslevel=5), media_type, "gzip"
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package.")
+        return zstandard.ZstdCompressor(level=3).compress(body), media_type, "zstd"
+    raise ValueError(f"Unsupported compression {compression!r}; expected one of {COMPRESSIONS}.")
@@ -8,4 +8,57 @@ FALLACY_DEFINITIONS = {
     "False Cause": "Assuming that because one thing follows another, it was caused by it.",
     "Strawman": "Misrepresenting an opponent's position to make it easier to attack.",
     "Circular Reasoning": "Using the conclusion as a premise for the argument.",
+    "False Dilemma": "Presenting only two options when more exist.",
+    "Appeal to Authority": "Treating a claim as true because an authority figure said it.",
+    "Appeal to Emotion": "Using feelings such as fear or pity in place of evidence.",
+    "Red Herring": "Diverting attention to an irrelevant issue.",
 }
+
+# Short codes the model may use instead of full names (compact output modes).
+FALLACY_CODES = {
+    "AH": "Ad Hominem",
+    "SS": "Slippery Slope",
+    "BW": "Bandwagon",
+    "HG": "Hasty Generalization",
+    "FC": "False Cause",
+    "SM": "Strawman",
+    "CR": "Circular Reasoning",
+    "FD": "False Dilemma",
+    "AA": "Appeal to Authority",
+    "AE": "Appeal to Emotion",
+    "RH": "Red Herring",
+}
+
+# Other names models commonly use for the same fallacies (matched case-insensitively).
+FALLACY_ALIASES = {
+    "personal attack": "Ad Hominem",
+    "ad populum": "Bandwagon",
+    "appeal to popularity": "Bandwagon",
+    "overgeneralization": "Hasty Generalization",
+    "post hoc": "False Cause",
+    "post hoc ergo propter hoc": "False Cause",
+    "questionable cause": "False Cause",
+    "straw man": "Strawman",
+    "begging the question": "Circular Reasoning",
+    "false dichotomy": "False Dilemma",
+    "black-and-white thinking": "False Dilemma",
+    "either/or fallacy": "False Dilemma",
+    "argument from authority": "Appeal to Authority",
+    "appeal to fear": "Appeal to Emotion",
+    "appeal to pity": "Appeal to Emotion",
+}
+
+_CANONICAL = {
+    **{name.lower(): name for name in FALLACY_DEFINITIONS},
+    **FALLACY_ALIASES,
+}
+
+
+def canonical_fallacy_type(label: str) -> str:
+    """
+    Map a short code, alias or differently-cased name to its canonical name.
+
+    Unknown labels are returned stripped but otherwise unchanged.
+    """
+    label = label.strip()
+    return FALLACY_CODES.get(label.upper()) or _CANONICAL.get(label.lower(), label)
@@ -0,0 +1,114 @@
+"""Splitting text into paragraph and sentence units with character offsets."""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+
+
+def _strip_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split(text: str, pattern: "re.Pattern[str]") -> List[Tuple[int, int]]:
+    bounds = []
+    start = 0
+    for match in pattern.finditer(text):
+        bounds.append(_strip_bounds(text, start, match.start()))
+        start = match.end()
+    bounds.append(_strip_bounds(text, start, len(text)))
+    return [(s, e) for s, e in bounds if s < e]
+
+
+def paragraph_bounds(text: str) -> List[Tuple[int, int]]:
+    """`[start, end)` of each paragraph (blank-line separated), whitespace trimmed."""
+    return _split(text, _PARAGRAPH_BREAK)
+
+
+def sentence_bounds(text: str) -> List[Tuple[int, int]]:
+    """`[start, end)` of each sentence (ends at . ! ? and one closing quote/bracket), trimmed."""
+    return _split(text, _SENTENCE_END)
+
+
+def unit_bounds(text: str, unit: str = "paragraph") -> List[Tuple[int, int]]:
+    """Paragraph or sentence bounds; raises ValueError for any other `unit`."""
+    if unit == "paragraph":
+        return paragraph_bounds(text)
+    if unit == "sentence":
+        return sentence_bounds(text)
+    raise ValueError(f"Unsupported unit {unit!r}; expected 'paragraph' or 'sentence'.")
+
+
+class TextIndex:
+    """
+    Sentence and paragraph boundaries of one text, with offset lookups.
+
+    Boundaries are computed on first use and kept, so every consumer of the
+    same text (span clamping, incremental units, highlight paging, bias spans,
+    distillation) shares one scan. Lookups binary-search sorted start offsets.
+    An AnalysisResult exposes the index of its text as `result.text_index`.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._bounds: Dict[str, List[Tuple[int, int]]] = {}
+        self._starts: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def units(self, unit: str = "paragraph") -> List[Tuple[int, int]]:
+        """Paragraph or sentence bounds (as `unit_bounds`), computed once per unit."""
+        bounds = self._bounds.get(unit)
+        if bounds is None:
+            bounds = self._bounds[unit] = unit_bounds(self.text, unit)
+            self._starts[unit] = [s for s, _ in bounds]
+        return bounds
+
+    @property
+    def sentences(self) -> List[Tuple[int, int]]:
+        return self.units("sentence")
+
+    @property
+    def paragraphs(self) -> List[Tuple[int, int]]:
+        return self.units("paragraph")
+
+    def starts(self, unit: str = "sentence") -> List[int]:
+        """Sorted start offsets of the unit bounds."""
+        self.units(unit)
+        return self._starts[unit]
+
+    def unit_at(self, offset: int, unit: str = "sentence") -> Optional[int]:
+        """Index of the unit containing `offset`, or None if it falls between units."""
+        i = bisect.bisect_right(self.starts(unit), offset) - 1
+        if i >= 0 and offset < self._bounds[unit][i][1]:
+            return i
+        return None
+
+    def overlapping(self, start: int, end: int, unit: str = "sentence") -> range:
+        """Indices of the units overlapping `[start, end)`."""
+        bounds = self.units(unit)
+        first = bisect.bisect_right(self.starts(unit), start) - 1
+        if first < 0 or bounds[first][1] <= start:
+            first += 1
+        last = bisect.bisect_left(self._starts[unit], end)
+        return range(first, max(first, last))
+
+    def clamp(self, start: int, end: int) -> Tuple[int, int]:
+        """`[start, end)` clamped into the text, with `end >= start`."""
+        start = max(0, min(start, len(self.text)))
+        return start, max(start, min(end, len(self.text)))
+
+    def last_start_between(self, low: int, high: int, unit: str) -> Optional[int]:
+        """The largest unit start `s` with `low < s <= high`, or None."""
+        starts = self.starts(unit)
+        i = bisect.bisect_right(starts, high) - 1
+        if i >= 0 and starts[i] > low:
+            return starts[i]
+        return None
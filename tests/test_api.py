@@ -0,0 +1,216 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from fallacylens.cache import MemoryCache  # noqa: E402
+from fallacylens.neardup import NearDuplicateIndex  # noqa: E402
+from test_detector import PAYLOAD, FakeAsyncCompletions, _client  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    import api.main as main
+
+    completions = FakeAsyncCompletions(json.dumps(PAYLOAD))
+    detector = main.get_detector()
+    monkeypatch.setattr(detector, "async_client", _client(completions))
+    monkeypatch.setattr(detector, "cache", MemoryCache(16))
+    monkeypatch.setattr(detector, "near_duplicates", NearDuplicateIndex())
+    return TestClient(main.app), completions
+
+
+def test_analyze_returns_etag_and_honours_if_none_match(api):
+    client, completions = api
+    first = client.post("/analyze", json={"text": "You're wrong, kid."})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.post(
+        "/analyze", json={"text": "You're wrong, kid."}, headers={"If-None-Match": etag}
+    )
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert len(completions.calls) == 1
+
+
+def test_failed_parse_is_not_cacheable_downstream(api):
+    client, completions = api
+    completions.content = "Sorry, I can't help with that."
+    response = client.post("/analyze", json={"text": "Unparseable reply."})
+    assert response.json()["parse_quality"] == "failed"
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+    completions.content = json.dumps({"fallacies": PAYLOAD["fallacies"]})[:-1]
+    response = client.post("/analyze", json={"text": "Truncated before the scores."})
+    assert response.json()["parse_quality"] == "repaired"
+    assert response.json()["defaulted_fields"] == [
+        "clarity_score",
+        "persuasion_score",
+        "reliability_score",
+    ]
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_uncached_results_get_no_etag(api):
+    client, completions = api
+    first = client.post("/analyze", json={"text": "You're wrong because you're young, kid."})
+    assert "etag" in first.headers
+
+    reused = client.post("/analyze", json={"text": "you're wrong because you're young, kid!"})
+    assert len(completions.calls) == 1
+    assert reused.headers["cache-control"] == "no-store"
+    assert "etag" not in reused.headers
+
+
+def test_batch_streams_one_line_per_input(api):
+    client, _ = api
+    response = client.post("/analyze/batch", json={"texts": ["a", "b", "a"]})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all("result" in line for line in lines)
+
+
+def test_batch_limits_and_per_chunk_admission(api, monkeypatch):
+    import api.main as main
+
+    client, completions = api
+    monkeypatch.setattr(main, "MAX_BATCH_TEXTS", 3)
+    too_many = client.post("/analyze/batch", json={"texts": ["a", "b", "c", "d"]})
+    assert too_many.status_code == 413
+    monkeypatch.setattr(main, "MAX_BATCH_BYTES", 64)
+    too_big = client.post("/analyze/batch", json={"texts": ["x" * 100]})
+    assert too_big.status_code == 413
+
+    monkeypatch.setattr(main, "BATCH_CHUNK_SIZE", 1)
+    admitted = main.admission.admitted
+    response = client.post("/analyze/batch", json={"texts": ["a", "b", "c"]})
+    assert len(response.text.splitlines()) == 3
+    assert main.admission.admitted - admitted == 3
+    assert main.admission.in_flight == 0
+
+    completions.delay = 0.5
+    slow = client.post(
+        "/analyze/batch", json={"texts": ["d", "e"]}, headers={"X-Request-Timeout": "0.05"}
+    )
+    lines = [json.loads(line) for line in slow.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all("deadline" in line["error"] for line in lines)
+    assert main.admission.in_flight == 0
+
+
+def test_stream_takes_its_slot_only_once_the_body_runs(api):
+    import asyncio
+
+    from starlette.requests import Request
+
+    import api.main as main
+
+    client, _ = api
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": []})
+
+    async def respond_without_body():
+        return await main.analyze_stream(main.AnalyzeRequest(text="x"), request, None)
+
+    asyncio.run(respond_without_body())
+    assert main.admission.in_flight == 0
+
+    response = client.post("/analyze/stream", json={"text": "You're wrong, kid."})
+    assert response.text.startswith("event: ")
+    assert main.admission.in_flight == 0
+
+
+def test_stream_closes_upstream_when_client_disconnects(api, monkeypatch):
+    import asyncio
+
+    from starlette.requests import Request
+
+    import api.main as main
+
+    closed = []
+
+    async def hanging_stream(text, model=None):
+        try:
+            await asyncio.sleep(60)
+            yield "done", None
+        finally:
+            closed.append(text)
+
+    monkeypatch.setattr(main.get_detector(), "analyze_stream_async", hanging_stream)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    request = Request(
+        {"type": "http", "method": "POST", "path": "/", "headers": []}, receive
+    )
+
+    async def stream_then_disconnect():
+        response = await main.analyze_stream(main.AnalyzeRequest(text="x"), request, None)
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(asyncio.wait_for(stream_then_disconnect(), 5))
+    assert chunks == []
+    assert closed == ["x"]
+    assert main.admission.in_flight == 0
+
+
+def test_compare_returns_structured_diff(api):
+    client, completions = api
+    response = client.post("/compare", json={"text_a": "first", "text_b": "second"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["a"]["original_text"] == "first"
+    assert body["score_deltas"] == {
+        "clarity_score": 0.0,
+        "persuasion_score": 0.0,
+        "reliability_score": 0.0,
+    }
+    assert body["shared_types"] == ["Ad Hominem"]
+    assert len(completions.calls) == 2
+
+    # Both sides are cached now, so a repeat does not call Groq again.
+    client.post("/compare", json={"text_a": "second", "text_b": "first"})
+    assert len(completions.calls) == 2
+
+
+def test_explain_returns_prose_for_requested_spans(api, monkeypatch):
+    client, completions = api
+    explanations = {"explanations": [{"id": 0, "explanation": "Age is not an argument."}]}
+    responses = iter([json.dumps(PAYLOAD), json.dumps(explanations)])
+    monkeypatch.setattr(completions, "content", None)
+    original_create = completions.create
+
+    async def create(**kwargs):
+        completions.content = next(responses)
+        return await original_create(**kwargs)
+
+    monkeypatch.setattr(completions, "create", create)
+    response = client.post("/explain", json={"text": "You're wrong, kid!", "span_ids": [0]})
+    assert response.status_code == 200
+    (item,) = response.json()["explanations"]
+    assert item["id"] == 0 and item["explanation"] == "Age is not an argument."
+    assert len(completions.calls) == 2
+
+    bad = client.post("/explain", json={"text": "You're wrong, kid!", "span_ids": [5]})
+    assert bad.status_code == 400
+
+
+def test_import_does_not_require_api_key_and_readyz_reports_it(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    import api.main as main
+
+    monkeypatch.setattr(main, "detector", None)
+    monkeypatch.setattr(main, "_ready", False)
+    client = TestClient(main.app)
+    assert client.get("/healthz").status_code == 200
+    ready = client.get("/readyz")
+    assert ready.status_code == 503
+    assert "GROQ_API_KEY" in ready.json()["detail"]
+    assert client.post("/analyze", json={"text": "x"}).status_code == 503
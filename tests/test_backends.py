@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from fallacylens.backends import LLMBackend, OpenAICompatibleBackend
+from fallacylens.detector import FallacyDetector
+
+
+PAYLOAD = {
+    "fallacies": [
+        {"type": "Ad Hominem", "start": 0, "end": 10, "confidence": 0.9, "severity": 4}
+    ],
+    "clarity_score": 70,
+    "persuasion_score": 40,
+    "reliability_score": 30,
+}
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible `/v1/chat/completions`, like a local llama.cpp server."""
+
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.path, self.headers.get("Authorization"), body))
+        content = json.dumps(PAYLOAD)
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for i in range(0, len(content), 16):
+                chunk = {"choices": [{"delta": {"content": content[i : i + 16]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        reply = json.dumps(
+            {
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 7, "total_tokens": 12},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    _StandIn.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1", _StandIn.requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_detector_runs_against_openai_compatible_server(monkeypatch, local_server):
+    url, requests = local_server
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    det = FallacyDetector(backend=OpenAICompatibleBackend(url, "local-llama", api_key="secret"))
+    assert det.model == "local-llama"
+
+    result = det.analyze("You're wrong because you're young.")
+    assert result.fallacies[0].fallacy_type == "Ad Hominem"
+    assert result.usage["total_tokens"] == 12
+    assert asyncio.run(det.analyze_async("other text")).has_fallacies
+
+    async def stream():
+        return [event async for event, _ in det.analyze_stream_async("third text")]
+
+    assert asyncio.run(stream()) == ["span", "scores", "result"]
+    path, auth, body = requests[0]
+    assert (path, auth, body["model"]) == ("/v1/chat/completions", "Bearer secret", "local-llama")
+    assert body["response_format"] == {"type": "json_object"}
+    assert requests[-1][2]["stream"] is True
+
+
+def test_routes_send_selected_models_to_their_backend(monkeypatch, local_server):
+    url, requests = local_server
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    det = FallacyDetector(routes={"local-llama": OpenAICompatibleBackend(url)})
+    hosted = []
+    det.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: hosted.append(kw)))
+    )
+
+    det.analyze_with_model_name("text", "local-llama")
+    assert len(requests) == 1 and not hosted
+    assert det.backend_for() is det.backend
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoStreaming(LLMBackend):
+        def create(self, request):
+            return "{}", {}
+
+        async def acreate(self, request):
+            return "{}", {}
+
+    with pytest.raises(TypeError):
+        NoStreaming()
+
+
+def test_openai_compatible_backend_reports_missing_httpx(monkeypatch):
+    import importlib.util
+
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, "find_spec", lambda name, *a: None if name == "httpx" else find_spec(name, *a)
+    )
+    with pytest.raises(RuntimeError, match="httpx"):
+        OpenAICompatibleBackend("http://localhost:8080/v1")
@@ -0,0 +1,180 @@
+import asyncio
+import fnmatch
+import socket
+import socketserver
+import threading
+
+import pytest
+
+from fallacylens.cache import (
+    MemoryCache,
+    RedisCache,
+    ResultCache,
+    SQLiteCache,
+    TieredCache,
+    cache_from_url,
+    make_cache_key,
+)
+from fallacylens.models import AnalysisResult, FallacySpan
+
+
+def _result(text):
+    return AnalysisResult(original_text=text, fallacies=[])
+
+
+def test_make_cache_key_is_stable_and_parameter_sensitive():
+    key = make_cache_key("text", "model", "1", min_confidence=0.4)
+    assert key == make_cache_key("text", "model", "1", min_confidence=0.4)
+    assert key != make_cache_key("text", "model", "2", min_confidence=0.4)
+    assert key != make_cache_key("text", "model", "1", min_confidence=0.5)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", _result("a"))
+    cache.set("b", _result("b"))
+    assert cache.get("a").original_text == "a"
+    cache.set("c", _result("c"))
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.stats()["hits"] == 1
+
+
+def test_custom_caches_must_implement_get_and_set():
+    class GetOnly(ResultCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+    class Minimal(GetOnly):
+        def set(self, key, result):
+            pass
+
+    cache = Minimal()
+    assert "a" not in cache
+    with pytest.raises(NotImplementedError):
+        list(cache.results())
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Just enough RESP (GET / SET [EX] / MGET / single-page SCAN) to stand in for Redis."""
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            header = self.rfile.readline()
+            if not header:
+                return
+            args = []
+            for _ in range(int(header[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            command = args[0].upper()
+            if command == b"SET":
+                store[args[1]] = args[2]
+                self.wfile.write(b"+OK\r\n")
+            elif command == b"GET" and args[1] in store:
+                value = store[args[1]]
+                self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif command == b"GET":
+                self.wfile.write(b"$-1\r\n")
+            elif command == b"MGET":
+                self.wfile.write(b"*%d\r\n" % (len(args) - 1))
+                for key in args[1:]:
+                    value = store.get(key)
+                    self.wfile.write(
+                        b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+                    )
+            elif command == b"SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode()
+                keys = [k for k in store if fnmatch.fnmatchcase(k.decode(), pattern)]
+                self.wfile.write(b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys))
+                for key in keys:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(key), key))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FakeRedisHandler)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _scored(text):
+    span = FallacySpan(0, 4, text[:4], "Bandwagon", 0.8, 2, "Popularity.")
+    result = AnalysisResult(original_text=text, fallacies=[span])
+    result.clarity_score = 61.0
+    result.persuasion_score = 42.0
+    result.reliability_score = 23.0
+    return result
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).set("k", _scored("Everyone says so"))
+    restored = SQLiteCache(path).get("k")
+    assert restored.fallacies[0].text == "Ever"
+    assert restored.persuasion_score == 42.0
+    assert SQLiteCache(path).get("missing") is None
+
+
+def test_sqlite_namespaces_are_separate_tables(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = cache_from_url(f"sqlite:///{path}")
+    explanations = cache.namespace("explanations")
+    explanations.set("k", _result("excerpt"))
+    cache.set("other", _scored("Everyone says so"))
+
+    assert cache.get("k") is None
+    assert SQLiteCache(path, table="results_explanations").get("k").original_text == "excerpt"
+    assert [r.original_text for r in cache.results()] == ["Everyone says so"]
+
+
+def test_sqlite_cache_async_access_runs_off_the_event_loop(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    threads = []
+    get, set_ = cache.get, cache.set
+    cache.get = lambda key: threads.append(threading.get_ident()) or get(key)
+    cache.set = lambda key, result: threads.append(threading.get_ident()) or set_(key, result)
+
+    async def roundtrip():
+        await cache.aset("k", _scored("Everyone says so"))
+        return await cache.aget("k")
+
+    assert asyncio.run(roundtrip()).persuasion_score == 42.0
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+def test_redis_cache_roundtrip_against_stand_in(fake_redis):
+    port = fake_redis.server_address[1]
+    writer = cache_from_url(f"redis://127.0.0.1:{port}/0")
+    reader = cache_from_url(f"redis://127.0.0.1:{port}/0")
+    assert isinstance(writer, TieredCache)
+
+    writer.set("k", _scored("Everyone says so"))
+    assert reader.get("k").reliability_score == 23.0
+    # Second read is served by the reader's in-memory front.
+    assert reader.get("k") is reader.get("k")
+    assert asyncio.run(reader.aget("missing")) is None
+
+    writer.namespace("explanations").set("k", _result("excerpt"))
+    assert [r.original_text for r in reader.results()] == ["Everyone says so"]
+
+
+def test_redis_cache_degrades_to_misses_when_unreachable():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    cache = RedisCache(port=port, timeout=0.2)
+    cache.set("k", _scored("text"))
+    assert cache.get("k") is None
+    assert cache.stats()["errors"] == 2
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from fallacylens.concurrency import (
+    AdmissionController,
+    DeadlineExceeded,
+    Overloaded,
+    SingleFlight,
+)
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = []
+
+    async def work():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(started) == 1
+    assert all(r is results[0] for r in results)
+    stats = flight.stats()
+    assert stats["calls"] == 5
+    assert stats["coalesced"] == 4
+    assert stats["dedup_ratio"] == pytest.approx(0.8)
+    assert stats["in_flight"] == 0
+
+
+def test_single_flight_shares_exceptions_and_forgets_key():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("k", failing), flight.do("k", failing), return_exceptions=True
+        )
+
+    outcomes = asyncio.run(main())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert len(attempts) == 1
+
+    asyncio.run(main())
+    assert len(attempts) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_work_is_cancelled_once_every_caller_gave_up():
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.do("k", work)) for _ in range(2)]
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.gather(*callers), 0.01)
+        await asyncio.sleep(0.08)
+
+    asyncio.run(main())
+    assert not finished
+    assert flight.stats()["abandoned"] == 1 and flight.in_flight == 0
+
+
+def test_admission_rejects_when_queue_is_full():
+    admission = AdmissionController(max_in_flight=1, max_queued=1)
+
+    async def main():
+        first = await admission.acquire()
+        queued = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as excinfo:
+            await admission.acquire()
+        assert excinfo.value.retry_after >= 1
+        with pytest.raises(Overloaded):
+            admission.check()
+        admission.release(first)
+        admission.release(await queued)
+        return admission.stats()
+
+    stats = asyncio.run(main())
+    assert stats["admitted"] == 2
+    assert stats["rejected"] == 2
+    assert stats["in_flight"] == 0
+    admission.check()
+
+
+def test_admission_drops_queued_request_past_deadline():
+    admission = AdmissionController(max_in_flight=1, max_queued=4)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        held = await admission.acquire()
+        with pytest.raises(DeadlineExceeded):
+            await admission.acquire(deadline=loop.time() + 0.01)
+        admission.release(held)
+        async with admission.slot(deadline=loop.time() + 1):
+            assert admission.in_flight == 1
+        return admission.stats()
+
+    stats = asyncio.run(main())
+    assert stats["expired"] == 1
+    assert stats["queued"] == 0
+    assert stats["in_flight"] == 0
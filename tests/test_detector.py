@@ -0,0 +1,406 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fallacylens.cache import MemoryCache
+from fallacylens.detector import FallacyDetector
+from fallacylens.neardup import NearDuplicateIndex
+
+
+PAYLOAD = {
+    "fallacies": [
+        {
+            "type": "Ad Hominem",
+            "start": 0,
+            "end": 10,
+            "confidence": 0.9,
+            "severity": 4,
+            "explanation": "Attacks the speaker.",
+        }
+    ],
+    "clarity_score": 70,
+    "persuasion_score": 40,
+    "reliability_score": 30,
+}
+
+
+def _completion(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletions:
+    def __init__(self, content):
+        self.content = content
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _completion(self.content)
+
+
+class FakeAsyncCompletions:
+    def __init__(self, content, delay=0.01):
+        self.content = content
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return _completion(self.content)
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    det = FallacyDetector(max_concurrency=2)
+    det.client = _client(FakeCompletions(json.dumps(PAYLOAD)))
+    det.async_client = _client(FakeAsyncCompletions(json.dumps(PAYLOAD)))
+    return det
+
+
+def test_analyze_parses_spans_and_scores(detector):
+    result = detector.analyze("You're wrong because you're young.")
+    assert result.has_fallacies
+    assert result.fallacies[0].fallacy_type == "Ad Hominem"
+    assert result.fallacies[0].text == "You're wro"
+    assert result.clarity_score == 70.0
+
+
+def test_analyze_with_model_name_does_not_switch_default(detector):
+    detector.analyze_with_model_name("text", "other-model")
+    assert detector.client.chat.completions.calls[-1]["model"] == "other-model"
+    assert detector.model == FallacyDetector.DEFAULT_MODEL
+
+
+def test_analyze_records_token_usage_and_latency(detector):
+    completions = detector.client.chat.completions
+    usage = SimpleNamespace(prompt_tokens=12, completion_tokens=34, total_tokens=46)
+    completions.create = lambda **kwargs: SimpleNamespace(
+        choices=_completion(json.dumps(PAYLOAD)).choices, usage=usage
+    )
+    result = detector.analyze("text")
+    assert result.usage["total_tokens"] == 46
+    assert result.usage["latency_s"] >= 0
+
+    # Responses without a usage block still report latency.
+    result = asyncio.run(detector.analyze_async("other text"))
+    assert result.usage["prompt_tokens"] is None
+    assert result.usage["latency_s"] >= 0
+
+
+def test_analyze_async_respects_max_concurrency(detector):
+    texts = [f"text {i}" for i in range(6)]
+    results = asyncio.run(detector.analyze_batch_async(texts))
+    completions = detector.async_client.chat.completions
+    assert [r.original_text for r in results] == texts
+    assert len(completions.calls) == 6
+    assert completions.peak == 2
+
+
+def test_invalid_json_falls_back_to_neutral_scores(detector):
+    detector.client = _client(FakeCompletions("not json"))
+    result = detector.analyze("text")
+    assert not result.has_fallacies
+    assert result.reliability_score == 50.0
+    assert result.parse_quality == "failed"
+
+
+def test_json_mode_requests_json_response_format(detector):
+    detector.analyze("text")
+    assert detector.client.chat.completions.calls[-1]["response_format"] == {"type": "json_object"}
+
+    detector.json_mode = False
+    detector.analyze("other text")
+    assert "response_format" not in detector.client.chat.completions.calls[-1]
+
+
+def test_truncated_output_keeps_complete_spans_and_is_not_cached(detector):
+    second = dict(PAYLOAD["fallacies"][0], start=11, end=20)
+    truncated = "```json\n" + json.dumps({"fallacies": [PAYLOAD["fallacies"][0], second]})[:-30]
+    detector.cache = MemoryCache()
+    detector.client = _client(FakeCompletions(truncated))
+    result = detector.analyze("You're wrong because you're young.")
+    assert [f.start for f in result.fallacies] == [0]
+    assert result.parse_quality == "repaired"
+    assert result.defaulted_fields == ["clarity_score", "persuasion_score", "reliability_score"]
+    assert detector.cached_result(detector.cache_key(result.original_text)) is None
+
+    # A repair that lost only trailing prose keeps every field and is cached.
+    detector.client = _client(FakeCompletions(json.dumps(PAYLOAD)[:-1] + ', "note": "x'))
+    repaired = detector.analyze("Complete scores.")
+    assert (repaired.parse_quality, repaired.defaulted_fields) == ("repaired", [])
+    assert detector.cached_result(detector.cache_key("Complete scores.")) is not None
+
+    detector.client = _client(FakeCompletions("Sorry, I can't help with that."))
+    assert detector.analyze("text").parse_quality == "failed"
+    detector.client = _client(FakeCompletions(json.dumps(PAYLOAD)))
+    assert detector.analyze("text").parse_quality == "ok"
+
+
+def test_analyze_many_async_dedups_in_flight_texts(detector):
+    async def collect():
+        return [item async for item in detector.analyze_many_async(["a", "b", "a", "c"])]
+
+    outcomes = asyncio.run(collect())
+    assert sorted(i for i, _ in outcomes) == [0, 1, 2, 3]
+    assert len(detector.async_client.chat.completions.calls) == 3
+    by_index = dict(outcomes)
+    assert by_index[0] is by_index[2]
+
+
+def test_analyze_many_async_reports_errors_per_item(detector):
+    async def failing(text, model=None):
+        if text == "bad":
+            raise ValueError("boom")
+        return await original(text, model=model)
+
+    original = detector.analyze_async
+    detector.analyze_async = failing
+
+    async def collect():
+        return dict([item async for item in detector.analyze_many_async(["ok", "bad"])])
+
+    outcomes = asyncio.run(collect())
+    assert isinstance(outcomes[1], ValueError)
+    assert outcomes[0].original_text == "ok"
+
+
+class FakeStream:
+    def __init__(self, content, size=5):
+        self.parts = [content[i : i + size] for i in range(0, len(content), size)]
+        self.closed = False
+        self.consumed = 0
+
+    async def _chunks(self):
+        for part in self.parts:
+            self.consumed += 1
+            delta = SimpleNamespace(content=part)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStreamingCompletions:
+    def __init__(self, content):
+        self.stream = FakeStream(content)
+
+    async def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return self.stream
+
+
+def test_analyze_stream_async_yields_spans_then_scores_then_result(detector):
+    completions = FakeStreamingCompletions(json.dumps(PAYLOAD))
+    detector.async_client = _client(completions)
+
+    async def collect():
+        return [item async for item in detector.analyze_stream_async("You're wrong, kid.")]
+
+    events = asyncio.run(collect())
+    assert [e for e, _ in events] == ["span", "scores", "result"]
+    assert events[1][1]["clarity_score"] == 70.0
+    assert events[2][1].fallacies == [events[0][1]]
+    assert completions.stream.closed
+
+
+def test_closing_analyze_stream_async_closes_upstream(detector):
+    completions = FakeStreamingCompletions(json.dumps(PAYLOAD))
+    detector.async_client = _client(completions)
+
+    async def first_span():
+        events = detector.analyze_stream_async("You're wrong, kid.")
+        event = await events.__anext__()
+        await events.aclose()
+        return event
+
+    assert asyncio.run(first_span())[0] == "span"
+    assert completions.stream.closed
+    assert completions.stream.consumed < len(completions.stream.parts)
+
+
+def test_concurrent_identical_analyses_share_one_upstream_call(detector):
+    async def main():
+        return await asyncio.gather(*(detector.analyze_async("same") for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert len(detector.async_client.chat.completions.calls) == 1
+    assert all(r is results[0] for r in results)
+    assert detector.metrics()["single_flight"]["coalesced"] == 3
+
+
+def test_timed_out_analysis_never_reaches_upstream(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    det = FallacyDetector(max_concurrency=1)
+    completions = FakeAsyncCompletions(json.dumps(PAYLOAD), delay=0.1)
+    det.async_client = _client(completions)
+
+    async def main():
+        first = asyncio.ensure_future(det.analyze_async("first"))
+        with pytest.raises(asyncio.TimeoutError):
+            # Queued behind `first` for the only upstream slot.
+            await asyncio.wait_for(det.analyze_async("second"), 0.02)
+        await first
+        await asyncio.sleep(0.15)
+
+    asyncio.run(main())
+    assert len(completions.calls) == 1
+
+
+def test_cache_key_depends_on_model_and_text(detector):
+    assert detector.cache_key("a") == detector.cache_key("a")
+    assert detector.cache_key("a") != detector.cache_key("b")
+    assert detector.cache_key("a") != detector.cache_key("a", model="other")
+
+
+def test_results_are_served_from_cache(detector):
+    from fallacylens.cache import MemoryCache
+
+    detector.cache = MemoryCache()
+    first = detector.analyze("cached text")
+    assert detector.analyze("cached text") is first
+    assert asyncio.run(detector.analyze_async("cached text")) is first
+    assert len(detector.client.chat.completions.calls) == 1
+    assert len(detector.async_client.chat.completions.calls) == 0
+
+
+def test_compare_diffs_scores_and_fallacy_types(detector):
+    span = PAYLOAD["fallacies"][0]
+    other = dict(
+        PAYLOAD,
+        clarity_score=90,
+        fallacies=[dict(span, type="Strawman"), dict(span, type="Ad Hominem")],
+    )
+    responses = {"A text": json.dumps(PAYLOAD), "B text": json.dumps(other)}
+
+    def create(**kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        return _completion(next(v for k, v in responses.items() if k in prompt))
+
+    detector.client.chat.completions.create = create
+    comparison = detector.compare("A text", "B text")
+    assert comparison.score_deltas["clarity_score"] == 20.0
+    assert comparison.score_deltas["reliability_score"] == 0.0
+    assert comparison.type_counts_b == {"Strawman": 1, "Ad Hominem": 1}
+    assert comparison.shared_types == ["Ad Hominem"]
+    assert comparison.only_a_types == []
+    assert comparison.only_b_types == ["Strawman"]
+
+
+def test_compare_async_analyzes_identical_texts_once(detector):
+    comparison = asyncio.run(detector.compare_async("same", "same"))
+    assert len(detector.async_client.chat.completions.calls) == 1
+    assert comparison.a is comparison.b
+
+
+def test_analyze_incremental_reanalyzes_only_edited_paragraphs(detector):
+    calls = detector.client.chat.completions.calls
+    first = detector.analyze_incremental("Para one here.\n\nPara two here.\n\nPara three.")
+    assert len(calls) == 3
+    assert [f.start for f in first.fallacies] == [0, 16, 32]
+    assert first.clarity_score == 70.0
+
+    edited = "A longer first paragraph now.\n\nPara two here.\n\nPara three."
+    second = detector.analyze_incremental(edited, previous=first)
+    assert len(calls) == 4
+    assert second.reanalyzed_units == 1
+    # Unchanged paragraphs keep their spans, shifted by the length delta.
+    assert [f.start for f in second.fallacies] == [0, 31, 47]
+    assert all(f.text == edited[f.start : f.end] for f in second.fallacies)
+
+
+def test_analyze_incremental_async_merges_scores_by_unit_length(detector):
+    result = asyncio.run(detector.analyze_incremental_async("One. Two two.", unit="sentence"))
+    assert [(u.start, u.end) for u in result.units] == [(0, 4), (5, 13)]
+    assert result.reliability_score == 30.0
+
+
+def test_near_duplicate_texts_reuse_the_previous_analysis(detector):
+    detector.near_duplicates = NearDuplicateIndex()
+    detector.cache = MemoryCache(8)
+    first = detector.analyze("You're wrong because you're young, and that settles it.")
+    second = detector.analyze("you're wrong because you're young,   and that settles it!")
+    assert len(detector.client.chat.completions.calls) == 1
+    assert second.fallacies[0].text == "you're wro"
+    assert second.clarity_score == first.clarity_score
+    assert detector.metrics()["near_duplicates"]["hits"] == 1
+    assert detector.cached_result(detector.cache_key(second.original_text)) is None
+
+
+def test_lean_output_mode_expands_codes_and_keys_the_cache(detector):
+    plain_key = detector.cache_key("text")
+    lean = FallacyDetector(output_mode="lean", max_concurrency=2)
+    compact_payload = {
+        "fallacies": [
+            {"t": "BW", "s": 0, "e": 4, "c": 0.9, "v": 3},
+            {"t": "straw man", "s": 5, "e": 9, "c": 0.8, "v": 2},
+        ],
+        "clarity_score": 60,
+        "persuasion_score": 50,
+        "reliability_score": 40,
+    }
+    lean.client = _client(FakeCompletions(json.dumps(compact_payload)))
+    result = lean.analyze("Everyone agrees here.")
+
+    assert [f.fallacy_type for f in result.fallacies] == ["Bandwagon", "Strawman"]
+    assert result.fallacies[0].explanation == ""
+    prompt = lean.client.chat.completions.calls[0]["messages"][-1]["content"]
+    assert "BW=Bandwagon" in prompt and '"x"' not in prompt
+    assert lean.cache_key("text") != plain_key
+
+
+def test_unknown_output_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    with pytest.raises(ValueError):
+        FallacyDetector(output_mode="tiny")
+
+
+EXPLANATIONS = {
+    "explanations": [
+        {"id": 0, "explanation": "Attacks the speaker's age.", "suggestion": "Address the claim."}
+    ]
+}
+
+
+def test_explain_generates_only_requested_spans_and_caches_them(detector):
+    detector.cache = MemoryCache(16)
+    result = detector.analyze("You're wrong because you're young.")
+    completions = FakeCompletions(json.dumps(EXPLANATIONS))
+    detector.client = _client(completions)
+
+    (span,) = detector.explain(result, [0])
+    assert span.explanation == "Attacks the speaker's age."
+    assert span.suggestion == "Address the claim."
+    assert result.fallacies[0].explanation == "Attacks the speaker."  # unchanged
+    assert '0. Ad Hominem: "You\'re wro"' in completions.calls[0]["messages"][-1]["content"]
+
+    again = asyncio.run(detector.explain_async(result, [0]))
+    assert again[0].explanation == span.explanation
+    assert len(completions.calls) == 1
+    # Explanations live in their own namespace, apart from analyses.
+    assert [r.original_text for r in detector.cache.results()] == [result.original_text]
+    assert len(detector.explanation_cache) == 1
+
+
+def test_explain_rejects_unknown_span_ids(detector):
+    result = detector.analyze("text")
+    with pytest.raises(ValueError):
+        detector.explain(result, [3])
@@ -0,0 +1,128 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fallacylens.cache import SQLiteCache
+from fallacylens.detector import FallacyDetector
+from fallacylens.distill import (
+    DistilledModel,
+    export_training_data,
+    load_training_data,
+    sentence_examples,
+)
+from fallacylens.models import AnalysisResult, FallacySpan
+
+FALLACIOUS = [
+    "Everyone already uses this app, so it must be right.",
+    "Millions of people vote this way, so you should too.",
+    "Everyone agrees with the plan, so it must be right.",
+]
+NEUTRAL = [
+    "The report measured rainfall across three regions.",
+    "We compared the costs with last year's budget.",
+    "The author presented data and invited questions.",
+]
+
+
+def _analysis(sentences):
+    text = " ".join(sentences)
+    spans, position = [], 0
+    for sentence in sentences:
+        if sentence in FALLACIOUS:
+            end = position + len(sentence)
+            spans.append(FallacySpan(position, end, sentence, "Bandwagon", 0.9, 2, ""))
+        position += len(sentence) + 1
+    result = AnalysisResult(original_text=text, fallacies=spans)
+    result.clarity_score = 70.0
+    result.persuasion_score = 40.0
+    result.reliability_score = 60.0
+    return result
+
+
+@pytest.fixture(scope="module")
+def model():
+    corpus = [_analysis([f, n]) for f in FALLACIOUS for n in NEUTRAL] * 4
+    return DistilledModel.train(row for r in corpus for row in sentence_examples(r))
+
+
+def test_sentence_examples_label_covered_sentences():
+    rows = sentence_examples(_analysis([NEUTRAL[0], FALLACIOUS[0]]))
+    assert [row["labels"] for row in rows] == [[], ["Bandwagon"]]
+    assert rows[1]["scores"]["reliability_score"] == 60.0
+
+    # A one-span, default-score analysis is still an analysis.
+    whole = AnalysisResult("x", [FallacySpan(0, 1, "x", "Bandwagon", 0.9, 2, "why")])
+    assert [row["labels"] for row in sentence_examples(whole)] == [["Bandwagon"]]
+    failed = AnalysisResult("x", [])
+    failed.parse_quality = "failed"
+    assert sentence_examples(failed) == []
+    whole.parse_quality, whole.defaulted_fields = "repaired", ["reliability_score"]
+    assert sentence_examples(whole) == []
+
+
+def test_export_from_cache_roundtrip(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set("k", _analysis([FALLACIOUS[1], NEUTRAL[1]]))
+    path = str(tmp_path / "rows.jsonl.gz")
+    assert export_training_data(cache.results(), path) == 2
+    assert [row["labels"] for row in load_training_data(path)] == [["Bandwagon"], []]
+
+
+def test_model_predicts_sentence_spans_and_survives_save(model, tmp_path):
+    text = f"{NEUTRAL[2]} {FALLACIOUS[2]}"
+    result, confidence = model.predict(text)
+    assert [(f.text, f.fallacy_type, f.severity) for f in result.fallacies] == [
+        (FALLACIOUS[2], "Bandwagon", 2)
+    ]
+    assert confidence > 0.5
+    assert result.usage["tier"] == "local"
+
+    model.save(str(tmp_path / "model.json.gz"))
+    loaded = DistilledModel.load(str(tmp_path / "model.json.gz"))
+    assert loaded.predict(text)[1] == pytest.approx(confidence, abs=1e-4)
+
+
+def test_detector_serves_confident_texts_locally(monkeypatch, model):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    calls = []
+    payload = {"fallacies": [], "clarity_score": 90, "persuasion_score": 50, "reliability_score": 90}
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=json.dumps(payload))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    text = f"{NEUTRAL[0]} {FALLACIOUS[0]}"
+    confidence = model.predict(text)[1]
+    det = FallacyDetector(local_model=model, local_threshold=confidence)
+    det.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert det.analyze(text).local_confidence == confidence
+    assert not calls
+
+    det.local_threshold = 0.9999
+    assert det.analyze(text).clarity_score == 90.0
+    det.analyze_with_model_name(text, "other-model")
+    assert len(calls) == 2
+    assert det.metrics()["local"] == {"threshold": 0.9999, "served": 1, "fallbacks": 1}
+
+
+def test_confidence_covers_scores_and_calibrates_on_held_out(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    assert DistilledModel([]).predict(NEUTRAL[0])[1] == 0.0
+
+    corpus = [_analysis([f, n]) for f in FALLACIOUS for n in NEUTRAL] * 4
+    model = DistilledModel.train(row for r in corpus for row in sentence_examples(r))
+
+    held_out = [_analysis([n, f]) for f in FALLACIOUS for n in NEUTRAL]
+    threshold = model.calibrate(held_out, target_agreement=0.9)
+    assert 0.5 < threshold <= 1.0 and model.threshold == threshold
+    assert FallacyDetector(local_model=model).local_threshold == threshold
+
+    # Held-out scores far from the training scores: nothing is confident enough.
+    for result in held_out:
+        result.reliability_score = 10.0
+    assert model.calibrate(held_out) == float("inf")
+    assert model.score_errors["reliability_score"] == pytest.approx(50.0, abs=1.0)
+    assert model.predict(NEUTRAL[0])[1] < 0.2
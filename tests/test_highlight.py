@@ -0,0 +1,38 @@
+from fallacylens.highlight import page_bounds, render_html, segments
+from fallacylens.models import FallacySpan
+
+
+def _span(start, end, fallacy_type="Bandwagon", severity=2):
+    return FallacySpan(start, end, "", fallacy_type, 0.9, severity, "")
+
+
+def test_segments_split_overlapping_and_nested_spans_once():
+    spans = [_span(0, 10), _span(5, 15), _span(6, 8)]
+    assert segments(spans, 0, 20) == [
+        (0, 5, (0,)),
+        (5, 6, (0, 1)),
+        (6, 8, (0, 1, 2)),
+        (8, 10, (0, 1)),
+        (10, 15, (1,)),
+        (15, 20, ()),
+    ]
+
+
+def test_render_html_never_duplicates_text_and_clips_to_window():
+    text = "abcdefghijklmnopqrst"
+    spans = [_span(0, 10, severity=2), _span(5, 15, "Strawman", severity=5)]
+    html = render_html(text, spans)
+    assert html.count("f") == 1  # inside the overlap
+    assert "Bandwagon (severity 2/5)" in html and "Strawman (severity 5/5)" in html
+    assert "border-bottom" in html
+
+    window = render_html(text, spans, 12, 18)
+    assert ">mno</span>pqr</div>" in window
+
+
+def test_page_bounds_cover_text_and_break_at_whitespace():
+    text = "word " * 1000
+    pages = page_bounds(text, page_chars=300)
+    assert pages[0][0] == 0 and pages[-1][1] == len(text)
+    assert all(a[1] == b[0] for a, b in zip(pages, pages[1:]))
+    assert all(end - start <= 300 and text[end - 1] == " " for start, end in pages[:-1])
@@ -1,2 +1,34 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
 def test_placeholder():
     assert True
+
+
+def _loaded_after(statement):
+    probe = (
+        f"{statement}\n"
+        "import sys\n"
+        "print(','.join(m for m in ('groq', 'httpx', 'asyncio', 'fallacylens.detector')"
+        " if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return set(filter(None, out.stdout.strip().split(",")))
+
+
+def test_light_imports_skip_detector_and_network_stack():
+    assert _loaded_after("import fallacylens") == set()
+    assert _loaded_after("from fallacylens.models import AnalysisResult") == set()
+    assert _loaded_after("from fallacylens.taxonomy import FALLACY_DEFINITIONS") == set()
+
+
+def test_detector_is_loaded_lazily_without_groq():
+    loaded = _loaded_after("import fallacylens; fallacylens.FallacyDetector")
+    assert "fallacylens.detector" in loaded
+    assert "groq" not in loaded
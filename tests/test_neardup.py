@@ -0,0 +1,56 @@
+from fallacylens.models import AnalysisResult, FallacySpan
+from fallacylens.neardup import NearDuplicateIndex, minhash, remap_result, similarity
+
+TEXT = (
+    "You are wrong because you are too young to understand politics. "
+    "Everyone knows this product is the best, so you should buy it."
+)
+
+
+def _result(text=TEXT):
+    spans = [
+        FallacySpan(0, 62, text[:62], "Ad Hominem", 0.9, 4, ""),
+        FallacySpan(64, len(text), text[64:], "Bandwagon", 0.8, 3, ""),
+    ]
+    result = AnalysisResult(original_text=text, fallacies=spans)
+    result.clarity_score = 70.0
+    return result
+
+
+def test_minhash_ignores_case_whitespace_and_punctuation():
+    variant = TEXT.lower().replace(". ", "!   ")
+    assert similarity(minhash(TEXT), minhash(variant)) == 1.0
+    assert minhash("...") is None
+
+
+def test_remap_shifts_spans_and_rejects_edited_spans():
+    moved = remap_result(_result(), ">> " + TEXT + "\n--")
+    assert [(f.start, f.end) for f in moved.fallacies] == [(3, 65), (67, 129)]
+    assert moved.fallacies[0].text == TEXT[:62]
+    assert moved.clarity_score == 70.0
+
+    assert remap_result(_result(), TEXT.replace("too young", "very young")) is None
+
+
+def test_remap_rejects_added_words():
+    clean = " ".join(f"Sentence {i} states a plain measured fact." for i in range(30))
+    result = AnalysisResult(original_text=clean, fallacies=[])
+    added = clean + " Anyone who disagrees is an idiot."
+    assert similarity(minhash(clean), minhash(added)) >= 0.8
+    assert remap_result(result, added) is None
+    assert remap_result(_result(), "Hi all,\n" + TEXT) is None
+    assert remap_result(result, clean.replace(" ", "  ", 200), max_diff=100) is None
+
+
+def test_index_reuses_near_duplicates_within_scope_only():
+    index = NearDuplicateIndex(maxsize=2)
+    index.add("model-a", _result())
+    signed = TEXT.upper() + "\n\n--"
+    assert index.lookup("model-a", signed).original_text == signed
+    assert index.lookup("model-b", signed) is None
+    assert index.lookup("model-a", "Cats are nicer than dogs, obviously.") is None
+
+    index.add("model-a", _result("Another text entirely."))
+    index.add("model-a", _result("And a third one here."))
+    assert len(index) == 2
+    assert index.lookup("model-a", signed) is None  # evicted
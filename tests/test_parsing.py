@@ -0,0 +1,64 @@
+import json
+
+from fallacylens.parsing import StreamingArrayParser, parse_json_object
+
+
+def _feed_in_chunks(parser, text, size):
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i : i + size]))
+    return items
+
+
+def test_streaming_parser_emits_items_as_they_complete():
+    doc = json.dumps(
+        {
+            "fallacies": [
+                {"type": "Bandwagon", "explanation": "uses {braces} and \"quotes\" ]"},
+                {"type": "Strawman", "nested": {"a": [1, 2]}},
+            ],
+            "clarity_score": 60,
+        }
+    )
+    parser = StreamingArrayParser("fallacies")
+    items = _feed_in_chunks(parser, doc, 3)
+    assert [i["type"] for i in items] == ["Bandwagon", "Strawman"]
+    assert parser.items == items
+    assert json.loads(parser.text)["clarity_score"] == 60
+
+
+def test_streaming_parser_ignores_other_arrays_and_fences():
+    doc = '```json\n{"other": [{"x": 1}], "fallacies": [{"type": "A"}], "more": [{"y": 2}]}\n```'
+    parser = StreamingArrayParser("fallacies")
+    assert [i["type"] for i in _feed_in_chunks(parser, doc, 5)] == ["A"]
+
+
+def test_streaming_parser_keeps_complete_items_of_truncated_output():
+    parser = StreamingArrayParser("fallacies")
+    items = parser.feed('{"fallacies": [{"type": "A"}, {"type": "B", "expl')
+    assert [i["type"] for i in items] == ["A"]
+
+
+def test_parse_json_object_strips_fences_and_prose():
+    content = 'Here you go:\n```json\n{"fallacies": [], "clarity_score": 80}\n```\nThanks!'
+    assert parse_json_object(content) == ({"fallacies": [], "clarity_score": 80}, "ok")
+
+
+def test_parse_json_object_drops_only_the_truncated_tail():
+    doc = json.dumps(
+        {
+            "fallacies": [
+                {"type": "Bandwagon", "explanation": "a } in a string"},
+                {"type": "Strawman", "explanation": "cut off mid-sentence"},
+            ]
+        }
+    )
+    for cut in (len(doc) - 3, doc.index("cut off") + 3, doc.index('"Strawman"')):
+        data, quality = parse_json_object(doc[:cut])
+        assert quality == "repaired"
+        assert [f["type"] for f in data["fallacies"]] == ["Bandwagon"]
+
+
+def test_parse_json_object_reports_failure():
+    assert parse_json_object("no json here") == ({}, "failed")
+    assert parse_json_object('{"fallacies": [{"type": "Band') == ({"fallacies": []}, "repaired")
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fallacylens.cache import MemoryCache
+from fallacylens.detector import FallacyDetector
+from fallacylens.neardup import NearDuplicateIndex
+from fallacylens.replay import ReplayArchive, ReplayMiss, ReplayTransport
+
+
+PAYLOAD = {
+    "fallacies": [
+        {"type": "Ad Hominem", "start": 0, "end": 10, "confidence": 0.9, "severity": 4}
+    ],
+    "clarity_score": 70,
+    "persuasion_score": 40,
+    "reliability_score": 30,
+}
+
+
+def _completion(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletions:
+    def create(self, **kwargs):
+        return _completion(json.dumps(PAYLOAD))
+
+
+class FakeAsyncCompletions:
+    async def create(self, **kwargs):
+        return _completion(json.dumps(PAYLOAD))
+
+
+def _client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class NoNetwork:
+    def create(self, **kwargs):
+        raise AssertionError("replay must not call upstream")
+
+
+def _recorder(monkeypatch, path):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    det = FallacyDetector(replay=ReplayTransport.from_path(str(path), mode="record"))
+    det.client = _client(FakeCompletions())
+    det.async_client = _client(FakeAsyncCompletions())
+    return det
+
+
+def _replayer(monkeypatch, path, on_miss="fail"):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    det = FallacyDetector(replay=ReplayTransport.from_path(str(path), on_miss=on_miss))
+    det.client = _client(NoNetwork())
+    return det
+
+
+@pytest.mark.parametrize("name", ["archive.jsonl", "archive.jsonl.gz"])
+def test_recorded_completions_replay_without_network(monkeypatch, tmp_path, name):
+    text = "You're wrong because you're young."
+    recorded = _recorder(monkeypatch, tmp_path / name).analyze(text)
+    assert recorded.usage["replay"] == "recorded"
+
+    replayer = _replayer(monkeypatch, tmp_path / name)
+    replayed = replayer.analyze(text)
+    assert replayed.fallacies == recorded.fallacies
+    assert replayed.usage["replay"] == "replayed"
+    assert replayer.metrics()["replay"]["hits"] == 1
+
+
+def test_replay_miss_policies(monkeypatch, tmp_path):
+    path = tmp_path / "archive.jsonl"
+    with pytest.raises(ReplayMiss):
+        _replayer(monkeypatch, path).analyze("never recorded")
+
+    result = _replayer(monkeypatch, path, on_miss="synthesize").analyze("never recorded")
+    assert not result.has_fallacies
+    assert result.usage["replay"] == "synthesized"
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    det = FallacyDetector(replay=ReplayTransport.from_path(str(path), on_miss="passthrough"))
+    det.client = _client(FakeCompletions())
+    assert det.analyze("never recorded").usage["replay"] == "passthrough"
+    assert len(ReplayArchive(str(path))) == 0
+
+
+def test_synthesized_results_are_never_cached_or_indexed(monkeypatch, tmp_path):
+    det = _replayer(monkeypatch, tmp_path / "archive.jsonl", on_miss="synthesize")
+    det.cache = MemoryCache(8)
+    det.near_duplicates = NearDuplicateIndex()
+    text = "Everyone agrees with me, so I am right."
+
+    assert det.analyze(text).parse_quality == "synthesized"
+    assert asyncio.run(det.analyze_async(text)).parse_quality == "synthesized"
+
+    async def stream():
+        return [payload async for event, payload in det.analyze_stream_async(text)][-1]
+
+    assert asyncio.run(stream()).parse_quality == "synthesized"
+    assert len(det.cache) == 0 and len(det.near_duplicates) == 0
+    assert det.rewrite_argument(text) == text
+
+
+def test_recorded_analysis_replays_as_a_stream(monkeypatch, tmp_path):
+    path = tmp_path / "archive.jsonl"
+    asyncio.run(_recorder(monkeypatch, path).analyze_async("text"))
+
+    async def stream():
+        return [event async for event in _replayer(monkeypatch, path).analyze_stream_async("text")]
+
+    events = asyncio.run(stream())
+    assert [e for e, _ in events] == ["span", "scores", "result"]
+
+
+def test_archive_ignores_torn_last_line(tmp_path):
+    path = tmp_path / "archive.jsonl"
+    archive = ReplayArchive(str(path))
+    archive.append("abc", "m", "{}", {"latency_s": 0.1})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"fp": "def", "cont')
+    reloaded = ReplayArchive(str(path))
+    assert "abc" in reloaded and "def" not in reloaded
+
+
+def test_replay_transport_rejects_unknown_options(tmp_path):
+    archive = ReplayArchive(str(tmp_path / "archive.jsonl"))
+    with pytest.raises(ValueError):
+        ReplayTransport(archive, mode="rewind")
+    with pytest.raises(ValueError):
+        ReplayTransport(archive, on_miss="retry")
@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import pytest
+
+from fallacylens.models import AnalysisResult, FallacySpan
+from fallacylens.serialization import encode_payload, result_to_dict
+
+
+@pytest.fixture
+def result():
+    text = "Everyone agrees, so it must be true."
+    span = FallacySpan(0, 15, text[:15], "Bandwagon", 0.8, 3, "Popularity is not evidence.")
+    res = AnalysisResult(original_text=text, fallacies=[span])
+    res.clarity_score = 60.0
+    res.persuasion_score = 40.0
+    res.reliability_score = 20.0
+    return res
+
+
+def test_result_to_dict_matches_response_shape(result):
+    data = result_to_dict(result)
+    assert list(data) == [
+        "original_text",
+        "clarity_score",
+        "persuasion_score",
+        "reliability_score",
+        "has_fallacies",
+        "parse_quality",
+        "defaulted_fields",
+        "fallacies",
+    ]
+    assert data["fallacies"][0]["text"] == "Everyone agrees"
+    assert data["fallacies"][0]["suggestion"] is None
+
+
+def test_result_to_dict_can_omit_text(result):
+    data = result_to_dict(result, include_text=False, include_span_text=False)
+    assert "original_text" not in data
+    assert "text" not in data["fallacies"][0]
+
+
+def test_encode_payload_gzip_roundtrip(result):
+    payload = result_to_dict(result)
+    body, media_type, encoding = encode_payload(payload, "json", "gzip")
+    assert (media_type, encoding) == ("application/json", "gzip")
+    assert json.loads(gzip.decompress(body)) == payload
+
+
+def test_encode_payload_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        encode_payload({}, "xml")
+    with pytest.raises(ValueError):
+        encode_payload({}, "json", "brotli")
@@ -0,0 +1,42 @@
+import pytest
+
+from fallacylens.models import AnalysisResult
+from fallacylens.text import TextIndex, paragraph_bounds, sentence_bounds, unit_bounds
+
+
+def test_paragraph_bounds_trim_whitespace_and_skip_blank_paragraphs():
+    text = "  First para.\nStill first.\n\n \n\nSecond para.  \n"
+    assert [text[s:e] for s, e in paragraph_bounds(text)] == [
+        "First para.\nStill first.",
+        "Second para.",
+    ]
+
+
+def test_sentence_bounds_keep_closing_quotes():
+    text = 'He said "stop." Then left! Why?'
+    assert [text[s:e] for s, e in sentence_bounds(text)] == ['He said "stop."', "Then left!", "Why?"]
+
+
+def test_unit_bounds_rejects_unknown_unit():
+    with pytest.raises(ValueError):
+        unit_bounds("text", "word")
+
+
+def test_text_index_lookups():
+    text = "One two. Three four.\n\nFive six."
+    index = TextIndex(text)
+    assert [text[s:e] for s, e in index.sentences] == ["One two.", "Three four.", "Five six."]
+    assert index.unit_at(10) == 1
+    assert index.unit_at(8) is None
+    assert index.unit_at(25, "paragraph") == 1
+    assert list(index.overlapping(4, 12)) == [0, 1]
+    assert list(index.overlapping(20, 22)) == []
+    assert index.clamp(-3, 99) == (0, len(text))
+    assert index.last_start_between(0, 25, "paragraph") == 22
+    assert index.last_start_between(0, 5, "sentence") is None
+
+
+def test_result_text_index_is_built_once():
+    result = AnalysisResult(original_text="A claim. Another one.", fallacies=[])
+    assert result.text_index is result.text_index
+    assert len(result.text_index.sentences) == 2